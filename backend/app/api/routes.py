@@ -1,29 +1,43 @@
+import hashlib
+import json
 import uuid
 import os
 import re
 import shutil
-from fastapi import APIRouter, UploadFile, File, HTTPException
-
-from utils.file_io import save_upload_file
-from pipeline.controller import PipelineController
-from config.paths import (
-    RUNTIME_DATA_INPUT,
-    RUNTIME_DATA_NORMALIZED,
-    RUNTIME_DATA_CLIPS,
-    RUNTIME_DATA_SENTENCE_SELECTION,
-    RUNTIME_STATE_PATH,
+from fastapi import APIRouter, Depends, UploadFile, File, Header, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+
+from utils.file_io import save_upload_file, sha256_file, write_stream_at
+from pipeline.jobs import job_registry
+from pipeline.uploads import UploadConflict, upload_sessions
+from pipeline.coalescing import job_coalescer, submission_key
+from pipeline.scheduler import AdmissionRejected, job_scheduler
+from stages.audio_export.export import parse_export_targets
+from stages.preflight_validation.audio_duration_check import validate_audio_duration
+from config.limits import MAX_AUDIO_DURATION_SECONDS, STREAMING_MAX_AUDIO_DURATION_SECONDS
+from config.transcription_profiles import (
+    DEFAULT_TRANSCRIPTION_PROFILE,
+    get_transcription_profile,
 )
+from config.paths import RUNTIME_DATA_INPUT
+from config.render import get_render_settings
 from utils.logger import logger
+from utils.profiling import PSTATS_SUFFIX, list_profiles, resolve_profile
 
 # Create a new API router instance
 router = APIRouter()
 
-# Create a new PipelineController instance
-controller = PipelineController()
-
 # Define the set of allowed audio file extensions
 ALLOWED_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg"}
 
+# Interval between keep-alive comments on idle event streams.
+SSE_KEEPALIVE_SECONDS = 15
+
+# Format of SHA-256 hex digests given by clients.
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
 
 def sanitize_filename(name: str) -> str:
     """
@@ -41,50 +55,377 @@ def sanitize_filename(name: str) -> str:
     return name
 
 
-def _clean_runtime_before_upload():
+async def _wait_for_result(pipeline_id: str):
     """
-    Cleans the runtime directories before a new file is uploaded. This ensures
-    that data from previous runs is removed.
+    Waits for the first usable result of a job: the draft for previews,
+    otherwise the final result.
+
+    Args:
+        pipeline_id: The ID of the job.
+
+    Returns:
+        The job's draft or final result.
+
+    Raises:
+        HTTPException: If the job fails.
     """
-    for path in [
-        RUNTIME_DATA_NORMALIZED,
-        RUNTIME_DATA_CLIPS,
-        RUNTIME_DATA_SENTENCE_SELECTION,
-        os.path.dirname(RUNTIME_STATE_PATH),
-    ]:
-        if os.path.exists(path):
-            shutil.rmtree(path, ignore_errors=True)
-        os.makedirs(path, exist_ok=True)
+    async for event, data in job_registry.subscribe(pipeline_id):
+        if event == "failed":
+            raise HTTPException(status_code=500, detail=data["error"])
+        if event == "completed" or event == "draft":
+            return data["result"]
 
+    raise HTTPException(status_code=404, detail="Unknown pipeline_id")
 
-@router.post("/upload")
-async def upload_audio(
-    file: UploadFile = File(...),
-    tone: str = "informative"
-):
+
+def job_options(
+    tone: str = "informative",
+    streaming: bool = False,
+    preview: bool = False,
+    profile: str = DEFAULT_TRANSCRIPTION_PROFILE,
+    language: str = None,
+    export: str = "",
+    export_clips: bool = False,
+    profiling: bool = False,
+    wait: bool = True,
+    pad_start: float = None,
+    pad_end: float = None,
+    fade_duration: float = None,
+    merge_gap: float = None,
+    top_k: int = None,
+    silence_seconds: float = None
+) -> dict:
     """
-    Handles audio file uploads. It validates the file, cleans the runtime
-    environment, saves the uploaded file, and then runs the processing pipeline.
+    Query parameters of a job submission, shared by /upload and
+    /uploads/{upload_id}/finalize.
 
     Args:
-        file: The audio file to upload.
         tone: The tone to be used for sentence selection in the pipeline.
               Defaults to "informative".
+        streaming: Enables the bounded-memory processing mode for long
+                   recordings (up to 4 hours). Defaults to False.
+        preview: If True, first produce a fast draft with a small Whisper
+                 model, then refine it with a full-quality run in the
+                 background. Both results appear in the job status.
+        profile: The transcription profile (model size, beam size, language,
+                 compute type, conditioning). Defaults to "default".
+        language: Optional fixed language code (e.g. "en"), overriding the
+                  profile's language and skipping language detection.
+        export: Comma-separated format:bitrate targets for the final audio,
+                e.g. "mp3:128k,opus:64k,aac:96k". Supported formats are
+                mp3, opus and aac. Defaults to no export.
+        export_clips: If True, also export every clip to the targets.
+        profiling: If True, profile every pipeline stage with cProfile (and
+                   the sentence selection model with the torch profiler).
+                   The profiles are listed at
+                   /api/jobs/{pipeline_id}/profiles. Defaults to False.
+        wait: If True, respond once the pipeline has finished (or, for
+              previews, once the draft is ready). If False, respond
+              immediately after queueing the job.
+        pad_start: Padding in seconds before each clip. Defaults to 0.47.
+        pad_end: Padding in seconds after each clip. Defaults to 0.47.
+        fade_duration: Fade-in and fade-out of each clip in seconds.
+                       Defaults to 0.8.
+        merge_gap: Selected sentences closer than this (seconds) are merged
+                   into one clip. Defaults to 0.6.
+        top_k: The number of sentences selected. Defaults to 12.
+        silence_seconds: The pause between clips in seconds. Defaults to 1.
 
     Returns:
-        A dictionary containing the pipeline ID, the tone used, and the
-        result of the pipeline execution.
+        The options, with the export targets parsed and the render settings
+        completed with the defaults.
+
+    Raises:
+        HTTPException: If the profile, export targets or render settings are
+                       invalid.
     """
-    if not file.filename:
+    # Validate the transcription profile, export targets and render settings
+    # before accepting the upload
+    try:
+        get_transcription_profile(profile)
+        export_targets = parse_export_targets(export)
+        render = get_render_settings(
+            pad_start=pad_start,
+            pad_end=pad_end,
+            fade_duration=fade_duration,
+            merge_gap=merge_gap,
+            top_k=top_k,
+            silence_seconds=silence_seconds
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "tone": tone,
+        "streaming": streaming,
+        "preview": preview,
+        "profile": profile,
+        "language": language,
+        "export_targets": export_targets,
+        "export_clips": export_clips,
+        "profiling": profiling,
+        "render": render,
+        "wait": wait
+    }
+
+
+def _check_extension(filename: str):
+    if not filename:
         raise HTTPException(status_code=400, detail="No filename provided")
 
     # Check if the file extension is allowed
-    _, ext = os.path.splitext(file.filename)
+    _, ext = os.path.splitext(filename)
     if ext.lower() not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail=f"Unsupported file type: {ext}")
 
-    # Clean up runtime directories before processing a new file
-    _clean_runtime_before_upload()
+
+async def _submit_job(pipeline_id: str, dest_path: str, content_hash: str, options: dict):
+    """
+    Queues the pipeline for a fully received upload and responds to the
+    client (see _queue_job).
+
+    Args:
+        pipeline_id: The ID for the new job.
+        dest_path: The path of the uploaded file, inside its own directory
+                   under the input area.
+        content_hash: The SHA-256 hex digest of the file.
+        options: The submission options (see job_options).
+
+    Returns:
+        The response for the client.
+    """
+    duration = await _probe_upload(dest_path, options)
+    return await _queue_job(pipeline_id, dest_path, duration, content_hash, options)
+
+
+async def _probe_upload(dest_path: str, options: dict) -> float:
+    """
+    Probes the duration of an upload, used for the length limit and the cost
+    estimate.
+
+    Raises:
+        HTTPException: If the file is not valid audio or too long; the
+                       upload is then discarded.
+    """
+    max_duration = (
+        STREAMING_MAX_AUDIO_DURATION_SECONDS if options["streaming"]
+        else MAX_AUDIO_DURATION_SECONDS
+    )
+    try:
+        return await run_in_threadpool(
+            validate_audio_duration, dest_path, max_duration=max_duration
+        )
+    except RuntimeError as e:
+        _discard_input(dest_path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _discard_input(input_path: str):
+    # Removes an upload that is not needed (anymore); re-renders have none.
+    if input_path:
+        shutil.rmtree(os.path.dirname(input_path), ignore_errors=True)
+
+
+def _admit_job(
+    pipeline_id: str,
+    input_path: str,
+    duration: float,
+    content_hash: str,
+    params: dict,
+    fields: dict,
+    keep_rejected: bool = False
+):
+    """
+    Coalesces, registers and queues a job (see _queue_job).
+
+    Every step is a write transaction on the job database, which may wait
+    for the database lock held by workers, so this runs in the threadpool
+    instead of on the event loop.
+
+    Args:
+        pipeline_id: The ID for the new job.
+        input_path: The path of the uploaded file, or None for re-renders.
+        duration: The duration of the audio in seconds.
+        content_hash: The SHA-256 hex digest of the audio file.
+        params: The submission options without "wait".
+        fields: Additional fields stored with the job.
+        keep_rejected: If True, a job rejected by admission control keeps
+                       its upload and leaves no job record, so it can be
+                       submitted again under the same ID.
+
+    Returns:
+        A tuple of (response, done): the response for the client, and
+        whether it is final (a cached result or a rejection, the only
+        JSONResponse) rather than a job to report on or wait for.
+    """
+    # Attach to a matching running job, or reuse a recent matching result
+    key = submission_key(content_hash, **params)
+    outcome, job_id, cached_result = job_coalescer.claim(key, pipeline_id)
+    # A result without final audio (no sentences were selected) is still a
+    # valid result; one whose output file is gone is not.
+    final_audio = cached_result.get("final_audio") if outcome == "cached" else None
+    if final_audio is not None and not os.path.isfile(final_audio):
+        # The cached output is gone; run the pipeline again.
+        job_coalescer.invalidate(key)
+        outcome, job_id, cached_result = job_coalescer.claim(key, pipeline_id)
+
+    response = {
+        "pipeline_id": job_id,
+        "tone": params["tone"],
+        "profile": params["profile"],
+        "streaming": params["streaming"],
+        "preview": params["preview"],
+        "coalesced": outcome == "coalesced",
+        "cached": outcome == "cached"
+    }
+
+    if outcome != "started":
+        logger.info(f"[{pipeline_id}] Duplicate upload, reusing job {job_id} ({outcome})")
+        # The duplicate upload is not needed.
+        _discard_input(input_path)
+
+    if outcome == "cached":
+        return {**response, "status": "completed", "result": cached_result}, True
+
+    if outcome == "started":
+        job_registry.create(
+            pipeline_id,
+            tone=params["tone"],
+            streaming=params["streaming"],
+            preview=params["preview"],
+            profile=params["profile"],
+            profiling=params["profiling"],
+            language=params["language"],
+            render=params["render"],
+            content_hash=content_hash,
+            duration_seconds=duration,
+            **fields
+        )
+
+        # Queue the job for the pipeline workers (see worker.py). The payload
+        # holds the arguments of worker.run_job.
+        try:
+            job_scheduler.submit(
+                pipeline_id,
+                duration,
+                {"coalescing_key": key, "input_path": input_path, "content_hash": content_hash, **params},
+                preview=params["preview"]
+            )
+        except AdmissionRejected as e:
+            logger.info(f"[{pipeline_id}] Rejected: {e}")
+            job_coalescer.finish(key, pipeline_id)
+            if keep_rejected:
+                job_registry.delete(pipeline_id)
+            else:
+                job_registry.update(pipeline_id, error=str(e))
+                job_registry.publish(pipeline_id, "failed", {"error": str(e)})
+                _discard_input(input_path)
+            return JSONResponse(
+                status_code=429,
+                content={"detail": f"Server busy: {e}", "retry_after": e.retry_after},
+                headers={"Retry-After": str(e.retry_after)}
+            ), True
+
+    return response, False
+
+
+async def _queue_job(
+    pipeline_id: str,
+    input_path: str,
+    duration: float,
+    content_hash: str,
+    options: dict,
+    **fields
+):
+    """
+    Queues a pipeline run and responds to the client.
+
+    The job's cost is estimated from the audio duration. While the estimated
+    backlog is too large the job is rejected with 429 and a Retry-After
+    header. Admitted jobs are stored in the durable job queue, where pipeline
+    workers pick them up shortest-job-first.
+
+    Identical submissions (same audio content and parameters) are coalesced:
+    while a matching job is running, the submission attaches to it, and
+    shortly after a matching job has finished its result is returned
+    directly.
+
+    Args:
+        pipeline_id: The ID for the new job.
+        input_path: The path of the uploaded file, inside its own directory
+                    under the input area, or None when the job re-renders
+                    cached audio.
+        duration: The duration of the audio in seconds.
+        content_hash: The SHA-256 hex digest of the audio file.
+        options: The submission options (see job_options).
+        **fields: Additional fields stored with the job.
+
+    Returns:
+        The response for the client.
+    """
+    wait = options["wait"]
+    params = {name: value for name, value in options.items() if name != "wait"}
+
+    # The job database calls block; keep them off the event loop.
+    response, done = await run_in_threadpool(
+        _admit_job, pipeline_id, input_path, duration, content_hash, params, fields
+    )
+    if done:
+        return response
+    return await _job_response(response, wait)
+
+
+async def _job_response(response: dict, wait: bool) -> dict:
+    """
+    Completes the response for an admitted or coalesced job: its status and
+    event stream, or (if wait is set) its first usable result.
+    """
+    job_id = response["pipeline_id"]
+
+    if not wait:
+        job = await run_in_threadpool(job_registry.get, job_id)
+        return {
+            **response,
+            "status": job["status"],
+            "events": f"/api/jobs/{job_id}/events"
+        }
+
+    # Wait for the first usable result. A preview's full-quality run
+    # continues afterwards.
+    result = await _wait_for_result(job_id)
+
+    # Return the results of the pipeline
+    job = await run_in_threadpool(job_registry.get, job_id)
+    return {
+        **response,
+        "status": job["status"],
+        "result": result
+    }
+
+
+@router.post("/upload")
+async def upload_audio(file: UploadFile = File(...), options: dict = Depends(job_options)):
+    """
+    Handles audio file uploads. It validates the file, saves the uploaded
+    file, and then queues the processing pipeline (see _submit_job).
+
+    For large recordings, prefer the resumable upload API (/uploads), which
+    survives dropped connections and writes the file only once.
+
+    Progress of the job can be followed at /api/jobs/{pipeline_id}/events.
+
+    Args:
+        file: The audio file to upload.
+        options: The pipeline options given as query parameters (see
+                 job_options).
+
+    Returns:
+        A dictionary containing the pipeline ID, the tone used, and the
+        result of the pipeline execution (or the job status and event
+        stream URL when not waiting). "coalesced" and "cached" tell whether
+        an existing job was reused.
+    """
+    _check_extension(file.filename)
 
     # Generate a unique ID for the pipeline run
     pipeline_id = str(uuid.uuid4())
@@ -98,23 +439,473 @@ async def upload_audio(
     safe_filename = sanitize_filename(file.filename)
     dest_path = os.path.join(dest_dir, safe_filename)
 
-    # Save the uploaded file to the destination path
-    await save_upload_file(file, dest_path)
+    # Save the uploaded file to the destination path, hashing it on the way
+    hasher = hashlib.sha256()
+    await save_upload_file(file, dest_path, hasher=hasher)
 
     # Verify that the file was saved correctly
     if not os.path.isfile(dest_path):
         raise HTTPException(status_code=500, detail="Uploaded file missing after save")
 
-    # Run the processing pipeline with the uploaded file
-    result = controller.run_pipeline(
-        pipeline_id=pipeline_id,
-        input_path=dest_path,
-        tone=tone
+    return await _submit_job(pipeline_id, dest_path, hasher.hexdigest(), options)
+
+
+def _remove_expired_uploads():
+    # Delete the files of abandoned upload sessions.
+    for session in upload_sessions.remove_expired():
+        logger.info(f"[{session['upload_id']}] Removing expired upload session")
+        shutil.rmtree(os.path.dirname(session["path"]), ignore_errors=True)
+
+
+def _session_status(session: dict) -> dict:
+    return {
+        "upload_id": session["upload_id"],
+        "filename": session["filename"],
+        "size": session["size"],
+        "offset": session["offset"],
+        "complete": session["offset"] == session["size"],
+        "chunk_url": f"/api/uploads/{session['upload_id']}",
+        "finalize_url": f"/api/uploads/{session['upload_id']}/finalize"
+    }
+
+
+def _get_session(upload_id: str) -> dict:
+    session = upload_sessions.get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown upload_id")
+    return session
+
+
+@router.post("/uploads")
+def create_upload(filename: str, size: int, sha256: str = None):
+    """
+    Starts a resumable upload.
+
+    The file is then sent in chunks with PUT /api/uploads/{upload_id},
+    each starting at the committed offset. If the connection drops, query
+    the committed offset with HEAD or GET and continue from there. Finally,
+    POST /api/uploads/{upload_id}/finalize queues the pipeline.
+
+    Args:
+        filename: The name of the audio file.
+        size: The total size of the file in bytes.
+        sha256: Optional SHA-256 hex digest of the whole file, verified on
+                finalize (it can also be given to finalize).
+
+    Returns:
+        The session: upload_id, size, committed offset and the chunk and
+        finalize URLs.
+    """
+    _check_extension(filename)
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="size must be positive")
+    if sha256 is not None and not SHA256_PATTERN.fullmatch(sha256.lower()):
+        raise HTTPException(status_code=400, detail="sha256 must be a hex digest")
+
+    _remove_expired_uploads()
+
+    # The upload ID becomes the pipeline ID, so the file is written to its
+    # final input location right away and never moved.
+    upload_id = str(uuid.uuid4())
+    dest_dir = os.path.join(RUNTIME_DATA_INPUT, upload_id)
+    os.makedirs(dest_dir, exist_ok=True)
+    dest_path = os.path.join(dest_dir, sanitize_filename(filename))
+    open(dest_path, "wb").close()
+
+    session = upload_sessions.create(
+        upload_id, os.path.basename(dest_path), dest_path, size,
+        sha256=sha256.lower() if sha256 else None
     )
+    logger.info(f"[{upload_id}] Resumable upload started ({size} bytes)")
+    return _session_status(session)
 
-    # Return the results of the pipeline
+
+@router.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    """
+    Returns the state of a resumable upload, including its committed offset.
+    """
+    return _session_status(_get_session(upload_id))
+
+
+@router.head("/uploads/{upload_id}")
+def head_upload(upload_id: str):
+    """
+    Returns the committed offset and total size of a resumable upload in the
+    Upload-Offset and Upload-Length headers.
+    """
+    session = _get_session(upload_id)
+    return Response(headers={
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["size"]),
+        "Cache-Control": "no-store"
+    })
+
+
+@router.put("/uploads/{upload_id}")
+async def put_upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    chunk_sha256: str = Header(None, alias="X-Chunk-SHA256")
+):
+    """
+    Writes a chunk of a resumable upload.
+
+    The request body is streamed straight into the uploaded file at the
+    given offset, which must equal the committed offset. The committed
+    offset only advances once the whole chunk was received (and matched its
+    checksum, if given); an interrupted chunk is discarded and has to be
+    sent again.
+
+    Args:
+        upload_id: The ID of the upload session.
+        offset: The position of the chunk in the file.
+        request: The request, whose body is the chunk.
+        chunk_sha256: Optional SHA-256 hex digest of the chunk, sent in the
+                      X-Chunk-SHA256 header.
+
+    Returns:
+        The session with its new committed offset. A chunk at the wrong
+        offset is rejected with 409 and the committed offset.
+    """
+    # The session store's writes wait for the job database lock, so they
+    # run in the threadpool, like the file operations.
+    session = await run_in_threadpool(_get_session, upload_id)
+
+    try:
+        token = await run_in_threadpool(upload_sessions.begin_chunk, upload_id, offset)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown upload_id")
+    except UploadConflict as e:
+        return JSONResponse(
+            status_code=409,
+            content={"detail": str(e), "offset": e.offset},
+            headers={"Upload-Offset": str(e.offset)}
+        )
+
+    hasher = hashlib.sha256()
+    committed = False
+    try:
+        try:
+            length = await write_stream_at(
+                request.stream(),
+                session["path"],
+                offset,
+                max_bytes=session["size"] - offset,
+                hasher=hasher
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ClientDisconnect:
+            logger.info(f"[{upload_id}] Client disconnected during chunk at {offset}")
+            raise HTTPException(status_code=400, detail="Client disconnected")
+
+        if chunk_sha256 is not None and hasher.hexdigest() != chunk_sha256.lower():
+            raise HTTPException(status_code=422, detail="Chunk checksum mismatch")
+
+        try:
+            new_offset = await run_in_threadpool(
+                upload_sessions.commit_chunk, upload_id, token, length
+            )
+        except UploadConflict as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        committed = True
+    finally:
+        if not committed:
+            # Drop the partial chunk; the client resends it from the
+            # committed offset.
+            await run_in_threadpool(os.truncate, session["path"], offset)
+            await run_in_threadpool(upload_sessions.release_chunk, upload_id, token)
+
+    return {**_session_status({**session, "offset": new_offset}), "received": length}
+
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(
+    upload_id: str,
+    sha256: str = None,
+    options: dict = Depends(job_options)
+):
+    """
+    Completes a resumable upload and queues the pipeline.
+
+    The whole file is verified against the SHA-256 digest given here or when
+    the upload was created. The upload ID becomes the pipeline ID. If the
+    job is rejected because the server is busy (429), the upload is kept and
+    finalize can be retried after Retry-After.
+
+    Args:
+        upload_id: The ID of the upload session.
+        sha256: Optional SHA-256 hex digest of the whole file.
+        options: The pipeline options given as query parameters (see
+                 job_options).
+
+    Returns:
+        The same response as /api/upload.
+    """
+    session = await run_in_threadpool(_get_session, upload_id)
+    if session["offset"] != session["size"]:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {session['offset']} of {session['size']} bytes received"
+        )
+
+    # Hold the session like a chunk write, so chunks and a concurrent
+    # finalize are refused while this one runs.
+    try:
+        token = await run_in_threadpool(upload_sessions.begin_chunk, upload_id, session["size"])
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown upload_id")
+    except UploadConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    # The session ends once the job is admitted or the file is found
+    # invalid. Otherwise (rejected with 429, or an unexpected error) the
+    # file and session are kept, so finalize can be retried.
+    finished = False
+    try:
+        # The digest is needed for coalescing anyway; this is a read pass only.
+        content_hash = await run_in_threadpool(sha256_file, session["path"])
+        expected = (sha256 or session["sha256"] or "").lower()
+        if expected and content_hash != expected:
+            finished = True
+            shutil.rmtree(os.path.dirname(session["path"]), ignore_errors=True)
+            raise HTTPException(status_code=422, detail="File checksum mismatch; upload discarded")
+
+        try:
+            duration = await _probe_upload(session["path"], options)
+        except HTTPException:
+            finished = True
+            raise
+
+        params = {name: value for name, value in options.items() if name != "wait"}
+        response, done = await run_in_threadpool(
+            _admit_job, upload_id, session["path"], duration, content_hash, params, {}, True
+        )
+        finished = not isinstance(response, JSONResponse)
+    finally:
+        if finished:
+            await run_in_threadpool(upload_sessions.delete, upload_id)
+        else:
+            await run_in_threadpool(upload_sessions.release_chunk, upload_id, token)
+
+    if finished:
+        logger.info(f"[{upload_id}] Resumable upload finalized")
+    if done:
+        return response
+    return await _job_response(response, options["wait"])
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload(upload_id: str):
+    """
+    Aborts a resumable upload and deletes the received data.
+    """
+    session = _get_session(upload_id)
+    upload_sessions.delete(upload_id)
+    shutil.rmtree(os.path.dirname(session["path"]), ignore_errors=True)
+    return {"upload_id": upload_id, "status": "aborted"}
+
+
+@router.get("/jobs/{pipeline_id}")
+def get_job(pipeline_id: str):
+    """
+    Returns the current status of a job.
+
+    Args:
+        pipeline_id: The ID of the job.
+
+    Returns:
+        The job's status, current stage and, once finished, its result or error.
+    """
+    job = job_registry.get(pipeline_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown pipeline_id")
+    return job
+
+
+@router.post("/jobs/{pipeline_id}/render")
+async def render_job(
+    pipeline_id: str,
+    tone: str = None,
+    pad_start: float = None,
+    pad_end: float = None,
+    fade_duration: float = None,
+    merge_gap: float = None,
+    top_k: int = None,
+    silence_seconds: float = None,
+    export: str = "",
+    export_clips: bool = False,
+    profiling: bool = False,
+    wait: bool = True
+):
+    """
+    Renders a finished job again with different selection, cut or stitch
+    settings.
+
+    The re-render is a new job over the same audio. Its stages reuse the
+    cached outputs of the original job up to the first changed setting:
+    changing the padding, fades or pause only cuts and stitches again, while
+    changing top_k, merge_gap or the tone also selects the sentences again.
+    Transcription is always reused.
+
+    Args:
+        pipeline_id: The ID of the finished job.
+        tone: The tone for sentence selection. Defaults to the job's tone.
+        pad_start, pad_end, fade_duration, merge_gap, top_k,
+        silence_seconds: Render settings to change (see job_options);
+                         the others keep the job's values.
+        export: Comma-separated format:bitrate export targets.
+        export_clips: If True, also export every clip to the targets.
+        profiling: If True, profile the re-render's stages.
+        wait: If True, respond once the re-render has finished.
+
+    Returns:
+        The same response as /api/upload, for the new job.
+    """
+    source = job_registry.get(pipeline_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Unknown pipeline_id")
+    if source["status"] != "completed":
+        raise HTTPException(status_code=409, detail="Only completed jobs can be re-rendered")
+    if "content_hash" not in source:
+        raise HTTPException(status_code=409, detail="The job predates re-rendering support")
+
+    try:
+        export_targets = parse_export_targets(export)
+        render = get_render_settings(
+            source.get("render"),
+            pad_start=pad_start,
+            pad_end=pad_end,
+            fade_duration=fade_duration,
+            merge_gap=merge_gap,
+            top_k=top_k,
+            silence_seconds=silence_seconds
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    options = {
+        "tone": tone or source["tone"],
+        "streaming": source["streaming"],
+        "preview": False,
+        "profile": source["profile"],
+        "language": source.get("language"),
+        "export_targets": export_targets,
+        "export_clips": export_clips,
+        "profiling": profiling,
+        "render": render,
+        "wait": wait
+    }
+
+    render_id = str(uuid.uuid4())
+    logger.info(f"[{render_id}] Re-render of {pipeline_id} requested")
+    return await _queue_job(
+        render_id,
+        None,
+        source["duration_seconds"],
+        source["content_hash"],
+        options,
+        source=pipeline_id
+    )
+
+
+@router.get("/jobs/{pipeline_id}/events")
+async def job_events(pipeline_id: str):
+    """
+    Streams a job's progress as Server-Sent Events.
+
+    Events already recorded for the job are replayed first. The stream
+    carries "queued", "stage", "progress", "sentence", "redelivered" (the
+    job's worker died and another worker restarted it) and (for previews)
+    "draft" events and ends with a "completed" or "failed" event.
+
+    Args:
+        pipeline_id: The ID of the job.
+
+    Returns:
+        A text/event-stream response.
+    """
+    if job_registry.get(pipeline_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown pipeline_id")
+
+    async def stream():
+        async for event, data in job_registry.subscribe(
+            pipeline_id, keepalive=SSE_KEEPALIVE_SECONDS
+        ):
+            if event is None:
+                # Keep idle connections (e.g. during long stages) open.
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/jobs/{pipeline_id}/profiles")
+def get_job_profiles(pipeline_id: str):
+    """
+    Lists the profile artifacts of a job submitted with profiling=true.
+
+    Args:
+        pipeline_id: The ID of the job.
+
+    Returns:
+        A dictionary with the artifact names, e.g. "final/normalize.pstats"
+        (cProfile, readable with pstats or snakeviz) and
+        "final/sentence_selection.trace.json" (Chrome trace of the torch
+        profiler).
+    """
+    if job_registry.get(pipeline_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown pipeline_id")
+    return {"pipeline_id": pipeline_id, "profiles": list_profiles(pipeline_id)}
+
+
+@router.get("/jobs/{pipeline_id}/profiles/{name:path}")
+def download_job_profile(pipeline_id: str, name: str):
+    """
+    Downloads a profile artifact of a job.
+
+    Args:
+        pipeline_id: The ID of the job.
+        name: The artifact name as listed by /api/jobs/{pipeline_id}/profiles.
+
+    Returns:
+        The artifact file.
+    """
+    if job_registry.get(pipeline_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown pipeline_id")
+
+    path = resolve_profile(pipeline_id, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+
+    media_type = (
+        "application/octet-stream" if path.endswith(PSTATS_SUFFIX)
+        else "application/json" if path.endswith(".json")
+        else "text/plain"
+    )
+    return FileResponse(path, media_type=media_type, filename=name.replace("/", "_"))
+
+
+@router.get("/stats")
+def get_stats():
+    """
+    Returns service counters.
+
+    Returns:
+        A dictionary with the upload coalescing counters (jobs started,
+        uploads coalesced into running jobs, cached result hits) and the
+        queue state (queued and running jobs, active workers, backlog,
+        measured stage throughput and the utilization of each resource
+        class: ffmpeg, transcription and scoring).
+    """
     return {
-        "pipeline_id": pipeline_id,
-        "tone": tone,
-        "result": result
+        "coalescing": job_coalescer.stats(),
+        "scheduler": job_scheduler.stats()
     }
@@ -0,0 +1,149 @@
+"""
+Local throughput/accuracy benchmark for the transcription profiles.
+
+Transcribes reference audio with each profile and reports the real-time factor
+(processing seconds per second of audio; lower is faster) and the word error
+rate against a reference transcript. The reference is either a text file given
+with --reference-text or the output of --reference-profile.
+
+Usage (from the app directory, on a machine with a GPU):
+
+    python -m benchmarks.transcription_profiles episode.wav \\
+        --profiles default english fast --output-dir /runtime/benchmarks
+"""
+import argparse
+import difflib
+import os
+import time
+
+from config.transcription_profiles import TRANSCRIPTION_PROFILES, get_transcription_profile
+from models.whisper_loader import load_whisper_model
+from stages.preflight_validation.audio_duration_check import _ffprobe_duration
+from stages.transcription.whisper_stage import transcribe_options
+
+
+def _transcribe(audio_path: str, profile: dict):
+    """
+    Transcribes an audio file with a profile.
+
+    Returns:
+        A tuple of (text, load_seconds, transcribe_seconds).
+    """
+    started = time.monotonic()
+    model = load_whisper_model(profile["model_size"], profile["compute_type"])
+    load_seconds = time.monotonic() - started
+
+    started = time.monotonic()
+    segments, _ = model.transcribe(audio_path, **transcribe_options(profile))
+    # The generator decodes lazily, so consume it inside the timed block.
+    text = " ".join(s.text.strip() for s in segments if s.text.strip())
+    transcribe_seconds = time.monotonic() - started
+
+    return text, load_seconds, transcribe_seconds
+
+
+def _words(text: str) -> list:
+    return [w.strip(".,!?;:\"'()").lower() for w in text.split() if w.strip(".,!?;:\"'()")]
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Computes the word error rate of a hypothesis against a reference.
+
+    Punctuation and case are ignored. WER is the word-level edit distance
+    divided by the number of reference words.
+
+    Args:
+        reference: The reference transcript.
+        hypothesis: The transcript to evaluate.
+
+    Returns:
+        The word error rate (0.0 means identical).
+    """
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Levenshtein distance over words, keeping two rows of the DP table.
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,        # deletion
+                current[j - 1] + 1,     # insertion
+                previous[j - 1] + (ref_word != hyp_word)  # substitution
+            )
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def _write_outputs(output_dir: str, audio_path: str, profile_name: str, text: str, reference: str):
+    # Store each transcript and a word-level diff against the reference.
+    stem = os.path.splitext(os.path.basename(audio_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    with open(os.path.join(output_dir, f"{stem}.{profile_name}.txt"), "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+    diff = difflib.unified_diff(
+        _words(reference), _words(text),
+        fromfile="reference", tofile=profile_name, lineterm=""
+    )
+    with open(os.path.join(output_dir, f"{stem}.{profile_name}.diff"), "w", encoding="utf-8") as f:
+        f.write("\n".join(diff) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("audio", nargs="+", help="Reference audio files")
+    parser.add_argument(
+        "--profiles", nargs="+", default=list(TRANSCRIPTION_PROFILES),
+        help="Profiles to benchmark (default: all)"
+    )
+    parser.add_argument(
+        "--reference-profile", default="accurate",
+        help="Profile whose output is the reference when no text is given"
+    )
+    parser.add_argument(
+        "--reference-text", nargs="+",
+        help="Reference transcripts, one text file per audio file"
+    )
+    parser.add_argument("--language", help="Fixed language code for all profiles")
+    parser.add_argument("--output-dir", help="Directory for transcripts and diffs")
+    args = parser.parse_args(argv)
+
+    if args.reference_text and len(args.reference_text) != len(args.audio):
+        parser.error("--reference-text needs one file per audio file")
+
+    profiles = [get_transcription_profile(name, args.language) for name in args.profiles]
+
+    print(f"{'audio':<24} {'profile':<10} {'model':<10} {'beam':>4} "
+          f"{'load s':>7} {'xcribe s':>9} {'RTF':>6} {'WER':>6}")
+
+    for index, audio_path in enumerate(args.audio):
+        duration = _ffprobe_duration(audio_path)
+
+        if args.reference_text:
+            with open(args.reference_text[index], "r", encoding="utf-8") as f:
+                reference = f.read()
+        else:
+            reference_profile = get_transcription_profile(args.reference_profile, args.language)
+            reference, _, _ = _transcribe(audio_path, reference_profile)
+
+        for profile in profiles:
+            text, load_seconds, transcribe_seconds = _transcribe(audio_path, profile)
+            rtf = transcribe_seconds / duration if duration else 0.0
+            wer = word_error_rate(reference, text)
+
+            print(f"{os.path.basename(audio_path)[:24]:<24} {profile['name']:<10} "
+                  f"{profile['model_size']:<10} {profile['beam_size']:>4} "
+                  f"{load_seconds:>7.1f} {transcribe_seconds:>9.1f} {rtf:>6.3f} {wer:>6.1%}")
+
+            if args.output_dir:
+                _write_outputs(args.output_dir, audio_path, profile["name"], text, reference)
+
+
+if __name__ == "__main__":
+    main()
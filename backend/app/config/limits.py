@@ -1,2 +1,17 @@
 # 50 minutes in seconds
 MAX_AUDIO_DURATION_SECONDS = 50 * 60
+
+# Upper limit for the bounded-memory streaming mode (4 hours in seconds).
+# Streaming keeps memory constant, so the limit only bounds processing time.
+STREAMING_MAX_AUDIO_DURATION_SECONDS = 4 * 60 * 60
+
+# Length of the audio window decoded at once in streaming mode (seconds).
+STREAMING_WINDOW_SECONDS = 10 * 60
+
+# Segments ending within this many seconds of a window's end may be cut off
+# by it. They are dropped and decoded again at the start of the next window,
+# which begins where the last kept segment ended.
+STREAMING_WINDOW_OVERLAP_SECONDS = 5
+
+# Number of (query, sentence) pairs scored per Cross-Encoder batch in streaming mode.
+STREAMING_SCORING_CHUNK_SIZE = 256
@@ -9,7 +9,12 @@ RUNTIME_DATA_OUTPUT = os.path.join(RUNTIME_ROOT, "data", "output_podcast")
 RUNTIME_DATA_SENTENCE_SELECTION = os.path.join(
     RUNTIME_ROOT, "data", "sentence_selection"
 )
-RUNTIME_STATE_PATH = os.path.join(RUNTIME_ROOT, "state", "state.json")
+RUNTIME_DATA_PROFILES = os.path.join(RUNTIME_ROOT, "data", "profiles")
+RUNTIME_STATE_DIR = os.path.join(RUNTIME_ROOT, "state")
+RUNTIME_STATE_PATH = os.path.join(RUNTIME_STATE_DIR, "state.json")
+RUNTIME_QUEUE_DB = os.path.join(RUNTIME_ROOT, "queue", "jobs.db")
 RUNTIME_CACHE_MODELS = os.path.join(RUNTIME_ROOT, "cache", "models")
 RUNTIME_CACHE_TORCH = os.path.join(RUNTIME_ROOT, "cache", "torch")
-RUNTIME_LOGS_API = os.path.join(RUNTIME_ROOT, "logs", "api.log")
+RUNTIME_CACHE_STAGES = os.path.join(RUNTIME_ROOT, "cache", "stages")
+RUNTIME_FINGERPRINT_DB = os.path.join(RUNTIME_ROOT, "cache", "fingerprints.db")
+RUNTIME_LOGS_DIR = os.path.join(RUNTIME_ROOT, "logs")
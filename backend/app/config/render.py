@@ -0,0 +1,76 @@
+# Render parameters: how the selected sentences are chosen, cut and stitched.
+#
+# The values below are the defaults. Every parameter can be set per job, on
+# upload or when re-rendering a finished job (POST /api/jobs/{id}/render);
+# see get_render_settings.
+
+# Padding in seconds to add to the start and end of each clip.
+# This helps to preserve the full phonemes at the boundaries.
+PAD_START = 0.47   # seconds
+PAD_END = 0.47     # seconds
+
+# Duration of the fade-in and fade-out effects in seconds.
+# The default should not be changed to maintain audio quality.
+FADE_DURATION = 0.8
+
+# Maximum gap in seconds between two selected sentences to merge them into
+# one clip.
+MERGE_GAP = 0.6  # seconds
+
+# Number of top-scoring sentences selected.
+TOP_K = 12
+
+# Length of the silent pause inserted between stitched clips (seconds).
+SILENCE_SECONDS = 1.0
+
+# Allowed range of each render parameter, as (minimum, maximum).
+RENDER_LIMITS = {
+    "pad_start": (0.0, 5.0),
+    "pad_end": (0.0, 5.0),
+    "fade_duration": (0.0, 5.0),
+    "merge_gap": (0.0, 30.0),
+    "top_k": (1, 200),
+    "silence_seconds": (0.0, 10.0),
+}
+
+# Default settings, keyed like RENDER_LIMITS.
+DEFAULT_RENDER_SETTINGS = {
+    "pad_start": PAD_START,
+    "pad_end": PAD_END,
+    "fade_duration": FADE_DURATION,
+    "merge_gap": MERGE_GAP,
+    "top_k": TOP_K,
+    "silence_seconds": SILENCE_SECONDS,
+}
+
+
+def get_render_settings(base: dict = None, **overrides) -> dict:
+    """
+    Returns a complete set of render settings.
+
+    Args:
+        base: Optional settings to start from (e.g. those of the job being
+              re-rendered). Missing values fall back to the defaults.
+        **overrides: Settings replacing those of base; None values are
+                     ignored.
+
+    Returns:
+        A dictionary with every render parameter.
+
+    Raises:
+        ValueError: If a parameter is unknown or out of range.
+    """
+    settings = dict(DEFAULT_RENDER_SETTINGS)
+    for source in (base or {}, overrides):
+        for name, value in source.items():
+            if value is None:
+                continue
+            if name not in RENDER_LIMITS:
+                raise ValueError(f"Unknown render parameter: {name}")
+
+            low, high = RENDER_LIMITS[name]
+            if not low <= value <= high:
+                raise ValueError(f"{name} must be between {low} and {high}")
+            settings[name] = int(value) if name == "top_k" else float(value)
+
+    return settings
@@ -0,0 +1,80 @@
+# Named transcription profiles, selectable per request.
+#
+# model_size: faster-whisper model name.
+# beam_size: beam search width; 1 is greedy decoding.
+# language: fixed language code, or None to detect it (which decodes extra
+#           audio on every job).
+# compute_type: CTranslate2 precision of the model weights and activations.
+# condition_on_previous_text: feed the previous window's text as prompt;
+#                             more coherent, but slower and prone to loops.
+TRANSCRIPTION_PROFILES = {
+    "default": {
+        "model_size": "medium",
+        "beam_size": 5,
+        "language": None,
+        "compute_type": "int8_float16",
+        "condition_on_previous_text": True,
+    },
+    "english": {
+        "model_size": "medium",
+        "beam_size": 5,
+        "language": "en",
+        "compute_type": "int8_float16",
+        "condition_on_previous_text": True,
+    },
+    "fast": {
+        "model_size": "small",
+        "beam_size": 1,
+        "language": None,
+        "compute_type": "int8_float16",
+        "condition_on_previous_text": False,
+    },
+    "accurate": {
+        "model_size": "large-v3",
+        "beam_size": 5,
+        "language": None,
+        "compute_type": "float16",
+        "condition_on_previous_text": True,
+    },
+    # Used for the draft pass of preview jobs.
+    "preview": {
+        "model_size": "base",
+        "beam_size": 1,
+        "language": None,
+        "compute_type": "int8_float16",
+        "condition_on_previous_text": False,
+    },
+}
+
+# Profile used when a request does not name one.
+DEFAULT_TRANSCRIPTION_PROFILE = "default"
+
+# Profile used for the draft pass of preview jobs.
+PREVIEW_TRANSCRIPTION_PROFILE = "preview"
+
+
+def get_transcription_profile(name: str, language: str = None) -> dict:
+    """
+    Returns the settings of a transcription profile.
+
+    Args:
+        name: The profile name.
+        language: Optional language code overriding the profile's language.
+
+    Returns:
+        A copy of the profile settings, including its name.
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    if name not in TRANSCRIPTION_PROFILES:
+        raise ValueError(
+            f"Unknown transcription profile: {name} "
+            f"(available: {', '.join(TRANSCRIPTION_PROFILES)})"
+        )
+
+    profile = {"name": name, **TRANSCRIPTION_PROFILES[name]}
+    if language:
+        profile["language"] = language
+
+    return profile
@@ -0,0 +1,52 @@
+import os
+
+# Number of long-lived inference worker processes per model resource class.
+# Each process only loads the model of its class, so one job can be
+# transcribed while another job's sentences are scored, with still one copy
+# of each model on the GPU.
+INFERENCE_WORKERS = {
+    "transcription": 1,
+    "scoring": 1,
+}
+
+# A worker is restarted after this many jobs to bound memory fragmentation.
+INFERENCE_WORKER_MAX_JOBS = 50
+
+# A worker is restarted once its resident memory exceeds this limit (MB).
+INFERENCE_WORKER_MAX_RSS_MB = 8 * 1024
+
+# Pipeline worker processes the API starts next to itself. Set the
+# CLIPFORGE_EMBEDDED_WORKERS environment variable to 0 when dedicated workers
+# (python worker.py) run on other containers or nodes.
+EMBEDDED_PIPELINE_WORKERS = int(os.environ.get("CLIPFORGE_EMBEDDED_WORKERS", "1"))
+
+# A claimed job's lease; it is redelivered if no heartbeat renews it in time.
+JOB_LEASE_SECONDS = 60
+
+# Interval at which a worker renews the lease of the job it is running.
+JOB_HEARTBEAT_SECONDS = 15
+
+# A job is failed once it has been delivered this many times without
+# finishing, e.g. because it keeps crashing its worker.
+JOB_MAX_ATTEMPTS = 3
+
+# How long an idle worker waits before polling the queue again.
+WORKER_POLL_SECONDS = 1.0
+
+# Jobs a pipeline worker runs at the same time. Their stages share the
+# worker's resource classes (see pipeline/executor.py), so with one job per
+# class every resource can be busy with a different job.
+PIPELINE_JOB_SLOTS = 3
+
+# Stages of each resource class a pipeline worker runs at the same time.
+# "ffmpeg" covers validation, normalization, cutting, stitching and export;
+# the ffmpeg processes themselves are further capped by FFMPEG_CONCURRENCY.
+# The model classes match their inference worker processes.
+STAGE_WORKERS = {
+    "ffmpeg": 2,
+    "transcription": INFERENCE_WORKERS["transcription"],
+    "scoring": INFERENCE_WORKERS["scoring"],
+}
+
+# Interval at which pipeline workers report their resource utilization.
+RESOURCE_REPORT_SECONDS = 15
@@ -1,6 +1,11 @@
+import os
+import subprocess
+import sys
+
 from fastapi import FastAPI
 from api.routes import router as api_router
-from utils.logger import setup_logging
+from config.workers import EMBEDDED_PIPELINE_WORKERS
+from utils.logger import logger, setup_logging
 
 setup_logging()
 
@@ -8,6 +13,37 @@ app = FastAPI(title="ClipForge Backend - Whisper Pipeline")
 
 app.include_router(api_router, prefix="/api")
 
+# Pipeline worker processes started next to the API.
+_embedded_workers = []
+
+
+@app.on_event("startup")
+def startup():
+    # Start pipeline workers next to the API, so a single container processes
+    # jobs on its own. Dedicated workers can run anywhere /runtime is shared.
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    for _ in range(EMBEDDED_PIPELINE_WORKERS):
+        _embedded_workers.append(
+            subprocess.Popen([sys.executable, "worker.py"], cwd=app_dir)
+        )
+    if _embedded_workers:
+        logger.info(f"Started {len(_embedded_workers)} embedded pipeline workers")
+
+
+@app.on_event("shutdown")
+def shutdown():
+    # Stop the embedded workers. A job that does not finish within the
+    # timeout is killed and redelivered to another worker.
+    for proc in _embedded_workers:
+        proc.terminate()
+    for proc in _embedded_workers:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    _embedded_workers.clear()
+
 
 @app.get("/health")
 def health():
@@ -0,0 +1,283 @@
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+
+from config.workers import (
+    INFERENCE_WORKERS,
+    INFERENCE_WORKER_MAX_JOBS,
+    INFERENCE_WORKER_MAX_RSS_MB,
+)
+from utils.logger import child_log_queue, logger
+
+
+# CUDA cannot be re-initialized in a forked child, so workers are spawned.
+_mp = multiprocessing.get_context("spawn")
+
+
+def _rss_mb() -> float:
+    """
+    Returns the resident memory of the current process in MB (Linux only).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _run_transcription(state: dict, **kwargs):
+    from stages.transcription.whisper_stage import run_whisper_transcription
+    return run_whisper_transcription(state=state, **kwargs)
+
+
+def _run_sentence_selection(state: dict, **kwargs):
+    from stages.sentence_selection.cross_encoder_stage import run_sentence_selection
+    return run_sentence_selection(state=state, **kwargs)
+
+
+# Tasks a worker can execute. Stage modules are imported inside the worker
+# only, so the API process never loads torch or the models.
+TASKS = {
+    "transcription": _run_transcription,
+    "sentence_selection": _run_sentence_selection,
+}
+
+# Tasks whose models run on torch and are traced with the torch profiler
+# when profiling. Whisper runs on CTranslate2, which the torch profiler
+# cannot see, so transcription is profiled with cProfile only.
+TORCH_TASKS = {"sentence_selection"}
+
+# Resource class of each task (see config.workers.INFERENCE_WORKERS). Every
+# class has its own worker processes, which only load the models of their
+# tasks.
+TASK_RESOURCES = {
+    "transcription": "transcription",
+    "sentence_selection": "scoring",
+}
+
+
+def _worker_main(conn, log_queue):
+    """
+    Entry point of an inference worker process.
+
+    Receives (task, state, kwargs, stream_events, profile_dir) requests over
+    the pipe and replies with ("result", result, state, rss_mb) or ("error",
+    message, traceback). When stream_events is set, the stage also gets an
+    `on_event` callback whose payloads are sent as ("event", payload)
+    messages before the final reply. When profile_dir is set, the task is
+    profiled into that directory. Models stay loaded in the process between
+    requests. A None request shuts the worker down.
+
+    Args:
+        conn: The worker end of the multiprocessing pipe.
+        log_queue: The queue the parent process writes this worker's log
+                   records from (see utils.logger.child_log_queue).
+    """
+    from utils.logger import log_context, setup_logging
+    from utils.profiling import profile_model_stage
+    setup_logging(log_queue=log_queue)
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+
+        if request is None:
+            break
+
+        task, state, kwargs, stream_events, profile_dir = request
+        if stream_events:
+            kwargs["on_event"] = lambda payload: conn.send(("event", payload))
+
+        try:
+            with log_context(job_id=state.get("pipeline_id"), stage=task), \
+                    profile_model_stage(profile_dir, task, torch_ops=task in TORCH_TASKS):
+                result = TASKS[task](state, **kwargs)
+            conn.send(("result", result, state, _rss_mb()))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+
+    conn.close()
+
+
+class InferenceWorker:
+    """
+    A single long-lived inference process and the pipe used to talk to it.
+
+    The process is restarted after INFERENCE_WORKER_MAX_JOBS jobs, when its
+    resident memory passes INFERENCE_WORKER_MAX_RSS_MB, or when it dies.
+    """
+    def __init__(self, name: str):
+        """
+        Initializes the worker handle. The process is started lazily.
+
+        Args:
+            name: The name of the worker (resource class and position in
+                  the pool), used in logs.
+        """
+        self.name = name
+        self._process = None
+        self._conn = None
+        self._jobs = 0
+
+    def _start(self):
+        parent_conn, child_conn = _mp.Pipe()
+        self._process = _mp.Process(
+            target=_worker_main,
+            args=(child_conn, child_log_queue()),
+            name=f"inference-worker-{self.name}",
+            daemon=True
+        )
+        self._process.start()
+        # The child owns its end of the pipe now.
+        child_conn.close()
+        self._conn = parent_conn
+        self._jobs = 0
+        logger.info(f"Started inference worker {self.name} (pid {self._process.pid})")
+
+    def stop(self):
+        """
+        Asks the worker process to exit, killing it if it does not.
+        """
+        if self._process is None:
+            return
+
+        try:
+            self._conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def run(self, task: str, state: dict, on_event=None, profile_dir: str = None, **kwargs):
+        """
+        Runs a task in the worker process and waits for its reply.
+
+        Args:
+            task: The name of the task (see TASKS).
+            state: The current pipeline state dictionary.
+            on_event: Optional callback receiving the progress payloads the
+                      stage emits while it runs.
+            profile_dir: If set, profile the task in the worker and write the
+                         profiles to this directory (see utils.profiling).
+            **kwargs: Keyword arguments passed to the stage function.
+
+        Returns:
+            A tuple of (result, state), where state is the copy updated by
+            the stage in the worker.
+
+        Raises:
+            RuntimeError: If the task fails or the worker process dies.
+        """
+        if self._process is None or not self._process.is_alive():
+            self._start()
+
+        try:
+            self._conn.send((task, state, kwargs, on_event is not None, profile_dir))
+            reply = self._conn.recv()
+            while reply[0] == "event":
+                try:
+                    on_event(reply[1])
+                except Exception:
+                    logger.exception("Inference event callback failed")
+                reply = self._conn.recv()
+        except (EOFError, BrokenPipeError, OSError):
+            exitcode = self._process.exitcode
+            self.stop()
+            raise RuntimeError(
+                f"Inference worker {self.name} died during {task} (exit code {exitcode})"
+            )
+
+        self._jobs += 1
+
+        if reply[0] == "error":
+            _, message, tb = reply
+            logger.error(f"Inference worker {self.name} failed {task}:\n{tb}")
+            raise RuntimeError(message)
+
+        _, result, new_state, rss_mb = reply
+
+        # Recycle the worker instead of fighting fragmentation in-process.
+        if self._jobs >= INFERENCE_WORKER_MAX_JOBS or rss_mb > INFERENCE_WORKER_MAX_RSS_MB:
+            logger.info(
+                f"Recycling inference worker {self.name} "
+                f"after {self._jobs} jobs ({rss_mb:.0f} MB resident)"
+            )
+            self.stop()
+
+        return result, new_state
+
+
+class InferenceWorkerPool:
+    """
+    Fixed-size sets of inference workers, one per resource class, shared by
+    all pipeline runs.
+    """
+    def __init__(self, sizes: dict = INFERENCE_WORKERS):
+        """
+        Initializes the pool. Worker processes start on first use.
+
+        Args:
+            sizes: The number of worker processes of each resource class.
+        """
+        self._workers = []
+        self._idle = {}
+        for resource, size in sizes.items():
+            self._idle[resource] = queue.Queue()
+            for i in range(size):
+                worker = InferenceWorker(f"{resource}-{i}")
+                self._workers.append(worker)
+                self._idle[resource].put(worker)
+
+    def run(self, task: str, state: dict, on_event=None, profile_dir: str = None, **kwargs):
+        """
+        Runs a task on the next idle worker of its resource class, blocking
+        until one is free.
+
+        See InferenceWorker.run for arguments and return value.
+        """
+        idle = self._idle[TASK_RESOURCES[task]]
+        worker = idle.get()
+        try:
+            return worker.run(task, state, on_event=on_event, profile_dir=profile_dir, **kwargs)
+        finally:
+            idle.put(worker)
+
+    def shutdown(self):
+        """
+        Stops all worker processes.
+        """
+        for worker in self._workers:
+            worker.stop()
+
+
+# Global pool instance, created on first use.
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_inference_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InferenceWorkerPool()
+
+    return _pool
+
+
+def shutdown_inference_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
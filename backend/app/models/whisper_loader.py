@@ -1 +1,33 @@
-# loader is embedded into whisper_stage; keep this file as placeholder for future abstraction
+import gc
+
+
+# The Whisper model loaded in this process, as ((model_size, compute_type),
+# model). Inference workers are long-lived, so the model is loaded once per
+# worker process and reused across jobs. Only the most recently used model
+# is kept: jobs can ask for different transcription profiles, and every
+# loaded model holds its own GPU memory, which the RSS-based worker
+# recycling does not see. Switching profiles therefore reloads the model.
+_model = None
+
+def load_whisper_model(model_size: str = "medium", compute_type: str = "int8_float16"):
+    global _model
+    key = (model_size, compute_type)
+    if _model is None or _model[0] != key:
+        if _model is not None:
+            # Release the previous model's GPU memory before loading the next.
+            _model = None
+            gc.collect()
+
+        # Load the faster-whisper model. Imported here so modules using the
+        # loader (and their pure helpers) import without the model stack.
+        from faster_whisper import WhisperModel
+
+        _model = (key, WhisperModel(
+            model_size,
+            device="cuda",
+            compute_type=compute_type,
+            cpu_threads=4,
+            num_workers=1
+        ))
+
+    return _model[1]
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+import time
+
+from config.paths import RUNTIME_QUEUE_DB
+from pipeline.db import connect
+
+
+# How long a finished job's result is reused for identical submissions.
+RESULT_CACHE_TTL_SECONDS = 60 * 60
+
+# Maximum number of finished results kept for reuse.
+RESULT_CACHE_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    key TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    result TEXT,
+    finished_at REAL
+);
+"""
+
+
+class JobCoalescer:
+    """
+    Single-flight coalescing of identical pipeline submissions.
+
+    A submission is identified by a key built from the content hash of the
+    upload and the pipeline parameters. While a job with the same key is
+    running, new submissions attach to it instead of starting another run.
+    Once it has finished successfully, its result is reused for a while.
+
+    Running and finished submissions are kept in the shared job database, so
+    the worker that finishes a job releases it for every API process.
+    """
+    def __init__(self, db_path: str = RUNTIME_QUEUE_DB):
+        """
+        Initializes the coalescer.
+
+        Args:
+            db_path: The path of the job database.
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Counters of this process's submissions.
+        self._stats = {"started": 0, "coalesced": 0, "cache_hits": 0}
+
+    def _connect(self, write: bool = False):
+        return connect(_SCHEMA, self.db_path, write=write)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def claim(self, key: str, pipeline_id: str):
+        """
+        Registers a submission, or finds the job it should reuse.
+
+        Args:
+            key: The submission key (see submission_key).
+            pipeline_id: The ID a new job would get.
+
+        Returns:
+            A tuple of (outcome, pipeline_id, result) where outcome is
+            "started" (the caller must run pipeline_id), "coalesced" (attach
+            to the running job pipeline_id) or "cached" (result is the
+            finished job's result).
+        """
+        now = time.time()
+        with self._connect(write=True) as conn:
+            row = conn.execute("SELECT * FROM submissions WHERE key = ?", (key,)).fetchone()
+
+            if row is not None and row["finished_at"] is not None:
+                if now - row["finished_at"] <= RESULT_CACHE_TTL_SECONDS:
+                    self._count("cache_hits")
+                    return "cached", row["job_id"], json.loads(row["result"])
+                row = None
+
+            if row is not None:
+                self._count("coalesced")
+                return "coalesced", row["job_id"], None
+
+            conn.execute(
+                "INSERT OR REPLACE INTO submissions (key, job_id) VALUES (?, ?)",
+                (key, pipeline_id)
+            )
+
+        self._count("started")
+        return "started", pipeline_id, None
+
+    def finish(self, key: str, pipeline_id: str, result: dict = None):
+        """
+        Marks a job as finished, caching its result if it succeeded.
+
+        Args:
+            key: The submission key the job was started with.
+            pipeline_id: The ID of the finished job.
+            result: The job's result, or None if it failed.
+        """
+        with self._connect(write=True) as conn:
+            if result is None:
+                conn.execute(
+                    "DELETE FROM submissions WHERE key = ? AND job_id = ? AND finished_at IS NULL",
+                    (key, pipeline_id)
+                )
+                return
+
+            conn.execute(
+                "INSERT OR REPLACE INTO submissions (key, job_id, result, finished_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, pipeline_id, json.dumps(result), time.time())
+            )
+            conn.execute(
+                "DELETE FROM submissions WHERE key IN ("
+                "SELECT key FROM submissions WHERE finished_at IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+                (RESULT_CACHE_SIZE,)
+            )
+
+    def invalidate(self, key: str):
+        """
+        Drops a cached result, e.g. when its output files are gone.
+        """
+        with self._connect(write=True) as conn:
+            conn.execute(
+                "DELETE FROM submissions WHERE key = ? AND finished_at IS NOT NULL", (key,)
+            )
+
+    def stats(self) -> dict:
+        """
+        Returns this process's submission counters and the current number of
+        running and cached submissions.
+        """
+        with self._connect() as conn:
+            inflight, cached = conn.execute(
+                "SELECT COUNT(*) - COUNT(finished_at), COUNT(finished_at) FROM submissions"
+            ).fetchone()
+
+        with self._lock:
+            return {
+                **self._stats,
+                "inflight": inflight,
+                "cached_results": cached
+            }
+
+
+def submission_key(content_hash: str, **params) -> str:
+    """
+    Builds the coalescing key for a submission.
+
+    Args:
+        content_hash: The SHA-256 hex digest of the uploaded file.
+        **params: The pipeline parameters that affect the result.
+
+    Returns:
+        A string key.
+    """
+    canonical = repr((content_hash,) + tuple(
+        (name, repr(value)) for name, value in sorted(params.items())
+    ))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# Global coalescer shared by the API and the pipeline workers.
+job_coalescer = JobCoalescer()
@@ -1,11 +1,11 @@
+import json
 import os
-import gc
 import shutil
-import torch
+import time
 from pathlib import Path
 
 from config.paths import (
-    RUNTIME_STATE_PATH,
+    RUNTIME_STATE_DIR,
     RUNTIME_DATA_INPUT,
     RUNTIME_DATA_NORMALIZED,
     RUNTIME_DATA_OUTPUT,
@@ -13,70 +13,506 @@ from config.paths import (
     RUNTIME_DATA_SENTENCE_SELECTION,
 )
 
+from config.limits import (
+    MAX_AUDIO_DURATION_SECONDS,
+    STREAMING_MAX_AUDIO_DURATION_SECONDS,
+)
+from config.render import get_render_settings
+from config.transcription_profiles import (
+    DEFAULT_TRANSCRIPTION_PROFILE,
+    PREVIEW_TRANSCRIPTION_PROFILE,
+    get_transcription_profile,
+)
+
 from stages.audio_cutting.cut import cut_audio
 from stages.audio_stitching.stitch import stitch_audio
+from stages.audio_export.export import export_audio
+from stages.fingerprint.fingerprint import compute_fingerprint
+from stages.transcription.transcript_store import TranscriptReader, export_json, shift_transcript
 
+from pipeline.fingerprint_index import fingerprint_index
+from pipeline.stage_cache import stage_cache, stage_key
 from pipeline.state_manager import StateManager
 from stages.preflight_validation.audio_duration_check import validate_audio_duration
 from stages.audio_normalization.normalize import normalize_audio
-from stages.transcription.whisper_stage import run_whisper_transcription
-from stages.sentence_selection.cross_encoder_stage import run_sentence_selection
+from models.inference_worker import get_inference_pool
+
+from utils.file_io import sha256_file
+from utils.logger import logger, set_log_stage
+from utils.profiling import profile_dir_for, profile_stage
+
+
+# Minimum interval between progress events of a single FFmpeg stage.
+PROGRESS_EVENT_INTERVAL = 1.0  # seconds
+
+# Minimum interval between progress log lines of a single FFmpeg stage.
+PROGRESS_LOG_INTERVAL = 5.0  # seconds
+
+
+def _progress_reporter(
+    pipeline_id: str,
+    stage: str,
+    total_seconds: float = None,
+    on_event=None
+):
+    """
+    Creates an FFmpeg progress callback that reports a stage's progress.
+
+    Progress is published as "progress" events (if on_event is given) and
+    logged, each throttled to its own interval.
+
+    Args:
+        pipeline_id: The ID of the pipeline run, used as log prefix.
+        stage: The name of the stage reporting progress.
+        total_seconds: The expected output duration, if known, used to
+                       report a percentage.
+        on_event: Optional callback receiving (event, data) pairs.
+
+    Returns:
+        A callback suitable for the `on_progress` argument of FFmpeg stages.
+    """
+    last_event = 0.0
+    last_logged = 0.0
 
-from utils.logger import logger
+    def on_progress(progress: dict):
+        nonlocal last_event, last_logged
+        now = time.monotonic()
+        done = progress["out_time"]
+        pct = min(100.0, 100.0 * done / total_seconds) if total_seconds else None
 
+        if on_event is not None and (
+            progress["done"] or now - last_event >= PROGRESS_EVENT_INTERVAL
+        ):
+            last_event = now
+            on_event("progress", {"stage": stage, "seconds": done, "percent": pct})
 
-def _cleanup_after_success():
+        if progress["done"] or now - last_logged >= PROGRESS_LOG_INTERVAL:
+            last_logged = now
+            # Runs on the FFmpeg runner thread, outside the job's log context.
+            extra = {"job_id": pipeline_id, "stage": stage}
+            if pct is not None:
+                logger.info(f"[{pipeline_id}] {stage}: {pct:.0f}% ({progress['speed']})", extra=extra)
+            else:
+                logger.info(
+                    f"[{pipeline_id}] {stage}: {done:.0f}s written ({progress['speed']})",
+                    extra=extra
+                )
+
+    return on_progress
+
+
+def _job_scratch_paths(pipeline_id: str) -> list:
     """
-    Removes temporary runtime directories after a successful pipeline run.
-    This helps to keep the filesystem clean.
+    Returns the scratch files and directories of a pipeline run.
+
+    Every run keeps its intermediate files under its own names, so runs on
+    several workers sharing /runtime do not touch each other's data.
     """
-    for path in [
-        RUNTIME_DATA_INPUT,
-        RUNTIME_DATA_NORMALIZED,
-        RUNTIME_DATA_CLIPS,
-        RUNTIME_DATA_SENTENCE_SELECTION,
-        os.path.dirname(RUNTIME_STATE_PATH),
-    ]:
-        if os.path.exists(path):
+    return [
+        os.path.join(RUNTIME_DATA_NORMALIZED, f"{pipeline_id}.wav"),
+        os.path.join(RUNTIME_DATA_CLIPS, pipeline_id),
+        os.path.join(RUNTIME_DATA_SENTENCE_SELECTION, f"{pipeline_id}_sentences.json"),
+        os.path.join(RUNTIME_STATE_DIR, pipeline_id),
+    ]
+
+
+def _remove_paths(paths: list):
+    for path in paths:
+        if os.path.isdir(path):
             shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def _clean_runtime_before_run(pipeline_id: str):
+    """
+    Removes scratch data left behind by an earlier attempt of the same run,
+    e.g. one whose worker died and whose job was redelivered.
+    """
+    _remove_paths(_job_scratch_paths(pipeline_id))
+
+
+def _cleanup_after_success(pipeline_id: str, input_path: str, keep_input: bool = False):
+    """
+    Removes a run's temporary files after it succeeded. This helps to keep
+    the filesystem clean.
+
+    Only this run's upload directory is removed from the input area, since
+    other uploads may be waiting for their turn.
+
+    Args:
+        pipeline_id: The ID of the pipeline run.
+        input_path: The path to this run's uploaded input file, or None if
+                    the run had none (re-renders).
+        keep_input: If True, keep the upload (e.g. for a follow-up run).
+    """
+    paths = _job_scratch_paths(pipeline_id)
+
+    if input_path and not keep_input:
+        input_dir = os.path.dirname(os.path.abspath(input_path))
+        if os.path.dirname(input_dir) == os.path.abspath(RUNTIME_DATA_INPUT):
+            paths.append(input_dir)
+
+    _remove_paths(paths)
+
+
+def _transcription_key(normalize_key: str, profile: str, language: str, streaming: bool) -> str:
+    """
+    Returns the stage cache key of a transcript of normalized audio.
+    """
+    return stage_key(
+        "transcription",
+        normalize_key,
+        settings=get_transcription_profile(profile, language),
+        streaming=streaming
+    )
+
+
+def _selection_key(transcription_key: str, tone: str, settings: dict) -> str:
+    """
+    Returns the stage cache key of a sentence selection from a transcript.
+    """
+    return stage_key(
+        "selection",
+        transcription_key,
+        tone=tone,
+        top_k=settings["top_k"],
+        merge_gap=settings["merge_gap"]
+    )
+
+
+def _reuse_transcript(pipeline_id: str, match: dict, source: dict, duration: float, key: str):
+    """
+    Stores the transcript of a matched recording, shifted by the match
+    offset, as this recording's transcript in the stage cache.
+
+    Args:
+        pipeline_id: The ID of the pipeline run.
+        match: The fingerprint match (see FingerprintIndex.match).
+        source: The cached transcription entry of the matched recording.
+        duration: The duration of this recording in seconds.
+        key: This recording's transcription key.
+
+    Returns:
+        A tuple of (entry, kept): the new cache entry and the source index
+        of every sentence kept (see shift_transcript).
+    """
+    scratch = os.path.join(RUNTIME_STATE_DIR, pipeline_id)
+    os.makedirs(scratch, exist_ok=True)
+    transcript_name = source["meta"]["transcript"]
+    export_name = source["meta"]["export"]
+    transcript = os.path.join(scratch, transcript_name)
+    export = os.path.join(scratch, export_name)
+
+    kept = shift_transcript(
+        source["files"][transcript_name], transcript, match["offset_seconds"], duration
+    )
+
+    if export_name.endswith(".jsonl"):
+        # Streaming runs export JSON Lines.
+        with TranscriptReader(transcript) as reader, open(export, "w", encoding="utf-8") as f:
+            for sentence in reader.iter_sentences():
+                f.write(json.dumps(sentence, ensure_ascii=False) + "\n")
+    else:
+        with open(source["files"][export_name], "r", encoding="utf-8") as f:
+            metadata = {k: v for k, v in json.load(f).items() if k != "sentences"}
+        export_json(transcript, export, metadata={**metadata, "fingerprint_match": match})
+
+    entry = stage_cache.put(
+        "transcription",
+        key,
+        {transcript_name: transcript, export_name: export},
+        transcript=transcript_name,
+        export=export_name,
+        fingerprint_match=match
+    )
+    return entry, kept
+
+
+def _reuse_selection(
+    pipeline_id: str,
+    match: dict,
+    source: dict,
+    duration: float,
+    kept,
+    key: str
+):
+    """
+    Stores the sentence selection of a matched recording, shifted by the
+    match offset, as this recording's selection in the stage cache.
+
+    The selection is only reused if every selected sentence lies within
+    this recording; otherwise the shifted transcript is scored again.
+
+    Args:
+        pipeline_id: The ID of the pipeline run.
+        match: The fingerprint match (see FingerprintIndex.match).
+        source: The cached selection entry of the matched recording.
+        duration: The duration of this recording in seconds.
+        kept: The source index of every sentence of the shifted transcript.
+        key: This recording's selection key.
+
+    Returns:
+        True if the selection was reused.
+    """
+    with open(source["files"]["sentences.json"], "r", encoding="utf-8") as f:
+        selection = json.load(f)
+
+    offset = match["offset_seconds"]
+    positions = {int(old): new for new, old in enumerate(kept)}
+    if not all(
+        s["id"] in positions and s["start"] + offset >= 0 and s["end"] + offset <= duration
+        for s in selection["sentences"]
+    ):
+        return False
+
+    selection["pipeline_id"] = pipeline_id
+    selection["fingerprint_match"] = match
+    selection["sentences"] = [
+        {**s, "id": positions[s["id"]], "start": s["start"] + offset, "end": s["end"] + offset}
+        for s in selection["sentences"]
+    ]
+
+    os.makedirs(RUNTIME_DATA_SENTENCE_SELECTION, exist_ok=True)
+    out_path = os.path.join(RUNTIME_DATA_SENTENCE_SELECTION, f"{pipeline_id}_sentences.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(selection, f, indent=2, ensure_ascii=False)
+
+    stage_cache.put("selection", key, {"sentences.json": out_path})
+    return True
+
+
+def _reuse_by_fingerprint(
+    pipeline_id: str,
+    normalize_key: str,
+    normalized_path: str,
+    duration: float,
+    profile: str,
+    language: str,
+    streaming: bool,
+    tone: str,
+    settings: dict
+):
+    """
+    Looks up a recording by its acoustic fingerprint and reuses the outputs
+    of a near-identical earlier recording (see pipeline.fingerprint_index).
+
+    The recording is fingerprinted and indexed (once; later runs on it read
+    the stored fingerprint). If a match with the same transcription
+    settings is cached, its transcript, and its selection for the same tone
+    and settings if cached, are stored under this recording's keys with
+    their times shifted by the match offset. Errors are logged and treated
+    as no match, since the pipeline can always transcribe instead.
+
+    Args:
+        pipeline_id: The ID of the pipeline run.
+        normalize_key: The stage key of the normalized audio.
+        normalized_path: The path to the normalized audio.
+        duration: The duration of the audio in seconds.
+        profile: The name of the transcription profile.
+        language: Optional fixed language code for transcription.
+        streaming: Whether the run uses the streaming mode.
+        tone: The tone for sentence selection.
+        settings: The render settings.
+
+    Returns:
+        The match whose outputs were reused, or None.
+    """
+    try:
+        fingerprint = fingerprint_index.get(normalize_key)
+        if fingerprint is None:
+            fingerprint = compute_fingerprint(normalized_path)
+            fingerprint_index.add(normalize_key, duration, *fingerprint)
+
+        for match in fingerprint_index.match(*fingerprint, duration, exclude=normalize_key):
+            source_key = _transcription_key(match["recording"], profile, language, streaming)
+            source = stage_cache.get("transcription", source_key)
+            if source is None:
+                continue
+
+            transcription_key = _transcription_key(normalize_key, profile, language, streaming)
+            _, kept = _reuse_transcript(pipeline_id, match, source, duration, transcription_key)
+
+            source = stage_cache.get("selection", _selection_key(source_key, tone, settings))
+            if source is not None:
+                match["selection_reused"] = _reuse_selection(
+                    pipeline_id, match, source, duration, kept,
+                    _selection_key(transcription_key, tone, settings)
+                )
+
+            logger.info(
+                f"[{pipeline_id}] Reusing outputs of fingerprint match {match['recording'][:12]} "
+                f"(offset {match['offset_seconds']:+.2f}s, {match['matched_hashes']} hashes)"
+            )
+            return match
+    except Exception as e:
+        logger.warning(f"[{pipeline_id}] Fingerprint lookup failed: {e}")
+
+    return None
 
 
 class PipelineController:
     """
     Manages the execution of the audio processing pipeline.
     """
-    def __init__(self):
+    def __init__(self, executor=None):
+        """
+        Initializes the PipelineController.
+
+        Model inference (transcription and sentence selection) runs in the
+        shared pool of long-lived inference worker processes.
+
+        Args:
+            executor: Optional StageExecutor (see pipeline.executor) that
+                      runs each stage on the queue of its resource class,
+                      so stages of concurrent runs overlap. Without one,
+                      stages run in the calling thread.
         """
-        Initializes the PipelineController, setting up the state manager.
+        self.inference_pool = get_inference_pool()
+        self.executor = executor
+
+    def _on_resource(self, resource: str, fn):
+        """
+        Runs a stage function on its resource class and returns its result.
+        """
+        if self.executor is None:
+            return fn()
+        return self.executor.run(resource, fn)
+
+    def _set_stage(self, state_manager: StateManager, state: dict, stage: str, on_event=None):
+        """
+        Records a stage transition in the run's state file and publishes it.
+
+        Args:
+            state_manager: The state manager of the run.
+            state: The current pipeline state dictionary.
+            stage: The name of the stage that was reached.
+            on_event: Optional callback receiving (event, data) pairs.
         """
-        self.state_manager = StateManager(RUNTIME_STATE_PATH)
+        state["current_stage"] = stage
+        set_log_stage(stage)
+        state_manager.update_state(**state)
+        if on_event is not None:
+            on_event("stage", {"stage": stage})
 
     def run_pipeline(
         self,
         pipeline_id: str,
         input_path: str,
-        tone: str = "informative"
+        tone: str = "informative",
+        streaming: bool = False,
+        preview: bool = False,
+        profile: str = DEFAULT_TRANSCRIPTION_PROFILE,
+        language: str = None,
+        export_targets: list = None,
+        export_clips: bool = False,
+        profiling: bool = False,
+        content_hash: str = None,
+        render: dict = None,
+        on_event=None
     ):
         """
         Runs the full audio processing pipeline.
 
+        Every run uses its own scratch files and state file, so runs for
+        different pipeline IDs can execute at the same time, in this or in
+        other processes sharing the runtime directory.
+
+        The outputs of normalization, transcription, sentence selection and
+        cutting are kept in the stage cache (see pipeline.stage_cache) under
+        keys built from their inputs and parameters. Stages whose output is
+        cached are skipped, so a run that only changes e.g. the padding cuts
+        and stitches again, without the input upload. Recordings that miss
+        the transcription cache are looked up by their acoustic fingerprint,
+        so a re-encoded or time-shifted copy of an earlier recording reuses
+        its transcript and selection.
+
         Args:
             pipeline_id: A unique identifier for this pipeline run.
-            input_path: The path to the input audio file.
+            input_path: The path to the input audio file. May be None when
+                        the normalized audio is cached (re-renders).
             tone: The desired tone for sentence selection.
+            streaming: If True, run the bounded-memory mode: windowed
+                       transcription, JSON Lines transcript and chunked
+                       scoring. This allows much longer recordings.
+            preview: If True, run a fast draft with the preview
+                     transcription profile (small model, greedy decoding)
+                     instead of `profile`. The output is written to
+                     draft.wav instead of final.wav and the upload is kept
+                     so the full-quality run can follow.
+            profile: The name of the transcription profile to use.
+            language: Optional fixed language code for transcription.
+            export_targets: Optional list of (format, bitrate) tuples to
+                            encode the final audio into. Draft runs skip
+                            the export.
+            export_clips: If True, also encode every clip into the export
+                          targets.
+            profiling: If True, profile every stage (see utils.profiling)
+                       and write the profiles to the job's profile
+                       directory, under "draft/" or "final/".
+            content_hash: The SHA-256 hex digest of the input audio, which
+                          identifies it in the stage cache. Computed from
+                          the input if not given.
+            render: Optional render settings (padding, fades, merge gap,
+                    top_k, pause length; see config.render). Missing values
+                    use the defaults.
+            on_event: Optional callback receiving (event, data) pairs for
+                      stage transitions ("stage"), FFmpeg progress
+                      ("progress") and partial transcript sentences
+                      ("sentence").
         """
+        return self._run_pipeline(
+            pipeline_id=pipeline_id,
+            input_path=input_path,
+            tone=tone,
+            streaming=streaming,
+            preview=preview,
+            profile=PREVIEW_TRANSCRIPTION_PROFILE if preview else profile,
+            language=language,
+            export_targets=export_targets,
+            export_clips=export_clips,
+            profile_dir=(
+                os.path.join(profile_dir_for(pipeline_id), "draft" if preview else "final")
+                if profiling else None
+            ),
+            content_hash=content_hash,
+            settings=get_render_settings(render),
+            on_event=on_event
+        )
+
+    def _run_pipeline(
+        self,
+        pipeline_id,
+        input_path,
+        tone,
+        streaming,
+        preview,
+        profile,
+        language,
+        export_targets,
+        export_clips,
+        profile_dir,
+        content_hash,
+        settings,
+        on_event
+    ):
+        # Remove data left behind by an earlier attempt of this run
+        _clean_runtime_before_run(pipeline_id)
+
         # Create necessary runtime directories
         os.makedirs(RUNTIME_DATA_INPUT, exist_ok=True)
         os.makedirs(RUNTIME_DATA_NORMALIZED, exist_ok=True)
         os.makedirs(RUNTIME_DATA_CLIPS, exist_ok=True)
         os.makedirs(RUNTIME_DATA_OUTPUT, exist_ok=True)
-        os.makedirs(os.path.dirname(RUNTIME_STATE_PATH), exist_ok=True)
 
-        # Reset the state for a new pipeline run
-        self.state_manager.reset_state()
+        # Each run keeps its state file (and transcript) in its own directory
+        state_manager = StateManager(
+            os.path.join(RUNTIME_STATE_DIR, pipeline_id, "state.json")
+        )
+        state_manager.reset_state()
 
         # Extract the base name of the audio file, required for Whisper
-        audio_basename = Path(input_path).stem.lower()
+        audio_basename = Path(input_path).stem.lower() if input_path else pipeline_id
 
         # Initialize the state for this pipeline run
         state = {
@@ -93,54 +529,279 @@ class PipelineController:
             RUNTIME_DATA_NORMALIZED, f"{pipeline_id}.wav"
         )
 
-        # Ensure the input audio file exists
-        if not os.path.isfile(input_path):
-            raise RuntimeError("Input audio missing")
+        # Seconds spent running each stage, reported in the result so the
+        # scheduler can learn the per-stage throughput. Time spent waiting
+        # for a busy resource is not counted, and neither are stages taken
+        # from the cache.
+        stage_seconds = {}
+        cached_stages = []
+        stage_busy = 0.0
+
+        def run_stage(resource: str, fn, *args, profile_name: str = None, **kwargs):
+            # Runs fn on the given resource class, profiled as profile_name
+            # (model stages profile themselves in the inference worker).
+            def call():
+                nonlocal stage_busy
+                started = time.monotonic()
+                try:
+                    with profile_stage(profile_dir if profile_name else None, profile_name):
+                        return fn(*args, **kwargs)
+                finally:
+                    stage_busy += time.monotonic() - started
+
+            return self._on_resource(resource, call)
+
+        def reached(stage: str, cached: bool = False):
+            nonlocal stage_busy
+            if cached:
+                cached_stages.append(stage)
+            else:
+                stage_seconds[stage] = round(stage_busy, 3)
+            stage_busy = 0.0
+            self._set_stage(state_manager, state, stage, on_event)
+
+        def require_input():
+            # Ensure the input audio file exists
+            if not input_path or not os.path.isfile(input_path):
+                raise RuntimeError(
+                    "Input audio missing" if content_hash is None or input_path
+                    else "Normalized audio is no longer cached; upload the recording again"
+                )
 
         # --- PIPELINE STAGES ---
 
-        # 1. Validate the duration of the audio
-        validate_audio_duration(input_path)
-        state["current_stage"] = "audio_validated"
-        self.state_manager.update_state(**state)
+        max_duration = (
+            STREAMING_MAX_AUDIO_DURATION_SECONDS if streaming
+            else MAX_AUDIO_DURATION_SECONDS
+        )
+
+        if content_hash is None:
+            require_input()
+            content_hash = run_stage("ffmpeg", sha256_file, input_path)
+
+        normalize_key = stage_key("normalize", content_hash)
+        cached = stage_cache.get("normalize", normalize_key)
+        hit = cached is not None
+        if hit:
+            # The audio of this recording was validated and normalized
+            # before; only its duration limit is checked again.
+            duration = cached["meta"]["duration"]
+            if duration > max_duration:
+                raise RuntimeError(f"AUDIO_TOO_LONG: {duration:.2f}s > {max_duration}s")
+        else:
+            require_input()
+
+            # 1. Validate the duration of the audio
+            duration = run_stage(
+                "ffmpeg", validate_audio_duration, input_path,
+                max_duration=max_duration, profile_name="validate"
+            )
+        reached("audio_validated", cached=hit)
 
         # 2. Normalize the audio
-        normalize_audio(input_path, normalized_path)
+        if not hit:
+            run_stage(
+                "ffmpeg",
+                normalize_audio,
+                input_path,
+                normalized_path,
+                on_progress=_progress_reporter(pipeline_id, "normalize", duration, on_event),
+                profile_name="normalize"
+            )
+            cached = stage_cache.put(
+                "normalize", normalize_key, {"audio.wav": normalized_path}, duration=duration
+            )
+        normalized_path = cached["files"]["audio.wav"]
         state["artifacts"]["normalized_audio"] = normalized_path
-        state["current_stage"] = "audio_normalized"
-        self.state_manager.update_state(**state)
+        reached("audio_normalized", cached=hit)
 
-        # 3. Transcribe the audio using Whisper
-        run_whisper_transcription(
-            audio_path=normalized_path,
-            state=state
-        )
-        self.state_manager.update_state(**state)
+        # 3. Transcribe the audio using Whisper (in an inference worker,
+        # which also profiles it). Partial sentences are forwarded as they
+        # are decoded.
+        transcription_key = _transcription_key(normalize_key, profile, language, streaming)
+        selection_key = _selection_key(transcription_key, tone, settings)
+        cached = stage_cache.get("transcription", transcription_key)
+        fingerprint_match = None
+        if cached is None:
+            # A copy of an earlier recording encoded differently has another
+            # content hash; find the earlier one by its fingerprint instead.
+            fingerprint_match = run_stage(
+                "ffmpeg",
+                _reuse_by_fingerprint,
+                pipeline_id,
+                normalize_key,
+                normalized_path,
+                duration,
+                profile,
+                language,
+                streaming,
+                tone,
+                settings,
+                profile_name="fingerprint"
+            )
+            stage_seconds["fingerprint"] = round(stage_busy, 3)
+            stage_busy = 0.0
+            if fingerprint_match is not None:
+                cached = stage_cache.get("transcription", transcription_key)
+        hit = cached is not None
+        if not hit:
+            def _on_transcription_event(payload):
+                on_event(payload.pop("event"), payload)
 
-        # 4. Select sentences based on the specified tone
-        run_sentence_selection(
-            whisper_json_path=state["artifacts"]["whisper_output"],
-            tone=tone,
-            state=state
-        )
+            _, state = run_stage(
+                "transcription",
+                self.inference_pool.run,
+                "transcription",
+                state,
+                on_event=_on_transcription_event if on_event is not None else None,
+                profile_dir=profile_dir,
+                audio_path=normalized_path,
+                streaming=streaming,
+                profile=profile,
+                language=language
+            )
+            transcript = state["artifacts"]["whisper_output"]
+            export = state["artifacts"]["whisper_export"]
+            cached = stage_cache.put(
+                "transcription",
+                transcription_key,
+                {os.path.basename(transcript): transcript, os.path.basename(export): export},
+                transcript=os.path.basename(transcript),
+                export=os.path.basename(export)
+            )
+        state["artifacts"]["whisper_output"] = cached["files"][cached["meta"]["transcript"]]
+        state["artifacts"]["whisper_export"] = cached["files"][cached["meta"]["export"]]
+        reached("transcription_done", cached=hit)
 
-        selected = state["artifacts"]["selected_sentences"]
+        # 4. Select sentences based on the specified tone (in an inference worker)
+        cached = stage_cache.get("selection", selection_key)
+        hit = cached is not None
+        if not hit:
+            _, state = run_stage(
+                "scoring",
+                self.inference_pool.run,
+                "sentence_selection",
+                state,
+                profile_dir=profile_dir,
+                transcript_path=state["artifacts"]["whisper_output"],
+                tone=tone,
+                streaming=streaming,
+                top_k=settings["top_k"],
+                merge_gap=settings["merge_gap"]
+            )
+            cached = stage_cache.put(
+                "selection",
+                selection_key,
+                {"sentences.json": state["artifacts"]["sentence_selection_output"]}
+            )
+        with open(cached["files"]["sentences.json"], "r", encoding="utf-8") as f:
+            selected = json.load(f)["sentences"]
+        state["artifacts"]["selected_sentences"] = selected
+        state["artifacts"]["sentence_selection_output"] = cached["files"]["sentences.json"]
+        reached("sentences_selected", cached=hit)
 
         # 5. Cut the audio into clips based on selected sentences
-        clip_paths = cut_audio(
-            input_path=normalized_path,
-            selections=selected
+        cut_key = stage_key(
+            "cut",
+            normalize_key,
+            selection_key,
+            pad_start=settings["pad_start"],
+            pad_end=settings["pad_end"],
+            fade_duration=settings["fade_duration"]
         )
+        cached = stage_cache.get("cut", cut_key)
+        hit = cached is not None
+        if not hit:
+            clip_dir = os.path.join(RUNTIME_DATA_CLIPS, pipeline_id)
+            os.makedirs(clip_dir, exist_ok=True)
+            clip_paths = run_stage(
+                "ffmpeg",
+                cut_audio,
+                input_path=normalized_path,
+                selections=selected,
+                out_dir=clip_dir,
+                on_progress=_progress_reporter(pipeline_id, "cut", on_event=on_event),
+                pad_start=settings["pad_start"],
+                pad_end=settings["pad_end"],
+                fade_duration=settings["fade_duration"],
+                profile_name="cut"
+            )
+            cached = stage_cache.put(
+                "cut",
+                cut_key,
+                {"clips": clip_dir},
+                clips=[os.path.basename(path) for path in clip_paths]
+            )
+        clip_paths = [os.path.join(cached["files"]["clips"], name) for name in cached["meta"]["clips"]]
+        state["artifacts"]["clips"] = clip_paths
+        reached("audio_cut", cached=hit)
 
         # 6. Stitch the selected audio clips together
-        final_audio = stitch_audio(clip_paths)
+        # Each run writes to its own output directory, so finished results
+        # stay valid while later runs execute. Stitching always runs, since
+        # it produces this run's own output.
+        out_file = os.path.join(
+            RUNTIME_DATA_OUTPUT,
+            pipeline_id,
+            "draft.wav" if preview else "final.wav"
+        )
+
+        final_audio = run_stage(
+            "ffmpeg",
+            stitch_audio,
+            clip_paths,
+            out_file=out_file,
+            on_progress=_progress_reporter(pipeline_id, "stitch", on_event=on_event),
+            silence_seconds=settings["silence_seconds"],
+            profile_name="stitch"
+        )
+        state["artifacts"]["final_audio"] = final_audio
+        reached("audio_stitched")
+
+        # 7. Encode the final audio (and optionally the clips) into the
+        # requested export formats
+        exports = []
+        if export_targets and not preview:
+            exports = run_stage(
+                "ffmpeg",
+                export_audio,
+                pipeline_id,
+                final_audio,
+                export_targets,
+                clips=clip_paths if export_clips else None,
+                profile_name="export"
+            )
+            state["artifacts"]["exports"] = [e["path"] for e in exports]
+            reached("audio_exported")
 
         # Clean up temporary files after a successful run
-        _cleanup_after_success()
+        _cleanup_after_success(pipeline_id, input_path, keep_input=preview)
+
+        if cached_stages:
+            logger.info(f"[{pipeline_id}] Reused cached stages: {', '.join(cached_stages)}")
 
         # Return the final results
-        return {
+        result = {
             "pipeline_id": pipeline_id,
             "final_audio": final_audio,
-            "clips": clip_paths
+            "clips": clip_paths,
+            "exports": exports,
+            "preview": preview,
+            "profile": profile,
+            "render": settings,
+            "duration_seconds": duration,
+            "stage_seconds": stage_seconds,
+            "cached_stages": cached_stages
         }
+
+        if fingerprint_match is not None:
+            result["fingerprint_match"] = fingerprint_match
+
+        if profile_dir is not None and os.path.isdir(profile_dir):
+            pass_name = os.path.basename(profile_dir)
+            result["profiles"] = [
+                f"{pass_name}/{name}" for name in sorted(os.listdir(profile_dir))
+            ]
+            logger.info(f"[{pipeline_id}] Wrote {len(result['profiles'])} profiles to {profile_dir}")
+
+        return result
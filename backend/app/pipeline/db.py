@@ -0,0 +1,69 @@
+# Shared SQLite database holding the durable job state.
+#
+# The job queue, job registry (status and events), coalescing table,
+# throughput estimates and upload sessions live in one SQLite file under
+# /runtime, so the API and any number of worker processes on shared storage
+# see the same jobs. Every operation opens its own short-lived connection;
+# write transactions take the database lock up front (BEGIN IMMEDIATE) so
+# read-modify-write sequences are atomic across processes.
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config.paths import RUNTIME_QUEUE_DB
+
+# SQLite journal mode. WAL lets readers (e.g. event streams) run alongside the
+# writer, but needs all processes on one host. Use "DELETE" when workers on
+# other nodes open the database over a network filesystem.
+JOURNAL_MODE = "WAL"
+
+# How long a connection waits for another process's write lock (seconds).
+BUSY_TIMEOUT_SECONDS = 30
+
+# Schemas already created in this process, as (path, schema) pairs.
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+@contextmanager
+def connect(schema: str, path: str = RUNTIME_QUEUE_DB, write: bool = False):
+    """
+    Opens a connection to the job database.
+
+    Args:
+        schema: The CREATE statements of the tables the caller uses; they are
+                executed on the first connection of the process.
+        path: The path of the database file.
+        write: If True, the block runs in a write transaction that is
+               committed on success and rolled back on error.
+
+    Yields:
+        A sqlite3.Connection whose rows can be accessed by column name.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+
+    try:
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        with _init_lock:
+            if (path, schema) not in _initialized:
+                conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+                conn.executescript(schema)
+                _initialized.add((path, schema))
+
+        if not write:
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,199 @@
+# Stage-graph executor of a pipeline worker.
+#
+# A pipeline run is a chain of stages, each bound to the resource class it
+# mostly uses: "ffmpeg" (CPU work in ffmpeg/ffprobe), "transcription" (the
+# Whisper inference workers) or "scoring" (the sentence selection inference
+# workers). Every resource class has its own queue and threads, so stages of
+# different jobs overlap: while one job is cut and stitched, the next one is
+# transcribed and a third one scored. Within a queue, stages of older jobs go
+# first, so jobs already in flight finish before new ones take the resource.
+import contextvars
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from config.workers import STAGE_WORKERS
+from utils.logger import logger
+
+# Order of the job whose stages are submitted from the current context; see
+# StageExecutor.job.
+_job_order = contextvars.ContextVar("stage_job_order", default=None)
+
+
+class ResourcePool:
+    """
+    The queue and threads of one resource class.
+
+    Keeps the time its threads spend running stages, for utilization
+    reporting.
+    """
+    def __init__(self, name: str, workers: int):
+        """
+        Initializes the pool and starts its threads.
+
+        Args:
+            name: The name of the resource class.
+            workers: The number of stages of this class that run at once.
+        """
+        self.name = name
+        self.workers = workers
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._busy_seconds = 0.0
+        # Start times of the stages currently running, by thread.
+        self._running = {}
+
+        self._threads = [
+            threading.Thread(target=self._work, name=f"stage-{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, order: int, fn) -> Future:
+        """
+        Queues a stage.
+
+        Args:
+            order: The position of the stage's job; lower runs first.
+            fn: The callable running the stage.
+
+        Returns:
+            A future holding the stage's result.
+        """
+        future = Future()
+        self._queue.put((order, next(self._sequence), future, fn))
+        return future
+
+    def _work(self):
+        me = threading.get_ident()
+        while True:
+            _, _, future, fn = self._queue.get()
+            if future is None:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.monotonic()
+            with self._lock:
+                self._running[me] = started
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    del self._running[me]
+                    self._busy_seconds += time.monotonic() - started
+
+    def snapshot(self) -> dict:
+        """
+        Returns the number of threads, queued and running stages, and the
+        total seconds spent running stages (including the running ones).
+        """
+        now = time.monotonic()
+        with self._lock:
+            busy = self._busy_seconds + sum(now - started for started in self._running.values())
+            running = len(self._running)
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize(),
+            "running": running,
+            "busy_seconds": busy
+        }
+
+    def shutdown(self):
+        """
+        Stops the threads once the queued stages have run.
+        """
+        for _ in self._threads:
+            self._queue.put((float("inf"), next(self._sequence), None, None))
+        for thread in self._threads:
+            thread.join()
+
+
+class StageExecutor:
+    """
+    Runs pipeline stages on per-resource queues and threads.
+
+    Jobs run on their own threads and hand each stage to the queue of its
+    resource class with run(), which blocks until the stage is done. How
+    many stages of a class run at once is set in STAGE_WORKERS.
+    """
+    def __init__(self, workers: dict = STAGE_WORKERS):
+        """
+        Initializes the executor and starts the resource threads.
+
+        Args:
+            workers: The number of threads of each resource class.
+        """
+        self.pools = {name: ResourcePool(name, count) for name, count in workers.items()}
+        self._job_orders = itertools.count()
+        self._last_report = (time.monotonic(), {})
+
+    def job(self):
+        """
+        Marks the start of a job in the current thread. Stages submitted
+        afterwards in this context are ordered by the job's start, ahead of
+        stages of later jobs.
+        """
+        _job_order.set(next(self._job_orders))
+
+    def run(self, resource: str, fn, *args, **kwargs):
+        """
+        Runs a stage on a resource class and waits for it.
+
+        The stage runs in a copy of the caller's context, so it logs with
+        the caller's job ID and stage.
+
+        Args:
+            resource: The resource class (a key of STAGE_WORKERS).
+            fn: The stage function.
+            *args: Positional arguments passed to fn.
+            **kwargs: Keyword arguments passed to fn.
+
+        Returns:
+            The result of fn; its exceptions are raised here.
+        """
+        order = _job_order.get()
+        if order is None:
+            order = next(self._job_orders)
+
+        context = contextvars.copy_context()
+        future = self.pools[resource].submit(
+            order, lambda: context.run(fn, *args, **kwargs)
+        )
+        return future.result()
+
+    def utilization(self) -> dict:
+        """
+        Returns the state of each resource class, with the share of its
+        capacity used since the previous call (or since start).
+        """
+        now = time.monotonic()
+        last_time, last_busy = self._last_report
+        elapsed = max(now - last_time, 1e-6)
+
+        report = {}
+        for name, pool in self.pools.items():
+            snapshot = pool.snapshot()
+            busy = snapshot.pop("busy_seconds")
+            used = (busy - last_busy.get(name, 0.0)) / (elapsed * pool.workers)
+            report[name] = {**snapshot, "utilization": round(min(1.0, max(0.0, used)), 3)}
+            last_busy[name] = busy
+
+        self._last_report = (now, last_busy)
+        return report
+
+    def shutdown(self):
+        """
+        Stops all resource threads.
+        """
+        for pool in self.pools.values():
+            pool.shutdown()
+        logger.info("Stage executor stopped")
@@ -0,0 +1,247 @@
+# Index of acoustic fingerprints of processed recordings.
+#
+# Uploads that are the same audio as an earlier one, but encoded differently
+# (another codec, bitrate or container) or with a few seconds added or cut at
+# the start, have a different content hash and miss the stage cache. Their
+# fingerprints still share most hashes with the earlier recording, at frame
+# positions moved by a constant offset. The index finds such a recording by
+# letting every shared hash vote for the offset between the two, so the
+# pipeline can reuse its transcript and selection with shifted timestamps
+# instead of transcribing again.
+#
+# The index lives in its own SQLite file next to the stage cache, so it can
+# be removed together with the cache without touching the job database.
+import time
+from itertools import repeat
+
+import numpy as np
+
+from config.paths import RUNTIME_FINGERPRINT_DB
+from pipeline.db import connect
+from stages.fingerprint.fingerprint import FRAME_SECONDS
+from utils.logger import logger
+
+# The oldest recordings are removed from the index beyond this many.
+FINGERPRINT_MAX_RECORDINGS = 5000
+
+# A match needs at least this many hashes agreeing on one offset...
+MIN_MATCH_HASHES = 50
+
+# ...and this share of the hashes of the new recording.
+MIN_MATCH_RATIO = 0.2
+
+# The two recordings must overlap on at least this share of the longer one,
+# so a recording is not matched to an excerpt of it or to a longer edit.
+MIN_MATCH_COVERAGE = 0.95
+
+# Hashes occurring more often than this in one recording (e.g. in steady
+# tones or hum) carry little information and are not looked up.
+MAX_HASH_REPEATS = 20
+
+# Number of hash values per lookup query (SQLite limits bound parameters).
+LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprint_recordings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recording_key TEXT NOT NULL UNIQUE,
+    duration REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprint_hashes (
+    hash INTEGER NOT NULL,
+    recording INTEGER NOT NULL,
+    frame INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprint_hashes_by_hash ON fingerprint_hashes (hash);
+CREATE INDEX IF NOT EXISTS fingerprint_hashes_by_recording ON fingerprint_hashes (recording);
+"""
+
+
+class FingerprintIndex:
+    """
+    Stores the fingerprints of recordings and finds near-identical ones.
+
+    Recordings are identified by a key of their normalized audio (the
+    normalize stage key), which the pipeline also uses to find their cached
+    transcripts.
+    """
+    def __init__(self, db_path: str = RUNTIME_FINGERPRINT_DB):
+        """
+        Initializes the index.
+
+        Args:
+            db_path: The path of the index database.
+        """
+        self.db_path = db_path
+
+    def _connect(self, write: bool = False):
+        return connect(_SCHEMA, self.db_path, write=write)
+
+    def get(self, recording_key: str):
+        """
+        Returns the stored fingerprint of a recording as a (hashes, frames)
+        tuple of arrays, or None if it is not indexed.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM fingerprint_recordings WHERE recording_key = ?", (recording_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT hash, frame FROM fingerprint_hashes WHERE recording = ?", (row["id"],)
+            ).fetchall()
+
+        found = np.array([tuple(r) for r in rows], dtype=np.int64).reshape(-1, 2)
+        return found[:, 0], found[:, 1]
+
+    def add(self, recording_key: str, duration: float, hashes, frames):
+        """
+        Adds a recording to the index, unless it is indexed already, and
+        removes the oldest recordings beyond FINGERPRINT_MAX_RECORDINGS.
+
+        Args:
+            recording_key: The key of the recording.
+            duration: The duration of the recording in seconds.
+            hashes: The fingerprint hashes (see compute_fingerprint).
+            frames: The frame index of each hash.
+        """
+        with self._connect(write=True) as conn:
+            if conn.execute(
+                "SELECT 1 FROM fingerprint_recordings WHERE recording_key = ?", (recording_key,)
+            ).fetchone():
+                return
+
+            recording = conn.execute(
+                "INSERT INTO fingerprint_recordings (recording_key, duration, created_at) "
+                "VALUES (?, ?, ?)",
+                (recording_key, duration, time.time())
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO fingerprint_hashes (hash, recording, frame) VALUES (?, ?, ?)",
+                zip(np.asarray(hashes).tolist(), repeat(recording), np.asarray(frames).tolist())
+            )
+
+            stale = [row["id"] for row in conn.execute(
+                "SELECT id FROM fingerprint_recordings ORDER BY id DESC LIMIT -1 OFFSET ?",
+                (FINGERPRINT_MAX_RECORDINGS,)
+            ).fetchall()]
+            for old in stale:
+                conn.execute("DELETE FROM fingerprint_hashes WHERE recording = ?", (old,))
+                conn.execute("DELETE FROM fingerprint_recordings WHERE id = ?", (old,))
+
+        logger.info(f"Indexed fingerprint of {recording_key[:12]} ({len(hashes)} hashes)")
+
+    def match(self, hashes, frames, duration: float, exclude: str = None, limit: int = 3) -> list:
+        """
+        Finds indexed recordings that are near-identical to a new one.
+
+        Args:
+            hashes: The fingerprint hashes of the new recording.
+            frames: The frame index of each hash.
+            duration: The duration of the new recording in seconds.
+            exclude: Optional key of a recording to ignore (the new recording
+                     itself, if it is indexed already).
+            limit: The maximum number of matches returned.
+
+        Returns:
+            The matches, best first, as dictionaries with the recording key
+            ("recording"), the time of the new recording at which the matched
+            one starts ("offset_seconds"; a time t in the matched recording is
+            t + offset_seconds in the new one), the number of hashes agreeing
+            on that offset ("matched_hashes") and the share of the longer
+            recording both have in common ("coverage").
+        """
+        hashes = np.asarray(hashes, dtype=np.int64)
+        frames = np.asarray(frames, dtype=np.int64)
+        if len(hashes) < MIN_MATCH_HASHES:
+            return []
+
+        values, inverse, counts = np.unique(hashes, return_inverse=True, return_counts=True)
+        useful = counts <= MAX_HASH_REPEATS
+        keep = useful[inverse]
+        order = np.argsort(hashes[keep], kind="stable")
+        query_hashes, query_frames = hashes[keep][order], frames[keep][order]
+        lookup = values[useful].tolist()
+
+        rows = []
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM fingerprint_recordings WHERE recording_key = ?", (exclude,)
+            ).fetchone() if exclude else None
+            excluded = row["id"] if row else -1
+
+            for i in range(0, len(lookup), LOOKUP_BATCH):
+                batch = lookup[i:i + LOOKUP_BATCH]
+                rows.extend(conn.execute(
+                    f"SELECT hash, recording, frame FROM fingerprint_hashes "
+                    f"WHERE hash IN ({', '.join('?' * len(batch))}) AND recording != ?",
+                    batch + [excluded]
+                ).fetchall())
+
+        if not rows:
+            return []
+
+        # Pair every indexed occurrence of a hash with every occurrence in
+        # the new recording; each pair votes for their frame offset.
+        found = np.array([tuple(r) for r in rows], dtype=np.int64)
+        start = np.searchsorted(query_hashes, found[:, 0], side="left")
+        count = np.searchsorted(query_hashes, found[:, 0], side="right") - start
+        first = np.cumsum(count) - count
+        positions = np.arange(count.sum()) + np.repeat(start - first, count)
+        recordings = np.repeat(found[:, 1], count)
+        offsets = query_frames[positions] - np.repeat(found[:, 2], count)
+
+        keys, votes = np.unique((recordings << 32) + (offsets + (1 << 31)), return_counts=True)
+
+        # Re-encoding can move a peak to the neighbouring frame, so the
+        # adjacent offsets vote as well.
+        scores = votes.copy()
+        for step in (-1, 1):
+            neighbour = np.minimum(np.searchsorted(keys, keys + step), len(keys) - 1)
+            present = keys[neighbour] == keys + step
+            scores[present] += votes[neighbour[present]]
+
+        # The best offset of each recording, best recordings first.
+        key_recordings = keys >> 32
+        key_offsets = (keys & 0xFFFFFFFF) - (1 << 31)
+        ranked = np.lexsort((-scores, key_recordings))
+        best = ranked[np.r_[True, key_recordings[ranked][1:] != key_recordings[ranked][:-1]]]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        best = best[
+            (scores[best] >= MIN_MATCH_HASHES) & (scores[best] >= MIN_MATCH_RATIO * len(hashes))
+        ]
+
+        matches = []
+        with self._connect() as conn:
+            for i in best:
+                row = conn.execute(
+                    "SELECT recording_key, duration FROM fingerprint_recordings WHERE id = ?",
+                    (int(key_recordings[i]),)
+                ).fetchone()
+                if row is None:
+                    continue
+
+                # The matched recording spans [offset, offset + its duration]
+                # of the new one.
+                offset = float(key_offsets[i]) * FRAME_SECONDS
+                overlap = min(duration, offset + row["duration"]) - max(0.0, offset)
+                coverage = overlap / max(duration, row["duration"], 1e-6)
+                if coverage < MIN_MATCH_COVERAGE:
+                    continue
+
+                matches.append({
+                    "recording": row["recording_key"],
+                    "offset_seconds": round(offset, 3),
+                    "matched_hashes": int(scores[i]),
+                    "coverage": round(coverage, 3)
+                })
+                if len(matches) >= limit:
+                    break
+
+        return matches
+
+
+# Global fingerprint index shared by the pipeline workers.
+fingerprint_index = FingerprintIndex()
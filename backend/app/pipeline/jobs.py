@@ -0,0 +1,215 @@
+import asyncio
+import json
+import time
+
+from config.paths import RUNTIME_QUEUE_DB
+from pipeline.db import connect
+
+
+# Number of finished jobs kept for status queries.
+JOB_HISTORY_LIMIT = 200
+
+# Interval at which event streams poll the database for new events.
+EVENT_POLL_SECONDS = 0.5
+
+# Maximum number of events read per poll.
+EVENT_BATCH_SIZE = 500
+
+# Events after which a job's event stream ends.
+TERMINAL_EVENTS = {"completed", "failed"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT,
+    fields TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    event TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_by_job ON job_events (job_id, seq);
+"""
+
+
+class JobRegistry:
+    """
+    Durable registry of pipeline jobs and their progress events.
+
+    Jobs and events are stored in the shared job database, so workers in other
+    processes or on other nodes publish events that the API streams to
+    clients. Event streams tail the events table.
+    """
+    def __init__(self, db_path: str = RUNTIME_QUEUE_DB):
+        """
+        Initializes the registry.
+
+        Args:
+            db_path: The path of the job database.
+        """
+        self.db_path = db_path
+
+    def _connect(self, write: bool = False):
+        return connect(_SCHEMA, self.db_path, write=write)
+
+    def create(self, job_id: str, **fields) -> dict:
+        """
+        Registers a new job in the "queued" status.
+
+        Args:
+            job_id: The unique ID of the job (the pipeline_id).
+            **fields: Additional JSON-serializable fields stored with the job
+                      (e.g. tone).
+
+        Returns:
+            A snapshot of the new job.
+        """
+        with self._connect(write=True) as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, status, fields, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(fields), time.time())
+            )
+            self._evict(conn)
+
+        self.publish(job_id, "queued", {})
+        return self.get(job_id)
+
+    def delete(self, job_id: str):
+        """
+        Removes a job and its events, e.g. one that was not admitted and
+        will be submitted again under the same ID.
+        """
+        with self._connect(write=True) as conn:
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+
+    def _evict(self, conn):
+        # Drop the oldest finished jobs once the history limit is reached.
+        excess = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - JOB_HISTORY_LIMIT
+        if excess <= 0:
+            return
+
+        rows = conn.execute(
+            "SELECT job_id FROM jobs WHERE status IN ('completed', 'failed') "
+            "ORDER BY created_at LIMIT ?",
+            (excess,)
+        ).fetchall()
+        conn.executemany("DELETE FROM jobs WHERE job_id = ?", rows)
+        conn.executemany("DELETE FROM job_events WHERE job_id = ?", rows)
+
+    def get(self, job_id: str):
+        """
+        Returns a snapshot of a job, or None if it is unknown.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "pipeline_id": row["job_id"],
+            "status": row["status"],
+            "stage": row["stage"],
+            "created_at": row["created_at"],
+            **json.loads(row["fields"])
+        }
+
+    def update(self, job_id: str, **fields):
+        """
+        Updates fields of a job without publishing an event.
+        """
+        with self._connect(write=True) as conn:
+            row = conn.execute("SELECT fields FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET fields = ? WHERE job_id = ?",
+                    (json.dumps({**json.loads(row["fields"]), **fields}), job_id)
+                )
+
+    def publish(self, job_id: str, event: str, data: dict):
+        """
+        Records an event for a job.
+
+        "stage" events update the job's stage; terminal events update its
+        status. Safe to call from any thread or process.
+
+        Args:
+            job_id: The ID of the job.
+            event: The event type (e.g. "stage", "progress", "sentence").
+            data: The JSON-serializable event payload.
+        """
+        payload = json.dumps(
+            {"pipeline_id": job_id, "time": time.time(), **data},
+            ensure_ascii=False
+        )
+
+        with self._connect(write=True) as conn:
+            if event == "stage":
+                conn.execute(
+                    "UPDATE jobs SET stage = ?, status = 'running' WHERE job_id = ?",
+                    (data.get("stage"), job_id)
+                )
+            elif event in TERMINAL_EVENTS:
+                conn.execute("UPDATE jobs SET status = ? WHERE job_id = ?", (event, job_id))
+
+            conn.execute(
+                "INSERT INTO job_events (job_id, event, data) "
+                "SELECT job_id, ?, ? FROM jobs WHERE job_id = ?",
+                (event, payload, job_id)
+            )
+
+    def _events_after(self, job_id: str, seq: int) -> list:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT seq, event, data FROM job_events WHERE job_id = ? AND seq > ? "
+                "ORDER BY seq LIMIT ?",
+                (job_id, seq, EVENT_BATCH_SIZE)
+            ).fetchall()
+
+    async def subscribe(self, job_id: str, keepalive: float = None):
+        """
+        Streams a job's events: first the recorded history, then live events.
+
+        The stream ends after a terminal event.
+
+        Args:
+            job_id: The ID of the job.
+            keepalive: If set, a (None, None) tuple is yielded whenever no
+                       event arrived for this many seconds.
+
+        Yields:
+            Tuples of (event, data).
+        """
+        if await asyncio.to_thread(self.get, job_id) is None:
+            return
+
+        seq = 0
+        last_event = time.monotonic()
+
+        while True:
+            rows = await asyncio.to_thread(self._events_after, job_id, seq)
+
+            for row in rows:
+                seq = row["seq"]
+                yield row["event"], json.loads(row["data"])
+                if row["event"] in TERMINAL_EVENTS:
+                    return
+
+            if rows:
+                last_event = time.monotonic()
+                if len(rows) == EVENT_BATCH_SIZE:
+                    continue
+            elif keepalive is not None and time.monotonic() - last_event >= keepalive:
+                last_event = time.monotonic()
+                yield None, None
+
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+
+# Global registry shared by the API and the pipeline workers.
+job_registry = JobRegistry()
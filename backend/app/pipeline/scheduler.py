@@ -0,0 +1,389 @@
+import json
+import math
+import time
+
+from config.paths import RUNTIME_QUEUE_DB
+from config.workers import JOB_LEASE_SECONDS, RESOURCE_REPORT_SECONDS
+from pipeline.db import connect
+from utils.logger import logger
+
+
+# Reject new jobs while the estimated processing backlog exceeds this (seconds).
+MAX_BACKLOG_SECONDS = 60 * 60
+
+# Aging: every second a job waits lowers its effective cost by this many
+# seconds, so long jobs are not starved by a stream of short ones.
+AGING_RATE = 0.5
+
+# Extra cost of a preview job's draft pass, relative to the full run.
+PREVIEW_COST_RATIO = 0.3
+
+# Smoothing factor of the per-stage throughput averages.
+THROUGHPUT_SMOOTHING = 0.2
+
+# Initial processing seconds per second of audio for each pipeline stage,
+# used until real measurements are available.
+DEFAULT_STAGE_RATES = {
+    "audio_validated": 0.001,
+    "audio_normalized": 0.01,
+    "transcription_done": 0.12,
+    "sentences_selected": 0.01,
+    "audio_cut": 0.005,
+    "audio_stitched": 0.002,
+}
+
+# A job's priority is its cost plus AGING_RATE times its submission time:
+# ordering by it is the same as ordering by cost - AGING_RATE * waited, and
+# it does not change while the job waits, so it can be indexed.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue (
+    job_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    duration REAL NOT NULL,
+    cost REAL NOT NULL,
+    priority REAL NOT NULL,
+    submitted_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    started_at REAL
+);
+CREATE INDEX IF NOT EXISTS queue_by_priority ON queue (priority);
+CREATE TABLE IF NOT EXISTS stage_rates (
+    stage TEXT PRIMARY KEY,
+    rate REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS worker_resources (
+    worker_id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    workers INTEGER NOT NULL,
+    queued INTEGER NOT NULL,
+    running INTEGER NOT NULL,
+    utilization REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (worker_id, resource)
+);
+"""
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a job is not admitted because the backlog is too large.
+    """
+    def __init__(self, retry_after: int, backlog_seconds: float, cost_seconds: float):
+        super().__init__(
+            f"Estimated backlog {backlog_seconds:.0f}s plus job cost "
+            f"{cost_seconds:.0f}s exceeds {MAX_BACKLOG_SECONDS}s"
+        )
+        self.retry_after = retry_after
+        self.backlog_seconds = backlog_seconds
+
+
+class ThroughputEstimator:
+    """
+    Tracks measured processing time per second of audio for each stage.
+
+    The rates are stored in the job database, so every worker's measurements
+    feed the estimates of every API process.
+    """
+    def __init__(self, db_path: str = RUNTIME_QUEUE_DB):
+        """
+        Initializes the estimator. Stages without measurements use the
+        default rates.
+
+        Args:
+            db_path: The path of the job database.
+        """
+        self.db_path = db_path
+
+    def rates(self) -> dict:
+        """
+        Returns the current stage rates.
+        """
+        with connect(_SCHEMA, self.db_path) as conn:
+            rows = conn.execute("SELECT stage, rate FROM stage_rates").fetchall()
+        return {**DEFAULT_STAGE_RATES, **{row["stage"]: row["rate"] for row in rows}}
+
+    def estimate(self, duration: float) -> float:
+        """
+        Returns the estimated processing time (seconds) for an audio duration.
+        """
+        return duration * sum(self.rates().values())
+
+    def record(self, duration: float, stage_seconds: dict):
+        """
+        Updates the stage rates with the timings of a finished run.
+
+        Args:
+            duration: The duration of the processed audio in seconds.
+            stage_seconds: Wall-clock seconds spent in each stage.
+        """
+        if duration <= 0:
+            return
+
+        with connect(_SCHEMA, self.db_path, write=True) as conn:
+            for stage, seconds in stage_seconds.items():
+                rate = seconds / duration
+                row = conn.execute(
+                    "SELECT rate FROM stage_rates WHERE stage = ?", (stage,)
+                ).fetchone()
+                previous = row["rate"] if row else DEFAULT_STAGE_RATES.get(stage)
+                if previous is not None:
+                    rate = (1 - THROUGHPUT_SMOOTHING) * previous + THROUGHPUT_SMOOTHING * rate
+                conn.execute(
+                    "INSERT OR REPLACE INTO stage_rates (stage, rate) VALUES (?, ?)",
+                    (stage, rate)
+                )
+
+
+class JobScheduler:
+    """
+    Durable job queue with duration-aware admission control and
+    shortest-job-first ordering.
+
+    Each job's cost is estimated from its audio duration and the measured
+    per-stage throughput. Jobs are rejected while the estimated backlog of
+    queued and running work is too large. Admitted jobs are stored in the job
+    database, where pipeline workers (see worker.py) claim the job with the
+    lowest aged cost.
+
+    A claimed job is leased to its worker, which renews the lease with
+    heartbeats while it runs. If the worker dies, the lease expires and the
+    job is delivered to the next worker that asks for one.
+    """
+    def __init__(self, db_path: str = RUNTIME_QUEUE_DB):
+        """
+        Initializes the scheduler.
+
+        Args:
+            db_path: The path of the job database.
+        """
+        self.db_path = db_path
+        self.estimator = ThroughputEstimator(db_path)
+
+    def _connect(self, write: bool = False):
+        return connect(_SCHEMA, self.db_path, write=write)
+
+    @staticmethod
+    def _backlog(conn, now: float) -> float:
+        # Remaining estimated work of queued and running jobs. Jobs whose
+        # lease expired count in full, since they will run again.
+        row = conn.execute(
+            "SELECT COALESCE(SUM(CASE WHEN lease_expires > :now "
+            "THEN MAX(0.0, cost - (:now - started_at)) ELSE cost END), 0.0) "
+            "FROM queue",
+            {"now": now}
+        ).fetchone()
+        return row[0]
+
+    def submit(self, job_id: str, duration: float, payload: dict, preview: bool = False) -> float:
+        """
+        Admits a job and queues it for a worker.
+
+        Args:
+            job_id: The ID of the job.
+            duration: The probed duration of the job's audio in seconds.
+            payload: The JSON-serializable job parameters handed to the
+                     worker that claims the job.
+            preview: Whether the job runs an extra draft pass.
+
+        Returns:
+            The estimated cost of the job in seconds.
+
+        Raises:
+            AdmissionRejected: If the estimated backlog is too large.
+        """
+        cost = self.estimator.estimate(duration)
+        if preview:
+            cost *= 1 + PREVIEW_COST_RATIO
+
+        now = time.time()
+        with self._connect(write=True) as conn:
+            backlog = self._backlog(conn, now)
+            # An idle service always admits, however long the job.
+            if backlog > 0 and backlog + cost > MAX_BACKLOG_SECONDS:
+                # Time until enough of the backlog has drained for this job,
+                # assuming the workers currently holding jobs keep going.
+                workers = conn.execute(
+                    "SELECT COUNT(DISTINCT lease_owner) FROM queue WHERE lease_expires > ?",
+                    (now,)
+                ).fetchone()[0]
+                retry_after = math.ceil(
+                    (backlog + cost - MAX_BACKLOG_SECONDS) / max(1, workers)
+                )
+                raise AdmissionRejected(max(1, retry_after), backlog, cost)
+
+            conn.execute(
+                "INSERT INTO queue (job_id, payload, duration, cost, priority, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, json.dumps(payload), duration, cost, cost + AGING_RATE * now, now)
+            )
+
+        logger.info(
+            f"[{job_id}] Admitted: {duration:.0f}s audio, estimated cost {cost:.0f}s, "
+            f"backlog {backlog:.0f}s"
+        )
+        return cost
+
+    def claim(self, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS):
+        """
+        Leases the next job to a worker.
+
+        Jobs whose lease has expired are claimable again, so the work of a
+        dead worker is redelivered.
+
+        Args:
+            worker_id: The unique ID of the claiming worker.
+            lease_seconds: How long the lease lasts without a heartbeat.
+
+        Returns:
+            A dictionary with the job_id, payload, duration and attempts
+            (deliveries including this one), or None if no job is waiting.
+        """
+        now = time.time()
+        with self._connect(write=True) as conn:
+            row = conn.execute(
+                "SELECT job_id, payload, duration, attempts FROM queue "
+                "WHERE lease_expires IS NULL OR lease_expires <= ? "
+                "ORDER BY priority LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE queue SET lease_owner = ?, lease_expires = ?, started_at = ?, "
+                "attempts = attempts + 1 WHERE job_id = ?",
+                (worker_id, now + lease_seconds, now, row["job_id"])
+            )
+
+        return {
+            "job_id": row["job_id"],
+            "payload": json.loads(row["payload"]),
+            "duration": row["duration"],
+            "attempts": row["attempts"] + 1
+        }
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """
+        Renews a worker's lease on a job.
+
+        Returns:
+            False if the worker no longer holds the lease (it expired and the
+            job was redelivered), otherwise True.
+        """
+        with self._connect(write=True) as conn:
+            cursor = conn.execute(
+                "UPDATE queue SET lease_expires = ? WHERE job_id = ? AND lease_owner = ?",
+                (time.time() + lease_seconds, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: dict = None) -> bool:
+        """
+        Removes a finished (or failed) job from the queue.
+
+        Args:
+            job_id: The ID of the job.
+            worker_id: The ID of the worker holding the lease.
+            result: The job's result, if it succeeded. Its stage timings
+                    update the throughput estimates.
+
+        Returns:
+            False if the worker no longer held the lease, otherwise True.
+        """
+        with self._connect(write=True) as conn:
+            row = conn.execute(
+                "SELECT duration FROM queue WHERE job_id = ? AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM queue WHERE job_id = ?", (job_id,))
+
+        # Learn the real per-stage throughput from the finished run.
+        if isinstance(result, dict) and "stage_seconds" in result:
+            self.estimator.record(row["duration"], result["stage_seconds"])
+
+        return True
+
+    def report_resources(self, worker_id: str, resources: dict):
+        """
+        Records a pipeline worker's resource utilization.
+
+        Args:
+            worker_id: The ID of the reporting worker.
+            resources: The state of each resource class, as returned by
+                       StageExecutor.utilization.
+        """
+        now = time.time()
+        with self._connect(write=True) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO worker_resources (worker_id, resource, workers, "
+                "queued, running, utilization, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (worker_id, name, r["workers"], r["queued"], r["running"], r["utilization"], now)
+                    for name, r in resources.items()
+                ]
+            )
+            # Forget workers that stopped reporting.
+            conn.execute(
+                "DELETE FROM worker_resources WHERE updated_at < ?",
+                (now - 3 * RESOURCE_REPORT_SECONDS,)
+            )
+
+    def clear_resources(self, worker_id: str):
+        """
+        Removes the resource reports of a stopping worker.
+        """
+        with self._connect(write=True) as conn:
+            conn.execute("DELETE FROM worker_resources WHERE worker_id = ?", (worker_id,))
+
+    def _resources(self, conn, now: float) -> dict:
+        # Utilization of each resource class over the workers' latest report
+        # intervals, weighted by their number of threads.
+        rows = conn.execute(
+            "SELECT resource, SUM(workers) AS workers, SUM(queued) AS queued, "
+            "SUM(running) AS running, SUM(utilization * workers) AS busy "
+            "FROM worker_resources WHERE updated_at >= ? GROUP BY resource ORDER BY resource",
+            (now - 2 * RESOURCE_REPORT_SECONDS,)
+        ).fetchall()
+        return {
+            row["resource"]: {
+                "workers": row["workers"],
+                "queued": row["queued"],
+                "running": row["running"],
+                "utilization": round(row["busy"] / row["workers"], 3) if row["workers"] else 0.0
+            }
+            for row in rows
+        }
+
+    def stats(self) -> dict:
+        """
+        Returns the queue length, running jobs, active workers, backlog,
+        stage rates and the utilization of each resource class across the
+        pipeline workers.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            running, workers = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT lease_owner) FROM queue WHERE lease_expires > ?",
+                (now,)
+            ).fetchone()
+            total = conn.execute("SELECT COUNT(*) FROM queue").fetchone()[0]
+            backlog = self._backlog(conn, now)
+            resources = self._resources(conn, now)
+
+        return {
+            "queued": total - running,
+            "running": running,
+            "active_workers": workers,
+            "backlog_seconds": round(backlog, 1),
+            "max_backlog_seconds": MAX_BACKLOG_SECONDS,
+            "stage_rates": self.estimator.rates(),
+            "resources": resources
+        }
+
+
+# Global scheduler shared by the API and the pipeline workers.
+job_scheduler = JobScheduler()
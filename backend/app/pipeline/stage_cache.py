@@ -0,0 +1,217 @@
+# Cache of pipeline stage outputs, shared by all workers through /runtime.
+#
+# Each cached output is a directory named after its key: a hash of the
+# stage's name, the keys of the outputs it consumed and its parameters. Keys
+# chain through the pipeline, so changing a parameter changes the key of its
+# stage and of every stage after it, while the outputs of earlier stages are
+# reused. For example, a re-render with different padding finds the
+# normalized audio, transcript and selection in the cache and only cuts and
+# stitches again.
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+from config.paths import RUNTIME_CACHE_STAGES
+from utils.logger import logger
+
+# Entries unused for this long are removed.
+STAGE_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Least recently used entries are removed while the cache is larger than
+# this (bytes).
+STAGE_CACHE_MAX_BYTES = 50 * 1024 ** 3
+
+# Entries used more recently than this are never removed for size, since a
+# running job may still be reading them.
+STAGE_CACHE_MIN_AGE_SECONDS = 60 * 60
+
+# Minimum interval between two cleanups of the cache by one process.
+STAGE_CACHE_PRUNE_INTERVAL_SECONDS = 10 * 60
+
+# Name of the metadata file in every entry.
+_META_FILE = "meta.json"
+
+
+def stage_key(stage: str, *inputs, **params) -> str:
+    """
+    Builds the cache key of a stage output.
+
+    Args:
+        stage: The name of the stage.
+        *inputs: The keys (or content hashes) of the stage's inputs.
+        **params: The parameters that affect the stage's output.
+
+    Returns:
+        A SHA-256 hex digest.
+    """
+    canonical = repr((stage,) + inputs + tuple(
+        (name, repr(value)) for name, value in sorted(params.items())
+    ))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """
+    Stores stage outputs (files or directories) under their stage keys.
+
+    Entries are written to a temporary directory and renamed into place, so
+    concurrent workers never see partial entries; when two workers produce
+    the same entry, the first one wins.
+    """
+    def __init__(self, root: str = RUNTIME_CACHE_STAGES):
+        """
+        Initializes the cache.
+
+        Args:
+            root: The directory holding the entries.
+        """
+        self.root = root
+        self._last_prune = 0.0
+
+    def _entry_dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key)
+
+    def _load(self, path: str):
+        try:
+            with open(os.path.join(path, _META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return {
+            "files": {name: os.path.join(path, name) for name in meta.pop("files")},
+            "meta": meta
+        }
+
+    def get(self, stage: str, key: str):
+        """
+        Looks up a cached output and marks it as used.
+
+        Args:
+            stage: The name of the stage.
+            key: The stage key (see stage_key).
+
+        Returns:
+            A dictionary with the paths of the cached files by name
+            ("files") and the metadata stored with them ("meta"), or None.
+        """
+        path = self._entry_dir(stage, key)
+        entry = self._load(path)
+        if entry is None:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed in the meantime.
+            return None
+        return entry
+
+    def put(self, stage: str, key: str, files: dict, **meta) -> dict:
+        """
+        Moves a stage's output files into the cache.
+
+        Args:
+            stage: The name of the stage.
+            key: The stage key (see stage_key).
+            files: The output files or directories, by the name they are
+                   stored under.
+            **meta: JSON-serializable metadata stored with the files.
+
+        Returns:
+            The cache entry, as returned by get. The files are no longer at
+            their original paths.
+        """
+        path = self._entry_dir(stage, key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_path)
+
+        try:
+            for name, source in files.items():
+                shutil.move(source, os.path.join(tmp_path, name))
+            with open(os.path.join(tmp_path, _META_FILE), "w", encoding="utf-8") as f:
+                json.dump(
+                    {"stage": stage, "created_at": time.time(), **meta, "files": list(files)},
+                    f,
+                    ensure_ascii=False
+                )
+            os.rename(tmp_path, path)
+        except OSError:
+            # Another worker stored the same entry first.
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            existing = self.get(stage, key)
+            if existing is None:
+                raise
+            return existing
+
+        return self._load(path)
+
+    def prune(self, force: bool = False) -> int:
+        """
+        Removes entries unused for STAGE_CACHE_TTL_SECONDS, then the least
+        recently used ones while the cache exceeds STAGE_CACHE_MAX_BYTES.
+
+        Args:
+            force: If False, do nothing if this process cleaned up the cache
+                   less than STAGE_CACHE_PRUNE_INTERVAL_SECONDS ago.
+
+        Returns:
+            The number of removed entries.
+        """
+        now = time.time()
+        if not force and now - self._last_prune < STAGE_CACHE_PRUNE_INTERVAL_SECONDS:
+            return 0
+        self._last_prune = now
+
+        if not os.path.isdir(self.root):
+            return 0
+
+        entries = []
+        for stage in os.listdir(self.root):
+            stage_dir = os.path.join(self.root, stage)
+            for name in os.listdir(stage_dir):
+                path = os.path.join(stage_dir, name)
+                try:
+                    used = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                if name.endswith(".tmp"):
+                    # Left behind by a worker that died while storing it.
+                    if now - used > STAGE_CACHE_MIN_AGE_SECONDS:
+                        shutil.rmtree(path, ignore_errors=True)
+                    continue
+                entries.append((used, path, _tree_size(path)))
+
+        removed = 0
+        total = sum(size for _, _, size in entries)
+        for used, path, size in sorted(entries):
+            idle = now - used
+            if idle <= STAGE_CACHE_TTL_SECONDS and (
+                total <= STAGE_CACHE_MAX_BYTES or idle <= STAGE_CACHE_MIN_AGE_SECONDS
+            ):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"Removed {removed} stage cache entries ({total / 1024 ** 2:.0f} MB left)")
+        return removed
+
+
+def _tree_size(path: str) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return size
+
+
+# Global stage cache shared by the pipeline workers.
+stage_cache = StageCache()
@@ -75,5 +75,10 @@ class StateManager:
             "current_stage": current_stage,
             "artifacts": artifacts
         }
-        logger.info(f"Writing state: {state}")
+        # Only the stage and artifact names are logged; artifacts can be large
+        # (e.g. the selected sentences). Arguments are formatted lazily.
+        logger.info(
+            "Writing state: stage %s, artifacts %s",
+            current_stage, ", ".join(sorted(artifacts))
+        )
         self._write_atomic(state)
@@ -0,0 +1,201 @@
+import time
+import uuid
+
+from config.paths import RUNTIME_QUEUE_DB
+from pipeline.db import connect
+
+
+# Unfinished upload sessions are removed after this long without a chunk.
+UPLOAD_SESSION_TTL_SECONDS = 24 * 60 * 60
+
+# A chunk write holds the session for at most this long. It only matters if
+# the API process died mid-chunk; otherwise the hold is released at the end
+# of the request.
+UPLOAD_CHUNK_LEASE_SECONDS = 10 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    upload_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    sha256 TEXT,
+    writer TEXT,
+    writer_expires REAL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class UploadConflict(Exception):
+    """
+    Raised when a chunk does not start at the session's committed offset,
+    or another chunk of the session is being written.
+    """
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadSessionStore:
+    """
+    Durable state of resumable uploads.
+
+    A session records the target file, the expected size and the committed
+    offset: the number of bytes received and written so far. Chunks are
+    appended at the committed offset, one at a time, and the offset only
+    advances once a chunk has been written completely. Sessions live in the
+    shared job database, so every API process can continue any upload.
+    """
+    def __init__(self, db_path: str = RUNTIME_QUEUE_DB):
+        """
+        Initializes the store.
+
+        Args:
+            db_path: The path of the job database.
+        """
+        self.db_path = db_path
+
+    def _connect(self, write: bool = False):
+        return connect(_SCHEMA, self.db_path, write=write)
+
+    def create(self, upload_id: str, filename: str, path: str, size: int, sha256: str = None) -> dict:
+        """
+        Registers a new upload session.
+
+        Args:
+            upload_id: The ID of the session; it becomes the pipeline ID.
+            filename: The sanitized name of the uploaded file.
+            path: The path the file is written to.
+            size: The total size of the file in bytes.
+            sha256: Optional expected SHA-256 hex digest of the whole file.
+
+        Returns:
+            The new session.
+        """
+        with self._connect(write=True) as conn:
+            conn.execute(
+                "INSERT INTO upload_sessions (upload_id, filename, path, size, sha256, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (upload_id, filename, path, size, sha256, time.time())
+            )
+        return self.get(upload_id)
+
+    def get(self, upload_id: str):
+        """
+        Returns a session, or None if it is unknown.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT upload_id, filename, path, size, offset, sha256, updated_at "
+                "FROM upload_sessions WHERE upload_id = ?",
+                (upload_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def begin_chunk(self, upload_id: str, offset: int) -> str:
+        """
+        Reserves a session for writing a chunk.
+
+        Args:
+            upload_id: The ID of the session.
+            offset: The offset the client wants to write at.
+
+        Returns:
+            A token to pass to commit_chunk or release_chunk.
+
+        Raises:
+            KeyError: If the session is unknown.
+            UploadConflict: If offset is not the committed offset, or
+                            another chunk is being written.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._connect(write=True) as conn:
+            row = conn.execute(
+                "SELECT offset, writer_expires FROM upload_sessions WHERE upload_id = ?",
+                (upload_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(upload_id)
+            if row["writer_expires"] is not None and row["writer_expires"] > now:
+                raise UploadConflict("Another chunk is being written", row["offset"])
+            if offset != row["offset"]:
+                raise UploadConflict(
+                    f"Chunk offset {offset} does not match the committed offset {row['offset']}",
+                    row["offset"]
+                )
+
+            conn.execute(
+                "UPDATE upload_sessions SET writer = ?, writer_expires = ? WHERE upload_id = ?",
+                (token, now + UPLOAD_CHUNK_LEASE_SECONDS, upload_id)
+            )
+        return token
+
+    def commit_chunk(self, upload_id: str, token: str, length: int) -> int:
+        """
+        Advances the committed offset past a written chunk and releases the
+        session.
+
+        Returns:
+            The new committed offset.
+
+        Raises:
+            UploadConflict: If the reservation expired in the meantime.
+        """
+        with self._connect(write=True) as conn:
+            cursor = conn.execute(
+                "UPDATE upload_sessions SET offset = offset + ?, writer = NULL, "
+                "writer_expires = NULL, updated_at = ? WHERE upload_id = ? AND writer = ?",
+                (length, time.time(), upload_id, token)
+            )
+            row = conn.execute(
+                "SELECT offset FROM upload_sessions WHERE upload_id = ?", (upload_id,)
+            ).fetchone()
+
+        if cursor.rowcount != 1:
+            raise UploadConflict("Chunk reservation expired", row["offset"] if row else 0)
+        return row["offset"]
+
+    def release_chunk(self, upload_id: str, token: str):
+        """
+        Releases a session after a failed chunk, keeping the committed offset.
+        """
+        with self._connect(write=True) as conn:
+            conn.execute(
+                "UPDATE upload_sessions SET writer = NULL, writer_expires = NULL "
+                "WHERE upload_id = ? AND writer = ?",
+                (upload_id, token)
+            )
+
+    def delete(self, upload_id: str):
+        """
+        Removes a session (after it was finalized or aborted).
+        """
+        with self._connect(write=True) as conn:
+            conn.execute("DELETE FROM upload_sessions WHERE upload_id = ?", (upload_id,))
+
+    def remove_expired(self) -> list:
+        """
+        Removes sessions that received no chunk for UPLOAD_SESSION_TTL_SECONDS.
+
+        Returns:
+            The removed sessions, so the caller can delete their files.
+        """
+        cutoff = time.time() - UPLOAD_SESSION_TTL_SECONDS
+        with self._connect(write=True) as conn:
+            rows = conn.execute(
+                "SELECT upload_id, path FROM upload_sessions WHERE updated_at < ? "
+                "AND (writer_expires IS NULL OR writer_expires < ?)",
+                (cutoff, time.time())
+            ).fetchall()
+            conn.executemany(
+                "DELETE FROM upload_sessions WHERE upload_id = ?",
+                [(row["upload_id"],) for row in rows]
+            )
+        return [dict(row) for row in rows]
+
+
+# Global upload session store shared by all API processes.
+upload_sessions = UploadSessionStore()
@@ -1,20 +1,21 @@
-import subprocess
 import os
 
+from config.render import FADE_DURATION, PAD_END, PAD_START
+from utils.ffmpeg import run_ffmpeg
+
 # Directory to save the output audio clips.
 CLIP_DIR = "/runtime/data/clips"
 
-# Padding in seconds to add to the start and end of each clip.
-# This helps to preserve the full phonemes at the boundaries.
-PAD_START = 0.47   # seconds
-PAD_END = 0.47     # seconds
-
-# Duration of the fade-in and fade-out effects in seconds.
-# This should not be changed to maintain audio quality.
-FADE_DURATION = 0.8  # DO NOT CHANGE
 
-
-def cut_audio(input_path: str, selections: list):
+def cut_audio(
+    input_path: str,
+    selections: list,
+    out_dir: str = CLIP_DIR,
+    on_progress=None,
+    pad_start: float = PAD_START,
+    pad_end: float = PAD_END,
+    fade_duration: float = FADE_DURATION
+):
     """
     Cuts an audio file into multiple clips based on a list of time segments.
 
@@ -25,6 +26,12 @@ def cut_audio(input_path: str, selections: list):
         input_path: The path to the input audio file.
         selections: A list of dictionaries, where each dictionary represents a
                     segment to be cut and contains 'start' and 'end' times.
+        out_dir: The directory the clips are written to.
+        on_progress: Optional callback receiving FFmpeg progress updates.
+        pad_start: Padding in seconds added before each segment.
+        pad_end: Padding in seconds added after each segment.
+        fade_duration: Duration of the fade-in and fade-out in seconds; 0
+                       disables the fades.
 
     Returns:
         A list of paths to the generated audio clips.
@@ -32,7 +39,7 @@ def cut_audio(input_path: str, selections: list):
     if not selections:
         return []
 
-    os.makedirs(CLIP_DIR, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
 
     # Base FFmpeg command.
     command = ["ffmpeg", "-y", "-i", input_path]
@@ -40,22 +47,26 @@ def cut_audio(input_path: str, selections: list):
     output_clips = []
 
     for i, seg in enumerate(selections):
-        output_path = os.path.join(CLIP_DIR, f"clip_{i}.wav")
+        output_path = os.path.join(out_dir, f"clip_{i}.wav")
         output_clips.append(output_path)
 
         # Calculate start and end times with padding.
-        start = max(0.0, seg["start"] - PAD_START)
-        end = seg["end"] + PAD_END
+        start = max(0.0, seg["start"] - pad_start)
+        end = seg["end"] + pad_end
         duration = end - start
 
         # Construct the filter complex part for this clip.
         # It trims the audio, resets the timestamp, and applies fade effects.
+        fades = (
+            f",afade=t=in:st=0:d={fade_duration},"
+            f"afade=t=out:st={max(0.0, duration - fade_duration)}:d={fade_duration}"
+            if fade_duration > 0 else ""
+        )
         filter_complex_parts.append(
             f"[0:a]"
             f"atrim=start={start}:end={end},"
-            f"asetpts=PTS-STARTPTS,"
-            f"afade=t=in:st=0:d={FADE_DURATION},"
-            f"afade=t=out:st={max(0.0, duration - FADE_DURATION)}:d={FADE_DURATION}"
+            f"asetpts=PTS-STARTPTS"
+            f"{fades}"
             f"[a{i}]"
         )
 
@@ -66,12 +77,7 @@ def cut_audio(input_path: str, selections: list):
     command.insert(4, ";".join(filter_complex_parts))
     command.insert(4, "-filter_complex")
 
-    # Run the FFmpeg command.
-    subprocess.run(
-        command,
-        check=True,
-        capture_output=True,
-        text=True
-    )
+    # Run the FFmpeg command on the shared runner (raises on failure).
+    run_ffmpeg(command, on_progress=on_progress, description="FFmpeg cutting")
 
     return output_clips
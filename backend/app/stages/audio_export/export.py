@@ -0,0 +1,123 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.ffmpeg import run_ffmpeg, FFMPEG_CONCURRENCY
+from utils.logger import logger
+
+# Directory for encoded exports; each pipeline run gets its own subdirectory.
+EXPORT_DIR = "/runtime/data/output_podcast/exports"
+
+# Encoder and file extension for each supported export format.
+EXPORT_CODECS = {
+    "mp3": ("libmp3lame", "mp3"),
+    "opus": ("libopus", "opus"),
+    "aac": ("aac", "m4a"),
+}
+
+# Maximum number of encodes of a single export running at the same time.
+# The encoder processes also count against the global FFmpeg limit.
+EXPORT_WORKERS = FFMPEG_CONCURRENCY
+
+
+def parse_export_targets(spec: str) -> list:
+    """
+    Parses an export specification such as "mp3:128k,opus:64k,aac:96k".
+
+    Args:
+        spec: Comma-separated list of format:bitrate pairs.
+
+    Returns:
+        A list of (format, bitrate) tuples.
+
+    Raises:
+        ValueError: If a format is unsupported or an entry is malformed.
+    """
+    targets = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        fmt, _, bitrate = item.lower().partition(":")
+        if fmt not in EXPORT_CODECS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        # Bitrates are given in kbit/s, e.g. "128k".
+        if not (bitrate.endswith("k") and bitrate[:-1].isdigit()):
+            raise ValueError(f"Invalid export bitrate: {item}")
+        targets.append((fmt, bitrate))
+
+    return targets
+
+
+def _encode(source_path: str, fmt: str, bitrate: str, output_path: str) -> dict:
+    """
+    Encodes a PCM WAV file into one export target.
+
+    Returns:
+        A dictionary describing the encoded file.
+    """
+    codec, _ = EXPORT_CODECS[fmt]
+    started = time.monotonic()
+
+    run_ffmpeg(
+        [
+            "ffmpeg", "-y",
+            "-i", source_path,
+            "-vn",
+            "-c:a", codec,
+            "-b:a", bitrate,
+            output_path
+        ],
+        description=f"FFmpeg {fmt} export"
+    )
+
+    return {
+        "source": source_path,
+        "format": fmt,
+        "bitrate": bitrate,
+        "path": output_path,
+        "size_bytes": os.path.getsize(output_path),
+        "encode_seconds": round(time.monotonic() - started, 3)
+    }
+
+
+def export_audio(
+    pipeline_id: str,
+    final_audio: str,
+    targets: list,
+    clips: list = None
+) -> list:
+    """
+    Encodes the final mix, and optionally each clip, into several formats.
+
+    All encodes read the same decoded PCM WAV source and run in parallel in a
+    bounded pool of encoder processes.
+
+    Args:
+        pipeline_id: The ID of the pipeline run; used for the output directory.
+        final_audio: Path to the stitched PCM WAV file, or None if no
+                     clips were selected (then only clips are exported).
+        targets: A list of (format, bitrate) tuples (see parse_export_targets).
+        clips: Optional list of clip WAV paths to export as well.
+
+    Returns:
+        A list of dictionaries with the path, size and encode time of every
+        exported file.
+    """
+    sources = [source for source in [final_audio] + list(clips or []) if source is not None]
+    if not targets or not sources:
+        return []
+
+    out_dir = os.path.join(EXPORT_DIR, pipeline_id)
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = []
+    for source in sources:
+        stem = os.path.splitext(os.path.basename(source))[0]
+        for fmt, bitrate in targets:
+            _, ext = EXPORT_CODECS[fmt]
+            output_path = os.path.join(out_dir, f"{stem}_{bitrate}.{ext}")
+            jobs.append((source, fmt, bitrate, output_path))
+
+    logger.info(f"[{pipeline_id}] Exporting {len(jobs)} files")
+
+    with ThreadPoolExecutor(max_workers=min(EXPORT_WORKERS, len(jobs))) as pool:
+        futures = [pool.submit(_encode, *job) for job in jobs]
+        return [future.result() for future in futures]
@@ -1,8 +1,7 @@
-import subprocess
-import shlex
+from utils.ffmpeg import run_ffmpeg
 from utils.logger import logger
 
-def normalize_audio(input_path: str, output_path: str):
+def normalize_audio(input_path: str, output_path: str, on_progress=None):
     """
     Normalizes an audio file to a standard format for Automatic Speech Recognition (ASR).
 
@@ -12,6 +11,7 @@ def normalize_audio(input_path: str, output_path: str):
     Args:
         input_path: The path to the input audio file.
         output_path: The path where the normalized audio file will be saved.
+        on_progress: Optional callback receiving FFmpeg progress updates.
 
     Returns:
         The path to the normalized output file.
@@ -25,15 +25,11 @@ def normalize_audio(input_path: str, output_path: str):
     # -ac 1: Set the number of audio channels to 1 (mono).
     # -ar 16000: Set the audio sampling frequency to 16kHz.
     # -sample_fmt s16: Set the sample format to 16-bit signed integer (PCM).
-    # shlex.quote is used to safely handle file paths with spaces or special characters.
-    cmd = (
-        f"ffmpeg -y -i {shlex.quote(input_path)} "
-        f"-ac 1 -ar 16000 -sample_fmt s16 {shlex.quote(output_path)}"
-    )
-    logger.info(f"Running ffmpeg normalize: {cmd}")
-    # Execute the FFmpeg command.
-    proc = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    # Check if the command was successful.
-    if proc.returncode != 0:
-        raise RuntimeError(f"FFmpeg normalization failed: {proc.stderr}")
+    cmd = [
+        "ffmpeg", "-y", "-i", input_path,
+        "-ac", "1", "-ar", "16000", "-sample_fmt", "s16", output_path
+    ]
+    logger.info(f"Running ffmpeg normalize: {' '.join(cmd)}")
+    # Execute the FFmpeg command on the shared runner (raises on failure).
+    run_ffmpeg(cmd, on_progress=on_progress, description="FFmpeg normalization")
     return output_path
@@ -1,49 +1,76 @@
-import subprocess
 import os
 import tempfile
 
-# Directory and file paths for the output and temporary silence file.
+from config.render import SILENCE_SECONDS
+from utils.ffmpeg import run_ffmpeg
+
+# Directory and file paths for the output. The silent pause files (e.g.
+# silence_1s.wav) are kept in the same directory.
 OUT_DIR = "/runtime/data/output_podcast"
 OUT_FILE = os.path.join(OUT_DIR, "final.wav")
-SILENCE_FILE = os.path.join(OUT_DIR, "silence_1s.wav")
 
 
-def _ensure_silence():
+def _ensure_silence(seconds: float = SILENCE_SECONDS) -> str:
     """
-    Creates a 1-second silent WAV file if it does not already exist.
+    Creates a silent WAV file of the given length if it does not already
+    exist.
 
     This silent clip is used to add pauses between stitched audio segments.
     The audio is generated at 16kHz mono, matching the expected format of the clips.
+
+    Returns:
+        The path of the silent file.
     """
-    if os.path.exists(SILENCE_FILE):
-        return
+    silence_file = os.path.join(OUT_DIR, f"silence_{seconds:g}s.wav")
+    if os.path.exists(silence_file):
+        return silence_file
 
     os.makedirs(OUT_DIR, exist_ok=True)
 
-    # Use FFmpeg to generate a 1-second silent audio file.
-    subprocess.run(
-        [
-            "ffmpeg", "-y",
-            "-f", "lavfi",
-            "-i", "anullsrc=r=16000:cl=mono", # Use lavfi anullsrc filter
-            "-t", "1", # Duration of 1 second
-            SILENCE_FILE
-        ],
-        check=True,
-        capture_output=True,
-        text=True
-    )
-
-
-def stitch_audio(clips: list):
+    # Workers (threads and processes) sharing the output directory may create
+    # the file at the same time, so it is written under a unique name and
+    # renamed into place.
+    fd, tmp_file = tempfile.mkstemp(prefix=f"silence_{seconds:g}s.", suffix=".wav", dir=OUT_DIR)
+    os.close(fd)
+
+    try:
+        # Use FFmpeg to generate the silent audio file.
+        run_ffmpeg(
+            [
+                "ffmpeg", "-y",
+                "-f", "lavfi",
+                "-i", "anullsrc=r=16000:cl=mono", # Use lavfi anullsrc filter
+                "-t", f"{seconds:g}", # Duration of the pause
+                tmp_file
+            ],
+            timeout=60,
+            description="FFmpeg silence generation"
+        )
+        os.replace(tmp_file, silence_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return silence_file
+
+
+def stitch_audio(
+    clips: list,
+    out_file: str = OUT_FILE,
+    on_progress=None,
+    silence_seconds: float = SILENCE_SECONDS
+):
     """
     Stitches a list of audio clips together into a single WAV file.
 
-    A 1-second silent pause is inserted between each clip. This function uses
-    FFmpeg's concat demuxer for stitching.
+    A silent pause (1 second by default) is inserted between each clip. This
+    function uses FFmpeg's concat demuxer for stitching.
 
     Args:
         clips: A list of paths to the audio clips to be stitched.
+        out_file: The path of the stitched output file. Defaults to final.wav.
+        on_progress: Optional callback receiving FFmpeg progress updates.
+        silence_seconds: The length of the pause between clips; 0 joins the
+                         clips directly.
 
     Returns:
         The path to the final stitched audio file, or None if the input list is empty.
@@ -51,8 +78,8 @@ def stitch_audio(clips: list):
     if not clips:
         return None
 
-    os.makedirs(OUT_DIR, exist_ok=True)
-    _ensure_silence()
+    os.makedirs(os.path.dirname(out_file), exist_ok=True)
+    silence_file = _ensure_silence(silence_seconds) if silence_seconds > 0 else None
 
     # Create a temporary file to list the clips for FFmpeg's concat demuxer.
     fd, concat_list_path = tempfile.mkstemp(suffix=".txt", text=True)
@@ -65,9 +92,9 @@ def stitch_audio(clips: list):
                 safe_clip = clip_path.replace(os.path.sep, '/').replace("'", "'\\''")
                 f.write(f"file '{safe_clip}'\n")
 
-                # Insert 1 second of silence between clips.
-                if i < len(clips) - 1:
-                    safe_silence = SILENCE_FILE.replace(os.path.sep, '/')
+                # Insert the silent pause between clips.
+                if silence_file is not None and i < len(clips) - 1:
+                    safe_silence = silence_file.replace(os.path.sep, '/')
                     f.write(f"file '{safe_silence}'\n")
 
         # FFmpeg command to concatenate the files listed in the temp file.
@@ -77,18 +104,13 @@ def stitch_audio(clips: list):
             "-safe", "0", # Disable safety checks for file paths
             "-i", concat_list_path,
             "-c:a", "pcm_s16le",   # Re-encode to a standard PCM format
-            OUT_FILE
+            out_file
         ]
 
-        subprocess.run(
-            command,
-            check=True,
-            capture_output=True,
-            text=True
-        )
+        run_ffmpeg(command, on_progress=on_progress, description="FFmpeg stitching")
 
     finally:
         # Clean up the temporary file.
         os.remove(concat_list_path)
 
-    return OUT_FILE
+    return out_file
@@ -0,0 +1,162 @@
+import wave
+
+import numpy as np
+
+from utils.logger import logger
+
+# Acoustic fingerprints of normalized audio, robust to re-encoding.
+#
+# The spectrogram's strongest peak per frequency band is kept where it is a
+# local maximum in time. Pairs of nearby peaks are hashed from their two
+# frequencies and their time difference, so a hash does not depend on where
+# in the recording it occurs: the same audio re-encoded (MP3, M4A, WAV) or
+# shifted in time yields mostly the same hashes, at frame positions moved by
+# the shift.
+
+# Sample rate of the normalized audio (16kHz mono 16-bit PCM).
+SAMPLE_RATE = 16000
+
+# STFT frame length and hop in samples (64 ms frames every 32 ms).
+FFT_SIZE = 1024
+HOP_SIZE = 512
+
+# Length of one fingerprint frame in seconds.
+FRAME_SECONDS = HOP_SIZE / SAMPLE_RATE
+
+# Frequency bands, as FFT bin ranges, in which one peak per frame is picked:
+# 250-500 Hz, 500-1000 Hz, 1-2 kHz and 2-4 kHz, where speech carries most
+# of its energy.
+PEAK_BANDS = [(16, 32), (32, 64), (64, 128), (128, 256)]
+
+# A band peak is kept only if it is the band's maximum within this many
+# frames on either side (about a quarter second).
+PEAK_NEIGHBORHOOD_FRAMES = 8
+
+# Peaks quieter than this (dBFS) are ignored, so silence yields no hashes.
+PEAK_FLOOR_DB = -70.0
+
+# Peak frequencies are quantized by this many bits, so peaks moved by one
+# bin in a re-encoding still hash the same.
+FREQ_QUANT_BITS = 1
+
+# Each peak is paired with this many following peaks.
+FAN_OUT = 6
+
+# Paired peaks are at most this many frames apart (6 bits of the hash).
+MAX_PAIR_FRAMES = 63
+
+# Only about one in this many hashes is kept. The choice depends on the hash
+# value alone, so it is the same for every copy of a recording; it shrinks
+# the index and the lookups.
+HASH_SAMPLING = 2
+
+# Audio is read and transformed in windows of this length (seconds), so
+# memory use does not grow with the recording.
+FINGERPRINT_WINDOW_SECONDS = 60
+
+
+def _band_peaks(audio_path: str):
+    """
+    Computes each frame's strongest bin and its level in every peak band.
+
+    Args:
+        audio_path: The path to the normalized WAV file.
+
+    Returns:
+        A tuple of (bins, levels) arrays of shape (frames, bands), the levels
+        in dBFS.
+
+    Raises:
+        RuntimeError: If the file is not 16kHz mono 16-bit PCM.
+    """
+    window = np.hanning(FFT_SIZE).astype(np.float32)
+    # Scale so a full-scale sine peaks at 0 dB.
+    scale = 2.0 / window.sum()
+    bins, levels = [], []
+    carry = np.zeros(0, dtype=np.float32)
+
+    with wave.open(audio_path, "rb") as wav:
+        if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+            raise RuntimeError(f"Fingerprinting needs 16kHz mono 16-bit audio: {audio_path}")
+
+        while True:
+            raw = wav.readframes(int(FINGERPRINT_WINDOW_SECONDS * SAMPLE_RATE))
+            if not raw:
+                break
+
+            # Frames overlap window boundaries, so the unused tail of each
+            # window is carried over to the next one.
+            samples = np.concatenate([
+                carry, np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+            ])
+            count = (len(samples) - FFT_SIZE) // HOP_SIZE + 1
+            if count <= 0:
+                carry = samples
+                continue
+
+            frames = np.lib.stride_tricks.sliding_window_view(samples, FFT_SIZE)[::HOP_SIZE][:count]
+            spectrum = np.abs(np.fft.rfft(frames * window, axis=1)) * scale
+            carry = samples[count * HOP_SIZE:]
+
+            for lo, hi in PEAK_BANDS:
+                band = spectrum[:, lo:hi]
+                strongest = band.argmax(axis=1)
+                bins.append(lo + strongest)
+                levels.append(20 * np.log10(band[np.arange(count), strongest] + 1e-10))
+
+    if not bins:
+        empty = np.zeros((0, len(PEAK_BANDS)))
+        return empty.astype(np.int64), empty
+
+    # The lists hold one array per band for each window, window by window.
+    n = len(PEAK_BANDS)
+    bins = np.concatenate([np.stack(bins[i:i + n], axis=1) for i in range(0, len(bins), n)])
+    levels = np.concatenate([np.stack(levels[i:i + n], axis=1) for i in range(0, len(levels), n)])
+    return bins.astype(np.int64), levels
+
+
+def compute_fingerprint(audio_path: str):
+    """
+    Computes the fingerprint of a normalized audio file.
+
+    Args:
+        audio_path: The path to the normalized (16kHz mono 16-bit) WAV file.
+
+    Returns:
+        A tuple of (hashes, frames) int64 arrays: the peak-pair hashes and
+        the frame index of each pair's first peak (see FRAME_SECONDS).
+    """
+    bins, levels = _band_peaks(audio_path)
+    if len(levels) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Keep band maxima that are local maxima in time and stand out from the
+    # band's typical level.
+    n = PEAK_NEIGHBORHOOD_FRAMES
+    padded = np.pad(levels, ((n, n), (0, 0)), constant_values=-np.inf)
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * n + 1, axis=0).max(axis=-1)
+    threshold = np.maximum(np.median(levels, axis=0), PEAK_FLOOR_DB)
+    frames, bands = np.nonzero((levels >= local_max) & (levels > threshold))
+    freqs = bins[frames, bands] >> FREQ_QUANT_BITS
+
+    # Pair every peak with the next FAN_OUT peaks (peaks are ordered by
+    # frame). Pairs within one frame or too far apart are skipped.
+    hashes, anchors = [], []
+    for k in range(1, FAN_OUT + 1):
+        dt = frames[k:] - frames[:-k]
+        ok = (dt > 0) & (dt <= MAX_PAIR_FRAMES)
+        hashes.append((freqs[:-k][ok] << 14) | (freqs[k:][ok] << 6) | dt[ok])
+        anchors.append(frames[:-k][ok])
+
+    hashes = np.concatenate(hashes).astype(np.int64)
+    anchors = np.concatenate(anchors).astype(np.int64)
+
+    # Keep a pseudo-random subset of the hash values (Fibonacci hashing).
+    keep = ((hashes * 0x9E3779B1) & 0xFFFFFFFF) % HASH_SAMPLING == 0
+    hashes, anchors = hashes[keep], anchors[keep]
+
+    logger.info(
+        f"Fingerprint: {len(frames)} peaks, {len(hashes)} hashes "
+        f"over {len(levels) * FRAME_SECONDS:.0f}s"
+    )
+    return hashes, anchors
@@ -1,5 +1,4 @@
-import subprocess
-import shlex
+from utils.ffmpeg import run_ffmpeg
 from utils.logger import logger
 from config.limits import MAX_AUDIO_DURATION_SECONDS
 
@@ -20,19 +19,20 @@ def _ffprobe_duration(path: str) -> float:
     # -v error: Only show errors.
     # -show_entries format=duration: Show only the duration from the format information.
     # -of default=noprint_wrappers=1:nokey=1: Output format that's easy to parse (just the value).
-    cmd = (
-        "ffprobe -v error "
-        "-show_entries format=duration "
-        "-of default=noprint_wrappers=1:nokey=1 "
-        f"{shlex.quote(path)}"
-    )
-    proc = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    if proc.returncode != 0:
-        raise RuntimeError(f"ffprobe error: {proc.stderr.strip()}")
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        path
+    ]
+    stdout = run_ffmpeg(cmd, timeout=60, description="ffprobe")
     # The output of the command is the duration in seconds as a string, so we convert it to float.
-    return float(proc.stdout.strip())
+    return float(stdout.strip())
 
-def validate_audio_duration(path: str) -> float:
+def validate_audio_duration(
+    path: str,
+    max_duration: float = MAX_AUDIO_DURATION_SECONDS
+) -> float:
     """
     Validates that the audio duration is within the allowed limit.
 
@@ -40,6 +40,8 @@ def validate_audio_duration(path: str) -> float:
 
     Args:
         path: The path to the audio file.
+        max_duration: The maximum allowed duration in seconds. Streaming mode
+                      passes a higher limit than the default.
 
     Returns:
         The duration of the audio file in seconds.
@@ -50,10 +52,10 @@ def validate_audio_duration(path: str) -> float:
     duration = _ffprobe_duration(path)
     logger.info(f"Audio duration: {duration} seconds")
 
-    # Check if the duration exceeds the maximum allowed duration from the config.
-    if duration > MAX_AUDIO_DURATION_SECONDS:
+    # Check if the duration exceeds the maximum allowed duration.
+    if duration > max_duration:
         raise RuntimeError(
-            f"AUDIO_TOO_LONG: {duration:.2f}s > {MAX_AUDIO_DURATION_SECONDS}s"
+            f"AUDIO_TOO_LONG: {duration:.2f}s > {max_duration}s"
         )
 
     return duration
@@ -1,14 +1,15 @@
+import heapq
 import json
 from pathlib import Path
 
 from models.cross_encoder_loader import load_cross_encoder
+from config.limits import STREAMING_SCORING_CHUNK_SIZE
 from config.paths import RUNTIME_DATA_SENTENCE_SELECTION
+from config.render import MERGE_GAP, TOP_K
+from stages.transcription.transcript_store import TranscriptReader
 from utils.logger import logger
 
 
-# Maximum gap in seconds between two segments to be considered for merging.
-MERGE_GAP = 0.6  # seconds
-
 # Pre-defined queries for different tones, used by the Cross-Encoder model.
 TONE_QUERIES = {
     "informative": (
@@ -31,12 +32,13 @@ TONE_QUERIES = {
     ),
 }
 
-def _merge_close_segments(segments):
+def _merge_close_segments(segments, merge_gap: float = MERGE_GAP):
     """
     Merges consecutive text segments that are close to each other.
 
     Args:
         segments: A list of sentence segments, each with 'start' and 'end' times.
+        merge_gap: The maximum gap in seconds between two merged segments.
 
     Returns:
         A new list of merged sentence segments.
@@ -52,7 +54,7 @@ def _merge_close_segments(segments):
         prev = merged[-1]
 
         # If the gap between the previous and current segment is small enough, merge them.
-        if cur["start"] - prev["end"] <= MERGE_GAP:
+        if cur["start"] - prev["end"] <= merge_gap:
             prev["end"] = max(prev["end"], cur["end"])
             prev["text"] = prev["text"] + " " + cur["text"]
         else:
@@ -61,11 +63,48 @@ def _merge_close_segments(segments):
     return merged
 
 
+def _select_top_k_streaming(model, query: str, reader: TranscriptReader, top_k: int):
+    """
+    Scores sentences in fixed-size chunks, keeping only the best top_k.
+
+    A min-heap of size top_k holds (score, index) pairs for the current best
+    sentences, so memory use is bounded by the chunk size and top_k rather than
+    the transcript length.
+
+    Args:
+        model: The loaded Cross-Encoder model.
+        query: The tone query to score sentences against.
+        reader: The transcript to score.
+        top_k: The number of top-scoring sentences to keep.
+
+    Returns:
+        The indices of the top_k sentences, ordered by score in descending order.
+    """
+    heap = []
+
+    for lo in range(0, len(reader), STREAMING_SCORING_CHUNK_SIZE):
+        hi = min(lo + STREAMING_SCORING_CHUNK_SIZE, len(reader))
+        scores = model.predict([(query, reader.text(i)) for i in range(lo, hi)])
+
+        for i, score in zip(range(lo, hi), scores):
+            # Earlier sentences win ties, matching the stable sort of the
+            # in-memory path.
+            item = (float(score), -i)
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heappushpop(heap, item)
+
+    return [-neg_i for _, neg_i in sorted(heap, reverse=True)]
+
+
 def run_sentence_selection(
-    whisper_json_path: str,
+    transcript_path: str,
     tone: str,
     state: dict,
-    top_k: int = 12
+    top_k: int = TOP_K,
+    streaming: bool = False,
+    merge_gap: float = MERGE_GAP
 ):
     """
     Selects the most relevant sentences from a transcription based on a given tone.
@@ -74,45 +113,49 @@ def run_sentence_selection(
     representing the desired tone.
 
     Args:
-        whisper_json_path: Path to the JSON output from the Whisper transcription stage.
+        transcript_path: Path to the binary transcript from the Whisper stage.
         tone: The desired tone for sentence selection (e.g., "informative").
         state: The current pipeline state dictionary.
         top_k: The number of top-scoring sentences to select.
+        streaming: If True, score the transcript in chunks with a fixed-size
+                   top-k heap instead of scoring every sentence at once.
+        merge_gap: The maximum gap in seconds between selected sentences
+                   that are merged into one segment.
 
     Returns:
         A list of the selected and merged sentence segments.
     """
     logger.info("Running Cross-Encoder sentence selection")
 
-    with open(whisper_json_path, "r", encoding="utf-8") as f:
-        whisper_data = json.load(f)
-
-    sentences = whisper_data["sentences"]
-
     if tone not in TONE_QUERIES:
         raise RuntimeError(f"Unsupported tone: {tone}")
 
     query = TONE_QUERIES[tone]
 
-    # Create pairs of (query, sentence) for the Cross-Encoder model.
-    pairs = [(query, s["text"]) for s in sentences]
-
-    # Load the Cross-Encoder model and predict scores for the pairs.
+    # Load the Cross-Encoder model.
     model = load_cross_encoder()
-    scores = model.predict(pairs)
 
-    # Rank sentences by their scores in descending order.
-    ranked = sorted(
-        zip(scores, sentences),
-        key=lambda x: x[0],
-        reverse=True
-    )
+    with TranscriptReader(transcript_path) as reader:
+        if streaming:
+            top_ids = _select_top_k_streaming(model, query, reader, top_k)
+        else:
+            # Create pairs of (query, sentence) and predict scores for them.
+            pairs = [(query, text) for text in reader.iter_texts()]
+            scores = model.predict(pairs) if pairs else []
+
+            # Rank sentence indices by their scores in descending order.
+            ranked = sorted(
+                range(len(pairs)),
+                key=lambda i: scores[i],
+                reverse=True
+            )
+            top_ids = ranked[:top_k]
 
-    # Select the top_k sentences.
-    selected = [s for _, s in ranked[:top_k]]
+        # Only the selected sentences are materialized as dictionaries.
+        selected = [reader.sentence(i) for i in top_ids]
 
     # Merge sentences that are close to each other.
-    selected_sentences = _merge_close_segments(selected)
+    selected_sentences = _merge_close_segments(selected, merge_gap)
 
     # Update the pipeline state with the selected sentences.
     state["artifacts"]["selected_sentences"] = selected_sentences
@@ -133,6 +176,8 @@ def run_sentence_selection(
                 "pipeline_id": pipeline_id,
                 "model": "cross-encoder/ms-marco-MiniLM-L-6-v2",
                 "tone": tone,
+                "top_k": top_k,
+                "merge_gap": merge_gap,
                 "sentences": selected_sentences
             },
             f,
@@ -0,0 +1,274 @@
+import json
+import mmap
+import os
+import struct
+from array import array
+
+import numpy as np
+
+# Compact binary transcript format (little-endian):
+#
+#   header   magic "CFTR", version (u32), count (u64),
+#            text_offset (u64), index_offset (u64)
+#   text     UTF-8 sentence texts, concatenated without separators
+#   index    starts (f64[count]), ends (f64[count]), offsets (u64[count + 1])
+#
+# The index is written after the text so the file can be produced in a single
+# pass while sentences are still being decoded. Offsets are relative to
+# text_offset, so sentence i is text[offsets[i]:offsets[i + 1]].
+MAGIC = b"CFTR"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQQQ")
+
+# File extension used for binary transcripts.
+TRANSCRIPT_SUFFIX = ".cftr"
+
+
+class TranscriptWriter:
+    """
+    Writes sentences to a binary transcript file incrementally.
+
+    Sentence texts go straight to disk; only the compact start/end/offset
+    arrays are kept in memory until the writer is closed.
+
+    The file is written under a temporary name and only moved to its path
+    once it is complete, so a run that fails mid-transcript never leaves a
+    truncated transcript that looks valid. Used as a context manager, the
+    writer discards the file if the block raises.
+    """
+    def __init__(self, path: str):
+        """
+        Opens the transcript file for writing.
+
+        Args:
+            path: The path of the transcript file to create.
+        """
+        self.path = str(path)
+        self._tmp_path = f"{self.path}.tmp"
+        self._f = open(self._tmp_path, "wb")
+        # Reserve space for the header; it is filled in on close.
+        self._f.write(b"\0" * _HEADER.size)
+        self._starts = array("d")
+        self._ends = array("d")
+        self._offsets = array("Q", [0])
+        self._text_size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self):
+        return len(self._starts)
+
+    def append(self, start: float, end: float, text: str):
+        """
+        Appends a single sentence to the transcript.
+
+        Args:
+            start: The start time of the sentence in seconds.
+            end: The end time of the sentence in seconds.
+            text: The sentence text.
+        """
+        data = text.encode("utf-8")
+        self._f.write(data)
+        self._text_size += len(data)
+        self._starts.append(float(start))
+        self._ends.append(float(end))
+        self._offsets.append(self._text_size)
+
+    def close(self):
+        """
+        Writes the index and header, closes the file and moves it to its
+        path.
+        """
+        if self._f.closed:
+            return
+
+        text_offset = _HEADER.size
+        # Align the index so the float arrays can be viewed without copying.
+        padding = -(text_offset + self._text_size) % 8
+        self._f.write(b"\0" * padding)
+        index_offset = text_offset + self._text_size + padding
+
+        self._starts.tofile(self._f)
+        self._ends.tofile(self._f)
+        self._offsets.tofile(self._f)
+
+        self._f.seek(0)
+        self._f.write(_HEADER.pack(
+            MAGIC, VERSION, len(self._starts), text_offset, index_offset
+        ))
+        self._f.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """
+        Closes and removes the unfinished file without writing a transcript.
+        """
+        if self._f.closed:
+            return
+
+        self._f.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class TranscriptReader:
+    """
+    Reads a binary transcript through a memory map.
+
+    Start and end times are exposed as numpy views over the mapped file, and
+    sentence texts are decoded only when requested, so opening a transcript
+    costs the same regardless of its length.
+    """
+    def __init__(self, path: str):
+        """
+        Maps the transcript file into memory.
+
+        Args:
+            path: The path of the transcript file.
+
+        Raises:
+            RuntimeError: If the file is not a valid binary transcript.
+        """
+        self.path = str(path)
+        self._f = open(self.path, "rb")
+
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close()
+            raise RuntimeError(f"Invalid transcript file: {self.path}")
+
+        magic, version, count, text_offset, index_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise RuntimeError(f"Invalid transcript file: {self.path}")
+
+        self._count = count
+        self._text_offset = text_offset
+
+        self.starts = np.frombuffer(self._mm, dtype="<f8", count=count, offset=index_offset)
+        self.ends = np.frombuffer(
+            self._mm, dtype="<f8", count=count, offset=index_offset + 8 * count
+        )
+        self._offsets = np.frombuffer(
+            self._mm, dtype="<u8", count=count + 1, offset=index_offset + 16 * count
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def text(self, i: int) -> str:
+        """
+        Returns the text of sentence i.
+        """
+        lo = self._text_offset + int(self._offsets[i])
+        hi = self._text_offset + int(self._offsets[i + 1])
+        return self._mm[lo:hi].decode("utf-8")
+
+    def sentence(self, i: int) -> dict:
+        """
+        Returns sentence i as a dictionary with id, start, end and text.
+        """
+        return {
+            "id": i,
+            "start": float(self.starts[i]),
+            "end": float(self.ends[i]),
+            "text": self.text(i)
+        }
+
+    def iter_texts(self):
+        """
+        Lazily yields the text of every sentence in order.
+        """
+        for i in range(self._count):
+            yield self.text(i)
+
+    def iter_sentences(self):
+        """
+        Lazily yields every sentence as a dictionary in order.
+        """
+        for i in range(self._count):
+            yield self.sentence(i)
+
+    def close(self):
+        """
+        Releases the memory map and the underlying file.
+        """
+        # Drop the numpy views first; the map cannot close while they exist.
+        self.starts = self.ends = self._offsets = None
+        if not self._mm.closed:
+            self._mm.close()
+        self._f.close()
+
+
+def export_json(transcript_path: str, json_path: str, metadata: dict = None):
+    """
+    Exports a binary transcript as pretty-printed JSON for debugging.
+
+    The output matches the layout of the original Whisper JSON artifact:
+    the metadata keys followed by a "sentences" list.
+
+    Args:
+        transcript_path: The path of the binary transcript.
+        json_path: The path of the JSON file to write.
+        metadata: Optional top-level keys (e.g. audio_metadata, model_info).
+
+    Returns:
+        The path of the written JSON file.
+    """
+    with TranscriptReader(transcript_path) as reader:
+        out = dict(metadata or {})
+        out["sentences"] = list(reader.iter_sentences())
+
+    tmp_path = f"{json_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, json_path)
+
+    return json_path
+
+
+def shift_transcript(source_path: str, dest_path: str, offset: float, duration: float):
+    """
+    Writes a copy of a transcript with every time moved by an offset, e.g.
+    for the same recording with audio added or cut at the start.
+
+    Sentences entirely outside [0, duration] after the shift are dropped;
+    sentences crossing a boundary are clipped to it.
+
+    Args:
+        source_path: The path of the binary transcript to copy.
+        dest_path: The path of the binary transcript to write.
+        offset: The seconds added to every start and end time.
+        duration: The duration of the shifted recording in seconds.
+
+    Returns:
+        A numpy array with the source index of every kept sentence, in
+        order; kept sentence i was sentence kept[i] of the source.
+    """
+    with TranscriptReader(source_path) as reader, TranscriptWriter(dest_path) as writer:
+        starts = reader.starts + offset
+        ends = reader.ends + offset
+        kept = np.nonzero((ends > 0) & (starts < duration))[0]
+
+        for i in kept:
+            writer.append(
+                max(0.0, starts[i]), min(duration, ends[i]), reader.text(int(i))
+            )
+
+    return kept
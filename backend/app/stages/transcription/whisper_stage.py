@@ -1,50 +1,221 @@
 import json
 import os
-import gc
+import wave
 from pathlib import Path
-from faster_whisper import WhisperModel
+
+import numpy as np
+
+from config.limits import STREAMING_WINDOW_OVERLAP_SECONDS, STREAMING_WINDOW_SECONDS
+from config.paths import RUNTIME_STATE_DIR
+from config.transcription_profiles import (
+    DEFAULT_TRANSCRIPTION_PROFILE,
+    get_transcription_profile,
+)
+from models.whisper_loader import load_whisper_model
+from stages.transcription.transcript_store import (
+    TRANSCRIPT_SUFFIX,
+    TranscriptWriter,
+    export_json,
+)
 from utils.logger import logger
 
 
+def transcribe_options(profile: dict) -> dict:
+    """
+    Builds the keyword arguments for WhisperModel.transcribe from a profile.
+
+    Args:
+        profile: The transcription profile settings.
+
+    Returns:
+        A dictionary of transcribe() keyword arguments.
+    """
+    return {
+        "beam_size": profile["beam_size"],
+        "language": profile["language"],
+        "condition_on_previous_text": profile["condition_on_previous_text"],
+        "vad_filter": False,
+        "word_timestamps": False
+    }
+
+
 def _group_segments_to_sentences(segments):
     """
     Groups Whisper segments into sentences.
 
-    This function takes the raw segments from Whisper and formats them into a
-    cleaner list of sentences with start, end, and text.
+    This function takes the raw segments from Whisper and formats them into
+    cleaner sentences with start, end, and text. It is a generator, so each
+    sentence is available as soon as its segment has been decoded.
 
     Args:
-        segments: A list of segment dictionaries from Whisper.
+        segments: An iterable of segment dictionaries from Whisper.
 
-    Returns:
-        A list of sentence dictionaries.
+    Yields:
+        Sentence dictionaries.
     """
-    sentences = []
-
     for seg in segments:
         text = seg.get("text", "").strip()
         if not text:
             continue
 
-        sentences.append({
+        yield {
             "start": float(seg["start"]),
             "end": float(seg["end"]),
             "text": text
-        })
+        }
+
+
+def _read_audio_window(audio_path: str, start_seconds: float, window_seconds: float):
+    """
+    Reads one window of a normalized WAV file.
+
+    The normalization stage guarantees 16kHz mono 16-bit PCM, so the window
+    can be converted directly into the float32 array Whisper expects. Only one
+    window is held in memory at a time.
+
+    Args:
+        audio_path: The path to the normalized WAV file.
+        start_seconds: The start of the window in seconds.
+        window_seconds: The length of the window in seconds.
+
+    Returns:
+        A tuple of (window_end_seconds, float32 samples).
+    """
+    with wave.open(audio_path, "rb") as wav:
+        sample_rate = wav.getframerate()
+        start_frame = min(int(start_seconds * sample_rate), wav.getnframes())
+        wav.setpos(start_frame)
+        raw = wav.readframes(int(window_seconds * sample_rate))
+
+    # Convert 16-bit PCM to float32 in the range [-1.0, 1.0].
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    return (start_frame + len(samples)) / sample_rate, samples
+
+
+def _wav_duration(audio_path: str) -> float:
+    """
+    Returns the duration of a WAV file in seconds, read from its header.
+    """
+    with wave.open(audio_path, "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def _run_streaming_transcription(
+    model,
+    audio_path: str,
+    writer,
+    jsonl_path: Path,
+    profile: dict,
+    on_sentence=None
+):
+    """
+    Transcribes an audio file window by window, writing sentences incrementally.
+
+    Segments are written to the binary transcript and to a JSON Lines debug
+    export as soon as the Whisper generator yields them, so memory use does not
+    grow with the length of the recording.
+
+    Windows are not cut blindly: segments ending in the last
+    STREAMING_WINDOW_OVERLAP_SECONDS of a window (which the cut may have
+    truncated) are dropped, and the next window starts at the first dropped
+    segment, so it is decoded again with its full audio and the context
+    before it. Segments ending before the last written one are skipped, so
+    nothing is written twice.
+
+    Args:
+        model: The loaded WhisperModel.
+        audio_path: The path to the normalized WAV file.
+        writer: The TranscriptWriter receiving the sentences.
+        jsonl_path: The path of the JSON Lines export to write.
+        profile: The transcription profile settings.
+        on_sentence: Optional callback receiving each sentence as it is written.
+
+    Returns:
+        A tuple of (duration_seconds, language).
+    """
+    duration = _wav_duration(audio_path)
+    language = profile["language"]
+    start = 0.0
+    written = 0.0
+
+    with jsonl_path.open("w", encoding="utf-8") as f:
+        while start < duration:
+            end, samples = _read_audio_window(audio_path, start, STREAMING_WINDOW_SECONDS)
+            last = end >= duration
+            cutoff = end - STREAMING_WINDOW_OVERLAP_SECONDS
+            next_start = cutoff
+
+            # Reuse the language detected on the first window so later
+            # windows skip detection.
+            options = {**transcribe_options(profile), "language": language}
+            segments, info = model.transcribe(samples, **options)
+            language = language or info.language
 
-    return sentences
+            for seg in segments:
+                seg_start, seg_end = start + seg.start, start + seg.end
+                if not last and seg_end > cutoff:
+                    # Possibly truncated; decode it again in the next window.
+                    next_start = max(written, seg_start)
+                    break
+                if seg_end <= written:
+                    continue
 
+                for sentence in _group_segments_to_sentences([{
+                    "start": seg_start,
+                    "end": seg_end,
+                    "text": seg.text
+                }]):
+                    sentence["id"] = len(writer)
+                    writer.append(sentence["start"], sentence["end"], sentence["text"])
+                    f.write(json.dumps(sentence, ensure_ascii=False) + "\n")
+                    if on_sentence is not None:
+                        on_sentence(sentence)
+                written = seg_end
 
-def run_whisper_transcription(audio_path: str, state: dict):
+            logger.info(
+                f"Streaming transcription: {min(end, duration):.0f}s decoded, "
+                f"{len(writer)} sentences written"
+            )
+
+            if last:
+                break
+            # Always advance, even if a single segment filled the window.
+            start = next_start if next_start > start else cutoff
+
+    return duration, language
+
+
+def run_whisper_transcription(
+    audio_path: str,
+    state: dict,
+    streaming: bool = False,
+    profile: str = DEFAULT_TRANSCRIPTION_PROFILE,
+    language: str = None,
+    on_event=None
+):
     """
     Runs the Whisper transcription process on an audio file.
 
+    The transcript is written in the compact binary format (see
+    transcript_store), which later stages read through a memory map. A
+    human-readable export is written next to it for debugging.
+
     Args:
         audio_path: The path to the audio file to be transcribed.
         state: The current pipeline state dictionary.
+        streaming: If True, decode the audio in fixed-size windows and write
+                   sentences incrementally instead of building the full
+                   transcript in memory. The debug export is then JSON Lines.
+        profile: The name of the transcription profile (model size, beam
+                 size, language, compute type, conditioning) to use.
+        language: Optional language code overriding the profile's language,
+                  which skips language detection.
+        on_event: Optional callback receiving a "sentence" event for every
+                  sentence as soon as it is decoded, with the decoding
+                  position and total duration for progress reporting.
 
     Returns:
-        A dictionary containing the transcription results.
+        A dictionary containing the transcription metadata and sentence count.
     """
     artifacts = state.get("artifacts", {})
     audio_basename = artifacts.get("audio_basename")
@@ -52,71 +223,87 @@ def run_whisper_transcription(audio_path: str, state: dict):
     if not audio_basename:
         raise RuntimeError("audio_basename missing in state.artifacts")
 
-    # Define the output path for the Whisper JSON result.
-    whisper_output_path = Path("/runtime/state") / f"{audio_basename}_whisper.json"
-    whisper_output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    logger.info("Loading Whisper model (medium) on CUDA")
-    # Load the faster-whisper model.
-    model = WhisperModel(
-        "medium",
-        device="cuda",
-        compute_type="int8_float16",  # Use mixed precision for performance.
-        cpu_threads=4,
-        num_workers=1
+    pipeline_id = state.get("pipeline_id")
+    if not pipeline_id:
+        raise RuntimeError("pipeline_id missing in state")
+
+    # Define the output paths for the binary transcript and its debug export,
+    # in the run's own state directory.
+    output_dir = Path(RUNTIME_STATE_DIR) / pipeline_id
+    output_dir.mkdir(parents=True, exist_ok=True)
+    transcript_path = output_dir / f"{audio_basename}_whisper{TRANSCRIPT_SUFFIX}"
+    export_path = output_dir / (
+        f"{audio_basename}_whisper.jsonl" if streaming
+        else f"{audio_basename}_whisper.json"
     )
-    logger.info("Model loaded")
-
-    try:
-        # Transcribe the audio file.
-        segments, info = model.transcribe(
-            audio_path,
-            beam_size=5,
-            vad_filter=False,
-            word_timestamps=False
-        )
 
-        # Convert generator to list and group segments into sentences.
-        segs = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
-        sentences = _group_segments_to_sentences(segs)
-
-        # Prepare the output data structure.
-        out = {
-            "audio_metadata": {
-                "original_filename": os.path.basename(audio_path),
-                "duration_seconds": float(info.duration),
-                "language": info.language
-            },
-            "model_info": {
-                "model_name": "whisper-medium",
-                "device": "cuda",
-                "precision": "int8_float16"
-            },
-            "sentences": sentences
-        }
+    settings = get_transcription_profile(profile, language)
+
+    # The model is loaded once per inference worker and reused across jobs.
+    model = load_whisper_model(settings["model_size"], settings["compute_type"])
+
+    total_duration = None
 
-        # Write the transcription output to a JSON file.
-        with whisper_output_path.open("w", encoding="utf-8") as f:
-            json.dump(out, f, indent=2, ensure_ascii=False)
+    def _on_sentence(sentence):
+        if on_event is not None:
+            on_event({
+                "event": "sentence",
+                "sentence": sentence,
+                "position": sentence["end"],
+                "duration": total_duration
+            })
 
-        # Update the pipeline state with the path to the output and the current stage.
-        state.setdefault("artifacts", {})
-        state["artifacts"]["whisper_output"] = str(whisper_output_path)
-        state["current_stage"] = "transcription_done"
+    with TranscriptWriter(transcript_path) as writer:
+        if streaming:
+            total_duration = _wav_duration(audio_path)
+            duration, language = _run_streaming_transcription(
+                model, audio_path, writer, export_path,
+                settings, on_sentence=_on_sentence
+            )
+        else:
+            # Transcribe the audio file.
+            segments, info = model.transcribe(audio_path, **transcribe_options(settings))
+            duration, language = float(info.duration), info.language
+            total_duration = duration
 
-        return out
+            # Group segments into sentences as the generator yields them.
+            segs = ({"start": s.start, "end": s.end, "text": s.text} for s in segments)
+            for sentence in _group_segments_to_sentences(segs):
+                sentence["id"] = len(writer)
+                writer.append(sentence["start"], sentence["end"], sentence["text"])
+                _on_sentence(sentence)
 
-    finally:
-        # Force release of GPU memory. This is crucial for long-running services
-        # to prevent memory leaks from the Whisper model.
-        try:
-            del model
-        except Exception:
-            pass
+        sentence_count = len(writer)
+
+    # Prepare the output data structure.
+    out = {
+        "audio_metadata": {
+            "original_filename": os.path.basename(audio_path),
+            "duration_seconds": duration,
+            "language": language
+        },
+        "model_info": {
+            "model_name": f"whisper-{settings['model_size']}",
+            "profile": settings["name"],
+            "beam_size": settings["beam_size"],
+            "device": "cuda",
+            "precision": settings["compute_type"]
+        },
+        "sentence_count": sentence_count
+    }
+
+    if not streaming:
+        # Write the pretty-printed JSON export for debugging.
+        export_json(
+            str(transcript_path),
+            str(export_path),
+            metadata={k: out[k] for k in ("audio_metadata", "model_info")}
+        )
 
-        gc.collect()
+    # Update the pipeline state with the paths to the outputs and the current stage.
+    state.setdefault("artifacts", {})
+    state["artifacts"]["whisper_output"] = str(transcript_path)
+    state["artifacts"]["whisper_export"] = str(export_path)
+    state["current_stage"] = "transcription_done"
 
-        import torch
-        if torch.cuda.is_available():
-            torch.cuda.synchronize()
-            torch.cuda.empty_cache()
+    return out
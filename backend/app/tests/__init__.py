@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The app's modules import each other from the app directory (e.g.
+# "from config.paths import ..."), as when run from it. Test discovery from
+# ./backend (see .vscode/settings.json) starts one level up.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pipeline import coalescing
+from pipeline.coalescing import JobCoalescer, submission_key
+
+
+class JobCoalescerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.coalescer = JobCoalescer(os.path.join(self.dir.name, "jobs.db"))
+        self.key = submission_key("hash", tone="informative", top_k=12)
+
+    def test_submission_key(self):
+        self.assertEqual(self.key, submission_key("hash", top_k=12, tone="informative"))
+        self.assertNotEqual(self.key, submission_key("hash", tone="funny", top_k=12))
+        self.assertNotEqual(self.key, submission_key("other", tone="informative", top_k=12))
+
+    def test_duplicate_attaches_to_running_job(self):
+        self.assertEqual(self.coalescer.claim(self.key, "a"), ("started", "a", None))
+        self.assertEqual(self.coalescer.claim(self.key, "b"), ("coalesced", "a", None))
+
+    def test_finished_result_is_reused(self):
+        self.coalescer.claim(self.key, "a")
+        self.coalescer.finish(self.key, "a", {"final_audio": "/out/a/final.wav"})
+
+        self.assertEqual(
+            self.coalescer.claim(self.key, "b"),
+            ("cached", "a", {"final_audio": "/out/a/final.wav"})
+        )
+        stats = self.coalescer.stats()
+        self.assertEqual((stats["started"], stats["cache_hits"], stats["cached_results"]), (1, 1, 1))
+
+    def test_result_without_audio_is_reused(self):
+        self.coalescer.claim(self.key, "a")
+        self.coalescer.finish(self.key, "a", {"final_audio": None})
+
+        self.assertEqual(self.coalescer.claim(self.key, "b"), ("cached", "a", {"final_audio": None}))
+
+    def test_failed_job_is_released(self):
+        self.coalescer.claim(self.key, "a")
+        self.coalescer.finish(self.key, "a")
+
+        self.assertEqual(self.coalescer.claim(self.key, "b"), ("started", "b", None))
+
+    def test_expired_result_starts_new_job(self):
+        self.coalescer.claim(self.key, "a")
+        self.coalescer.finish(self.key, "a", {"final_audio": None})
+
+        later = time.time() + coalescing.RESULT_CACHE_TTL_SECONDS + 1
+        with mock.patch.object(coalescing.time, "time", return_value=later):
+            self.assertEqual(self.coalescer.claim(self.key, "b"), ("started", "b", None))
+
+    def test_invalidate_drops_result(self):
+        self.coalescer.claim(self.key, "a")
+        self.coalescer.finish(self.key, "a", {"final_audio": "/gone.wav"})
+        self.coalescer.invalidate(self.key)
+
+        self.assertEqual(self.coalescer.claim(self.key, "b"), ("started", "b", None))
+
+    def test_result_cache_is_bounded(self):
+        with mock.patch.object(coalescing, "RESULT_CACHE_SIZE", 2):
+            for i in range(3):
+                key = submission_key(f"hash{i}")
+                self.coalescer.claim(key, f"job{i}")
+                self.coalescer.finish(key, f"job{i}", {"final_audio": None})
+
+        self.assertEqual(self.coalescer.stats()["cached_results"], 2)
+        self.assertEqual(self.coalescer.claim(submission_key("hash0"), "x")[0], "started")
+
+
+if __name__ == "__main__":
+    unittest.main()
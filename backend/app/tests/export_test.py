@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from stages.audio_export import export
+from stages.audio_export.export import export_audio, parse_export_targets
+
+
+def _fake_encode(source_path, fmt, bitrate, output_path):
+    return {"source": source_path, "format": fmt, "bitrate": bitrate, "path": output_path}
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(export, "EXPORT_DIR", self.dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+
+    def test_parse_export_targets(self):
+        self.assertEqual(
+            parse_export_targets("MP3:128k, opus:64k,,aac:96k"),
+            [("mp3", "128k"), ("opus", "64k"), ("aac", "96k")]
+        )
+        with self.assertRaises(ValueError):
+            parse_export_targets("flac:128k")
+        with self.assertRaises(ValueError):
+            parse_export_targets("mp3:loud")
+
+    def test_no_final_audio_exports_nothing(self):
+        # Recordings without selected sentences have no stitched audio.
+        with mock.patch.object(export, "_encode") as encode:
+            self.assertEqual(export_audio("job", None, [("mp3", "128k")]), [])
+        encode.assert_not_called()
+
+    def test_no_final_audio_still_exports_clips(self):
+        with mock.patch.object(export, "_encode", side_effect=_fake_encode):
+            exports = export_audio("job", None, [("mp3", "128k")], clips=["/clips/clip_0.wav"])
+
+        self.assertEqual([e["source"] for e in exports], ["/clips/clip_0.wav"])
+
+    def test_every_source_and_target_is_encoded(self):
+        with mock.patch.object(export, "_encode", side_effect=_fake_encode):
+            exports = export_audio(
+                "job",
+                "/out/final.wav",
+                [("mp3", "128k"), ("opus", "64k")],
+                clips=["/clips/clip_0.wav"]
+            )
+
+        self.assertEqual(
+            [os.path.basename(e["path"]) for e in exports],
+            ["final_128k.mp3", "final_64k.opus", "clip_0_128k.mp3", "clip_0_64k.opus"]
+        )
+        self.assertTrue(all(os.path.dirname(e["path"]) == os.path.join(self.dir.name, "job")
+                            for e in exports))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+import wave
+from unittest import mock
+
+import numpy as np
+
+from pipeline import fingerprint_index
+from pipeline.fingerprint_index import FingerprintIndex
+from stages.fingerprint.fingerprint import FRAME_SECONDS, SAMPLE_RATE, compute_fingerprint
+
+
+def _speech_like(seconds: float, seed: int):
+    # Syllable-like harmonic tones of random pitch and length, with pauses.
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    pos = 0
+    while pos < len(samples):
+        n = int(rng.uniform(0.1, 0.4) * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        f0 = rng.uniform(100, 300)
+        tone = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 12) if f0 * k < 4000)
+        samples[pos:pos + n] = (0.3 * tone * np.hanning(n))[:len(samples) - pos]
+        pos += n + int(rng.uniform(0.02, 0.2) * SAMPLE_RATE)
+    return samples
+
+
+def _write_wav(path: str, samples):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+class FingerprintTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        original = _speech_like(60, seed=1)
+        # The same recording with 2.5 s of other audio before it and some noise.
+        copy = np.concatenate([_speech_like(2.5, seed=2), original])
+        copy += np.random.default_rng(3).normal(0, 0.005, len(copy)).astype(np.float32)
+
+        recordings = {
+            "original": (original, 60.0),
+            "copy": (copy, 62.5),
+            "other": (_speech_like(62.5, seed=4), 62.5),
+            "silence": (np.zeros(5 * SAMPLE_RATE, dtype=np.float32), 5.0)
+        }
+        cls.fingerprints = {}
+        for name, (samples, duration) in recordings.items():
+            path = os.path.join(cls.dir.name, f"{name}.wav")
+            _write_wav(path, samples)
+            cls.fingerprints[name] = compute_fingerprint(path) + (duration,)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dir.cleanup()
+
+    def setUp(self):
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.db_dir.cleanup)
+        self.index = FingerprintIndex(os.path.join(self.db_dir.name, "fingerprints.db"))
+
+    def _add(self, name: str, key: str = None):
+        self.index.add(key or name, self.fingerprints[name][2], *self.fingerprints[name][:2])
+
+    def _match(self, name: str, **kwargs) -> list:
+        hashes, frames, duration = self.fingerprints[name]
+        return self.index.match(hashes, frames, duration, **kwargs)
+
+    def test_fingerprint(self):
+        hashes, frames, _ = self.fingerprints["original"]
+        self.assertGreater(len(hashes), 0)
+        self.assertEqual(len(hashes), len(frames))
+        self.assertEqual(len(self.fingerprints["silence"][0]), 0)
+
+    def test_get(self):
+        self._add("original")
+        hashes, frames = self.index.get("original")
+
+        expected = sorted(zip(*self.fingerprints["original"][:2]))
+        self.assertEqual(sorted(zip(hashes.tolist(), frames.tolist())), expected)
+        self.assertIsNone(self.index.get("missing"))
+
+    def test_match_recovers_offset(self):
+        self._add("original")
+        matches = self._match("copy")
+
+        self.assertEqual([m["recording"] for m in matches], ["original"])
+        self.assertAlmostEqual(matches[0]["offset_seconds"], 2.5, delta=FRAME_SECONDS)
+        self.assertGreaterEqual(matches[0]["coverage"], fingerprint_index.MIN_MATCH_COVERAGE)
+
+    def test_unrelated_recording_does_not_match(self):
+        self._add("original")
+        self.assertEqual(self._match("other"), [])
+        self.assertEqual(self._match("silence"), [])
+
+    def test_match_excludes_recording(self):
+        self._add("original")
+        self._add("copy")
+
+        self.assertEqual(self._match("copy")[0]["recording"], "copy")
+        self.assertEqual(self._match("copy")[0]["offset_seconds"], 0.0)
+        self.assertEqual(
+            [m["recording"] for m in self._match("copy", exclude="copy")], ["original"]
+        )
+
+    def test_oldest_recordings_are_removed(self):
+        with mock.patch.object(fingerprint_index, "FINGERPRINT_MAX_RECORDINGS", 2):
+            for key in ("first", "second", "third"):
+                self._add("original", key)
+
+        self.assertIsNone(self.index.get("first"))
+        self.assertIsNotNone(self.index.get("second"))
+        self.assertIsNotNone(self.index.get("third"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pipeline import scheduler
+from pipeline.scheduler import AdmissionRejected, JobScheduler
+
+# Processing seconds per second of audio with the default stage rates.
+DEFAULT_RATE = sum(scheduler.DEFAULT_STAGE_RATES.values())
+
+
+class JobSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.scheduler = JobScheduler(os.path.join(self.dir.name, "jobs.db"))
+        self.now = time.time()
+
+    def _at(self, offset: float):
+        # Runs the block as if offset seconds had passed since setUp.
+        return mock.patch.object(scheduler.time, "time", return_value=self.now + offset)
+
+    def test_cost_is_estimated_from_duration(self):
+        self.assertAlmostEqual(self.scheduler.submit("a", 100, {}), 100 * DEFAULT_RATE)
+        self.assertAlmostEqual(
+            self.scheduler.submit("b", 100, {}, preview=True),
+            100 * DEFAULT_RATE * (1 + scheduler.PREVIEW_COST_RATIO)
+        )
+
+    def test_shortest_job_first(self):
+        with self._at(0):
+            self.scheduler.submit("long", 3000, {"n": 1})
+            self.scheduler.submit("short", 60, {"n": 2})
+            self.scheduler.submit("medium", 600, {"n": 3})
+
+            claimed = [self.scheduler.claim("w")["job_id"] for _ in range(3)]
+
+        self.assertEqual(claimed, ["short", "medium", "long"])
+        self.assertIsNone(self.scheduler.claim("w"))
+
+    def test_waiting_jobs_age(self):
+        long_cost = 3000 * DEFAULT_RATE
+        short_cost = 60 * DEFAULT_RATE
+        # Once the long job has waited this long, it goes before a new short one.
+        overtake = (long_cost - short_cost) / scheduler.AGING_RATE + 1
+
+        with self._at(0):
+            self.scheduler.submit("long", 3000, {})
+        with self._at(overtake):
+            self.scheduler.submit("short", 60, {})
+            self.assertEqual(self.scheduler.claim("w")["job_id"], "long")
+
+    def test_rejects_when_backlog_is_full(self):
+        with mock.patch.object(scheduler, "MAX_BACKLOG_SECONDS", 100):
+            # An idle service admits any job, however long.
+            self.scheduler.submit("a", 1000, {})
+
+            with self.assertRaises(AdmissionRejected) as raised:
+                self.scheduler.submit("b", 10, {})
+
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertAlmostEqual(raised.exception.backlog_seconds, 1000 * DEFAULT_RATE)
+        self.assertEqual(self.scheduler.claim("w")["job_id"], "a")
+        self.assertIsNone(self.scheduler.claim("w"))
+
+    def test_expired_lease_is_redelivered(self):
+        self.scheduler.submit("a", 60, {"x": 1})
+        first = self.scheduler.claim("w1", lease_seconds=-1)
+        second = self.scheduler.claim("w2")
+
+        self.assertEqual((first["attempts"], second["attempts"]), (1, 2))
+        self.assertEqual(second["payload"], {"x": 1})
+        self.assertFalse(self.scheduler.heartbeat("a", "w1"))
+        self.assertFalse(self.scheduler.complete("a", "w1"))
+        self.assertTrue(self.scheduler.heartbeat("a", "w2"))
+        self.assertTrue(self.scheduler.complete("a", "w2"))
+        self.assertIsNone(self.scheduler.claim("w1"))
+
+    def test_completed_jobs_update_rates(self):
+        self.scheduler.submit("a", 100, {})
+        self.scheduler.claim("w")
+        self.scheduler.complete("a", "w", {"stage_seconds": {"transcription_done": 50.0}})
+
+        previous = scheduler.DEFAULT_STAGE_RATES["transcription_done"]
+        expected = (1 - scheduler.THROUGHPUT_SMOOTHING) * previous + scheduler.THROUGHPUT_SMOOTHING * 0.5
+        self.assertAlmostEqual(self.scheduler.estimator.rates()["transcription_done"], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pipeline import stage_cache
+from pipeline.stage_cache import StageCache, stage_key
+
+
+class StageKeyTest(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(
+            stage_key("cut", "abc", padding=0.2, tone="calm"),
+            stage_key("cut", "abc", tone="calm", padding=0.2)
+        )
+
+    def test_inputs_and_params_change_the_key(self):
+        key = stage_key("cut", "abc", padding=0.2)
+        self.assertNotEqual(key, stage_key("stitch", "abc", padding=0.2))
+        self.assertNotEqual(key, stage_key("cut", "abd", padding=0.2))
+        self.assertNotEqual(key, stage_key("cut", "abc", padding=0.3))
+        self.assertNotEqual(key, stage_key("cut", "abc", padding="0.2"))
+
+
+class StageCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.cache = StageCache(os.path.join(self.dir.name, "stages"))
+
+    def _output(self, name: str, size: int = 10) -> str:
+        # Writes a stage output file of the given size outside the cache.
+        path = os.path.join(self.dir.name, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def _age(self, stage: str, key: str, seconds: float):
+        # Marks an entry as last used the given number of seconds ago.
+        used = time.time() - seconds
+        os.utime(os.path.join(self.cache.root, stage, key), (used, used))
+
+    def test_put_and_get(self):
+        source = self._output("audio.wav")
+        clips = os.path.join(self.dir.name, "clips")
+        os.makedirs(clips)
+        self._output(os.path.join("clips", "0.wav"))
+
+        entry = self.cache.put("cut", "k1", {"audio": source, "clips": clips}, duration=12.5)
+
+        self.assertFalse(os.path.exists(source))
+        self.assertFalse(os.path.exists(clips))
+        self.assertTrue(os.path.isfile(entry["files"]["audio"]))
+        self.assertTrue(os.path.isfile(os.path.join(entry["files"]["clips"], "0.wav")))
+        self.assertEqual(entry["meta"]["duration"], 12.5)
+        self.assertEqual(entry["meta"]["stage"], "cut")
+        self.assertEqual(self.cache.get("cut", "k1"), entry)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("cut", "missing"))
+
+    def test_first_put_wins(self):
+        first = self.cache.put("cut", "k1", {"audio": self._output("a.wav", 1)}, run=1)
+        second = self.cache.put("cut", "k1", {"audio": self._output("b.wav", 2)}, run=2)
+
+        self.assertEqual(second, first)
+        self.assertEqual(os.path.getsize(second["files"]["audio"]), 1)
+        # No temporary directory is left behind.
+        self.assertEqual(os.listdir(os.path.join(self.cache.root, "cut")), ["k1"])
+
+    def test_prune_removes_expired(self):
+        self.cache.put("cut", "old", {"audio": self._output("a.wav")})
+        self.cache.put("cut", "new", {"audio": self._output("b.wav")})
+        self._age("cut", "old", stage_cache.STAGE_CACHE_TTL_SECONDS + 60)
+
+        self.assertEqual(self.cache.prune(force=True), 1)
+        self.assertIsNone(self.cache.get("cut", "old"))
+        self.assertIsNotNone(self.cache.get("cut", "new"))
+
+    def test_prune_enforces_size_limit(self):
+        min_age = stage_cache.STAGE_CACHE_MIN_AGE_SECONDS
+        for name in ("oldest", "older", "recent"):
+            self.cache.put("cut", name, {"audio": self._output(f"{name}.wav", 10000)})
+        self._age("cut", "oldest", min_age + 300)
+        self._age("cut", "older", min_age + 200)
+
+        # Room for two entries (with their metadata files).
+        with mock.patch.object(stage_cache, "STAGE_CACHE_MAX_BYTES", 25000):
+            self.assertEqual(self.cache.prune(force=True), 1)
+        self.assertIsNone(self.cache.get("cut", "oldest"))
+        self.assertIsNotNone(self.cache.get("cut", "older"))
+
+        # Entries used recently are kept even above the limit; the lookup
+        # above marked "older" as used.
+        with mock.patch.object(stage_cache, "STAGE_CACHE_MAX_BYTES", 0):
+            self.assertEqual(self.cache.prune(force=True), 0)
+
+    def test_prune_removes_stale_temporary_dirs(self):
+        self.cache.put("cut", "k1", {"audio": self._output("a.wav")})
+        stale = os.path.join(self.cache.root, "cut", "k2.dead.tmp")
+        fresh = os.path.join(self.cache.root, "cut", "k3.live.tmp")
+        os.makedirs(stale)
+        os.makedirs(fresh)
+        used = time.time() - stage_cache.STAGE_CACHE_MIN_AGE_SECONDS - 60
+        os.utime(stale, (used, used))
+
+        self.assertEqual(self.cache.prune(force=True), 0)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))
+
+    def test_prune_interval(self):
+        self.cache.prune()
+        self.cache.put("cut", "old", {"audio": self._output("a.wav")})
+        self._age("cut", "old", stage_cache.STAGE_CACHE_TTL_SECONDS + 60)
+
+        self.assertEqual(self.cache.prune(), 0)
+        self.assertEqual(self.cache.prune(force=True), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+from stages.transcription.transcript_store import (
+    TranscriptReader,
+    TranscriptWriter,
+    export_json,
+    shift_transcript,
+)
+
+
+class TranscriptStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "t.cftr")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _write(self, sentences):
+        with TranscriptWriter(self.path) as writer:
+            for start, end, text in sentences:
+                writer.append(start, end, text)
+
+    def test_round_trip(self):
+        sentences = [(0.0, 1.5, "Hello there."), (1.5, 4.25, "Grüße, 世界!"), (5.0, 6.0, "")]
+        self._write(sentences)
+
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(list(reader.iter_texts()), [s[2] for s in sentences])
+            self.assertEqual(list(reader.starts), [0.0, 1.5, 5.0])
+            self.assertEqual(list(reader.ends), [1.5, 4.25, 6.0])
+            self.assertEqual(
+                reader.sentence(1), {"id": 1, "start": 1.5, "end": 4.25, "text": "Grüße, 世界!"}
+            )
+
+    def test_empty_transcript(self):
+        self._write([])
+
+        with TranscriptReader(self.path) as reader:
+            self.assertEqual(len(reader), 0)
+            self.assertEqual(list(reader.iter_sentences()), [])
+
+    def test_file_appears_only_when_complete(self):
+        writer = TranscriptWriter(self.path)
+        writer.append(0.0, 1.0, "partial")
+        self.assertFalse(os.path.exists(self.path))
+
+        writer.close()
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_error_discards_file(self):
+        with self.assertRaises(ValueError):
+            with TranscriptWriter(self.path) as writer:
+                writer.append(0.0, 1.0, "partial")
+                raise ValueError("decoding failed")
+
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+    def test_invalid_file_raises(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a transcript" * 4)
+
+        with self.assertRaises(RuntimeError):
+            TranscriptReader(self.path)
+
+    def test_export_json(self):
+        self._write([(0.0, 1.0, "One."), (1.0, 2.0, "Two.")])
+        json_path = os.path.join(self.dir.name, "t.json")
+
+        export_json(self.path, json_path, metadata={"model_info": {"name": "x"}})
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["model_info"], {"name": "x"})
+        self.assertEqual([s["text"] for s in data["sentences"]], ["One.", "Two."])
+
+    def test_shift_transcript(self):
+        self._write([(0.0, 2.0, "Cut."), (2.0, 5.0, "Clipped."), (5.0, 8.0, "Kept.")])
+        shifted = os.path.join(self.dir.name, "shifted.cftr")
+
+        kept = shift_transcript(self.path, shifted, -3.0, 4.0)
+
+        self.assertEqual(list(kept), [1, 2])
+        with TranscriptReader(shifted) as reader:
+            self.assertEqual(
+                list(reader.iter_sentences()),
+                [
+                    {"id": 0, "start": 0.0, "end": 2.0, "text": "Clipped."},
+                    {"id": 1, "start": 2.0, "end": 4.0, "text": "Kept."}
+                ]
+            )
+
+    def test_shift_transcript_later_start(self):
+        self._write([(0.0, 2.0, "One."), (2.0, 5.0, "Two.")])
+        shifted = os.path.join(self.dir.name, "shifted.cftr")
+
+        kept = shift_transcript(self.path, shifted, 2.5, 6.0)
+
+        self.assertEqual(list(kept), [0, 1])
+        with TranscriptReader(shifted) as reader:
+            self.assertEqual(list(reader.starts), [2.5, 4.5])
+            self.assertEqual(list(reader.ends), [4.5, 6.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks.transcription_profiles import word_error_rate
+
+
+class WordErrorRateTest(unittest.TestCase):
+    def test_identical(self):
+        self.assertEqual(word_error_rate("the quick brown fox", "the quick brown fox"), 0.0)
+
+    def test_case_and_punctuation_are_ignored(self):
+        self.assertEqual(word_error_rate("Hello, world!", "hello world"), 0.0)
+
+    def test_substitution_insertion_deletion(self):
+        reference = "the quick brown fox"
+        self.assertEqual(word_error_rate(reference, "the quick red fox"), 0.25)
+        self.assertEqual(word_error_rate(reference, "the very quick brown fox"), 0.25)
+        self.assertEqual(word_error_rate(reference, "quick brown fox"), 0.25)
+        self.assertEqual(word_error_rate(reference, ""), 1.0)
+
+    def test_can_exceed_one(self):
+        self.assertEqual(word_error_rate("yes", "no no no"), 3.0)
+
+    def test_empty_reference(self):
+        self.assertEqual(word_error_rate("", ""), 0.0)
+        self.assertEqual(word_error_rate("", "words"), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
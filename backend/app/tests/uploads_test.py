@@ -0,0 +1,98 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pipeline import uploads
+from pipeline.uploads import UploadConflict, UploadSessionStore
+
+
+class UploadSessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.store = UploadSessionStore(os.path.join(self.dir.name, "jobs.db"))
+        self.store.create("up", "talk.wav", "/tmp/talk.wav", 100, sha256="abc")
+        self.now = time.time()
+
+    def _at(self, offset: float):
+        # Runs the block as if offset seconds had passed since setUp.
+        return mock.patch.object(uploads.time, "time", return_value=self.now + offset)
+
+    def test_create_and_get(self):
+        session = self.store.get("up")
+        self.assertEqual(session["filename"], "talk.wav")
+        self.assertEqual(session["size"], 100)
+        self.assertEqual(session["offset"], 0)
+        self.assertEqual(session["sha256"], "abc")
+        self.assertIsNone(self.store.get("missing"))
+
+    def test_commit_advances_offset(self):
+        token = self.store.begin_chunk("up", 0)
+        self.assertEqual(self.store.commit_chunk("up", token, 40), 40)
+        token = self.store.begin_chunk("up", 40)
+        self.assertEqual(self.store.commit_chunk("up", token, 60), 100)
+        self.assertEqual(self.store.get("up")["offset"], 100)
+
+    def test_wrong_offset_conflicts(self):
+        token = self.store.begin_chunk("up", 0)
+        self.store.commit_chunk("up", token, 40)
+
+        for offset in (0, 60):
+            with self.assertRaises(UploadConflict) as raised:
+                self.store.begin_chunk("up", offset)
+            self.assertEqual(raised.exception.offset, 40)
+
+    def test_concurrent_writer_conflicts(self):
+        self.store.begin_chunk("up", 0)
+        with self.assertRaises(UploadConflict) as raised:
+            self.store.begin_chunk("up", 0)
+        self.assertEqual(raised.exception.offset, 0)
+
+    def test_release_keeps_offset(self):
+        token = self.store.begin_chunk("up", 0)
+        self.store.commit_chunk("up", token, 40)
+        token = self.store.begin_chunk("up", 40)
+        self.store.release_chunk("up", token)
+
+        self.assertEqual(self.store.get("up")["offset"], 40)
+        # The session is free again.
+        self.store.begin_chunk("up", 40)
+
+    def test_expired_lease_is_taken_over(self):
+        with self._at(0):
+            stale = self.store.begin_chunk("up", 0)
+        with self._at(uploads.UPLOAD_CHUNK_LEASE_SECONDS + 1):
+            token = self.store.begin_chunk("up", 0)
+
+        # The first writer lost its reservation and cannot commit.
+        with self.assertRaises(UploadConflict):
+            self.store.commit_chunk("up", stale, 40)
+        self.assertEqual(self.store.commit_chunk("up", token, 40), 40)
+
+    def test_unknown_session(self):
+        with self.assertRaises(KeyError):
+            self.store.begin_chunk("missing", 0)
+
+    def test_remove_expired(self):
+        ttl = uploads.UPLOAD_SESSION_TTL_SECONDS
+        with self._at(0):
+            self.store.create("held", "b.wav", "/tmp/b.wav", 10)
+        with self._at(ttl / 2):
+            self.store.create("recent", "c.wav", "/tmp/c.wav", 10)
+        with self._at(ttl):
+            # A chunk in progress keeps an idle session alive.
+            self.store.begin_chunk("held", 0)
+
+        with self._at(ttl + 1):
+            removed = self.store.remove_expired()
+
+        self.assertEqual(removed, [{"upload_id": "up", "path": "/tmp/talk.wav"}])
+        self.assertIsNone(self.store.get("up"))
+        self.assertIsNotNone(self.store.get("held"))
+        self.assertIsNotNone(self.store.get("recent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
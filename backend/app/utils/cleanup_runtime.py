@@ -10,6 +10,7 @@ SUB_DIRS = [
     "data/normalized_audio",
     "data/clips",
     "data/output_podcast",
+    "cache/stages",
     "state"
 ]
 
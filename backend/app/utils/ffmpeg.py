@@ -1,13 +1,184 @@
-# minimal wrappers if needed by future stages
-import subprocess
-import shlex
-
-# The `run_cmd` function executes a shell command and captures its output.
-def run_cmd(cmd: str):
-    # The `subprocess.run` function is used to execute the command.
-    # `shell=True` allows the command to be run in a shell, enabling shell-specific features.
-    # `capture_output=True` ensures that stdout and stderr are captured.
-    # `text=True` decodes stdout and stderr as text.
-    proc = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    # The function returns the exit code, stdout, and stderr of the command.
-    return proc.returncode, proc.stdout, proc.stderr
+# Shared runner for all ffmpeg/ffprobe invocations.
+#
+# Every call goes through a single asyncio event loop running on a background
+# thread. A global semaphore on that loop caps how many ffmpeg processes run at
+# once, each call has a timeout, and cancelling a call kills its process.
+# Synchronous stage code (which runs in worker threads) uses `run_ffmpeg`;
+# async code can await `run_ffmpeg_async` directly.
+import asyncio
+import os
+import threading
+
+from utils.logger import logger
+
+# Maximum number of ffmpeg/ffprobe processes running at the same time.
+# ffmpeg audio filters are mostly single-threaded, so one process per core.
+FFMPEG_CONCURRENCY = max(1, os.cpu_count() or 1)
+
+# Default timeout for a single ffmpeg call, in seconds.
+FFMPEG_TIMEOUT_SECONDS = 30 * 60
+
+# Number of trailing stderr characters kept in error messages.
+_STDERR_TAIL = 2000
+
+_loop = None
+_semaphore = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """
+    Returns the runner event loop, starting its thread on first use.
+    """
+    global _loop, _semaphore
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="ffmpeg-runner", daemon=True
+            ).start()
+            # The semaphore must be created on the loop that uses it.
+            _semaphore = asyncio.run_coroutine_threadsafe(
+                _create_semaphore(), loop
+            ).result()
+            _loop = loop
+
+    return _loop
+
+
+async def _create_semaphore():
+    return asyncio.Semaphore(FFMPEG_CONCURRENCY)
+
+
+async def _read_progress(stream, on_progress):
+    """
+    Parses `-progress pipe:1` output and reports each completed block.
+
+    ffmpeg writes blocks of key=value lines, each terminated by a
+    `progress=continue` or `progress=end` line.
+
+    Args:
+        stream: The stdout stream of the ffmpeg process.
+        on_progress: Called with a dict containing `out_time` (seconds of
+                     output written), `speed` and `done`.
+    """
+    block = {}
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+
+        key, _, value = line.decode("utf-8", "replace").strip().partition("=")
+        block[key] = value
+
+        if key == "progress":
+            try:
+                # Despite its name, out_time_ms is in microseconds.
+                out_time = int(block.get("out_time_us") or block.get("out_time_ms")) / 1e6
+            except (TypeError, ValueError):
+                out_time = 0.0
+
+            try:
+                on_progress({
+                    "out_time": max(0.0, out_time),
+                    "speed": block.get("speed", "").strip(),
+                    "done": value == "end"
+                })
+            except Exception:
+                logger.exception("ffmpeg progress callback failed")
+
+            block = {}
+
+
+async def _run(args, timeout, on_progress, description):
+    async with _semaphore:
+        if on_progress is not None:
+            # Machine-readable progress on stdout, no interactive stats on stderr.
+            args = [args[0], "-progress", "pipe:1", "-nostats", *args[1:]]
+
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        async def _communicate():
+            if on_progress is None:
+                return await proc.communicate()
+
+            stderr_task = asyncio.ensure_future(proc.stderr.read())
+            await _read_progress(proc.stdout, on_progress)
+            stderr = await stderr_task
+            await proc.wait()
+            return b"", stderr
+
+        try:
+            stdout, stderr = await asyncio.wait_for(_communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise RuntimeError(f"{description} timed out after {timeout}s")
+        except asyncio.CancelledError:
+            # Kill the process when the caller cancels the call.
+            proc.kill()
+            await proc.wait()
+            raise
+
+    if proc.returncode != 0:
+        tail = stderr.decode("utf-8", "replace").strip()[-_STDERR_TAIL:]
+        raise RuntimeError(f"{description} failed: {tail}")
+
+    return stdout.decode("utf-8", "replace")
+
+
+def run_ffmpeg(
+    args: list,
+    timeout: float = FFMPEG_TIMEOUT_SECONDS,
+    on_progress=None,
+    description: str = "FFmpeg"
+) -> str:
+    """
+    Runs an ffmpeg or ffprobe command on the shared runner and waits for it.
+
+    Safe to call from any thread other than the runner thread itself.
+
+    Args:
+        args: The command as an argv list, e.g. ["ffmpeg", "-y", "-i", ...].
+        timeout: Maximum run time in seconds; the process is killed after it.
+        on_progress: Optional callback receiving progress dicts (see
+                     _read_progress). It runs on the runner thread.
+        description: Human-readable name of the operation, used in errors.
+
+    Returns:
+        The decoded stdout of the command (empty when progress is parsed).
+
+    Raises:
+        RuntimeError: If the command fails or times out.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _run(list(args), timeout, on_progress, description), _get_loop()
+    )
+    try:
+        return future.result()
+    except BaseException:
+        # Kill the process if the waiting thread is interrupted.
+        future.cancel()
+        raise
+
+
+async def run_ffmpeg_async(
+    args: list,
+    timeout: float = FFMPEG_TIMEOUT_SECONDS,
+    on_progress=None,
+    description: str = "FFmpeg"
+) -> str:
+    """
+    Async variant of run_ffmpeg for use from any event loop.
+
+    Cancelling the awaiting task cancels the call and kills the process.
+    See run_ffmpeg for arguments.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _run(list(args), timeout, on_progress, description), _get_loop()
+    )
+    return await asyncio.wrap_future(future)
@@ -1,8 +1,12 @@
+import hashlib
 import aiofiles
 import shutil
 from pathlib import Path
 
-async def save_upload_file(upload_file, destination: str):
+# Size of the blocks written to and read from disk.
+IO_BLOCK_SIZE = 1024 * 1024
+
+async def save_upload_file(upload_file, destination: str, hasher=None):
     """
     Asynchronously saves an uploaded file to a specified destination.
 
@@ -15,6 +19,8 @@ async def save_upload_file(upload_file, destination: str):
         upload_file: The file object to be saved. This is typically obtained from a
                      web framework's request object. It should have an async `read` method.
         destination (str): The path (including filename) where the file should be saved.
+        hasher: Optional hashlib object updated with every chunk, so the content hash
+                is computed while the file streams in instead of in a second pass.
 
     Returns:
         str: The string representation of the destination path where the file was saved.
@@ -26,11 +32,73 @@ async def save_upload_file(upload_file, destination: str):
     async with aiofiles.open(dest_path, "wb") as out_file:
         while True:
             # Read the file in 1MB chunks
-            chunk = await upload_file.read(1024*1024)
+            chunk = await upload_file.read(IO_BLOCK_SIZE)
             if not chunk:
                 break
+            if hasher is not None:
+                hasher.update(chunk)
             # Write the chunk to the destination file
             await out_file.write(chunk)
     # Ensure the uploaded file is closed
     await upload_file.close()
-    return str(dest_path)
\ No newline at end of file
+    return str(dest_path)
+
+
+async def write_stream_at(chunks, destination: str, offset: int, max_bytes: int, hasher=None) -> int:
+    """
+    Writes an async stream of bytes into an existing file at an offset.
+
+    The bytes go straight to the destination file, without a temporary copy.
+    Small network chunks are collected into IO_BLOCK_SIZE blocks before each
+    write.
+
+    Args:
+        chunks: An async iterator of bytes, e.g. Starlette's request.stream().
+        destination (str): The path of the file to write into.
+        offset (int): The position in the file where writing starts.
+        max_bytes (int): The maximum number of bytes accepted.
+        hasher: Optional hashlib object updated with the written bytes.
+
+    Returns:
+        int: The number of bytes written.
+
+    Raises:
+        ValueError: If the stream is longer than max_bytes. The bytes
+                    written so far are left in the file.
+    """
+    written = 0
+    buffer = bytearray()
+
+    async with aiofiles.open(destination, "r+b") as out_file:
+        await out_file.seek(offset)
+
+        async for chunk in chunks:
+            if written + len(buffer) + len(chunk) > max_bytes:
+                raise ValueError(f"Chunk exceeds the remaining {max_bytes} bytes")
+            buffer += chunk
+
+            if len(buffer) >= IO_BLOCK_SIZE:
+                await out_file.write(bytes(buffer))
+                if hasher is not None:
+                    hasher.update(buffer)
+                written += len(buffer)
+                buffer.clear()
+
+        if buffer:
+            await out_file.write(bytes(buffer))
+            if hasher is not None:
+                hasher.update(buffer)
+            written += len(buffer)
+
+    return written
+
+
+def sha256_file(path: str) -> str:
+    """
+    Computes the SHA-256 hex digest of a file, reading it in blocks.
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(IO_BLOCK_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
@@ -1,25 +1,196 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
-from config.paths import RUNTIME_LOGS_API
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
-# Sets up the logging configuration for the application.
-def setup_logging():
-    # Create the directory for the log files if it doesn't already exist.
-    os.makedirs(os.path.dirname(RUNTIME_LOGS_API), exist_ok=True)
-    # Configure the basic logging settings.
-    logging.basicConfig(
-        # Set the minimum level of messages to log.
-        level=logging.INFO,
-        # Define the format of the log messages.
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        # Specify the handlers to use for logging.
-        handlers=[
-            # Log messages to a file.
-            logging.FileHandler(RUNTIME_LOGS_API),
-            # Log messages to the console.
-            logging.StreamHandler()
-        ]
+from config.paths import RUNTIME_LOGS_DIR
+
+# Log files are rotated once they reach this size (bytes).
+LOG_MAX_BYTES = 20 * 1024 * 1024
+
+# Number of rotated log files kept next to the current one.
+LOG_BACKUP_COUNT = 5
+
+# Longer messages (e.g. large payloads or tracebacks) are cut in the middle
+# down to this many characters.
+LOG_MAX_MESSAGE_CHARS = 4000
+
+# Job ID and pipeline stage of the code currently running, added to every
+# log record emitted in that context.
+_job_id = contextvars.ContextVar("log_job_id", default=None)
+_stage = contextvars.ContextVar("log_stage", default=None)
+
+# Handlers and listener of this process, and the queue child processes log into.
+_configured = False
+_handlers = []
+_child_queue = None
+_child_listener = None
+_setup_lock = threading.Lock()
+
+
+def truncate(text: str, limit: int = LOG_MAX_MESSAGE_CHARS) -> str:
+    """
+    Cuts a long text in the middle, keeping its start and end.
+    """
+    if len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]} ... [{len(text) - 2 * half} chars truncated] ... {text[-half:]}"
+
+
+class _ContextFilter(logging.Filter):
+    # Runs in the emitting thread, where the context variables are set.
+    def filter(self, record):
+        if getattr(record, "job_id", None) is None:
+            record.job_id = _job_id.get()
+        if getattr(record, "stage", None) is None:
+            record.stage = _stage.get()
+        return True
+
+
+class _TruncatingQueueHandler(logging.handlers.QueueHandler):
+    # Formats the message (including any traceback) in the emitting thread,
+    # as QueueHandler does, and caps its size so the queue never holds huge
+    # records.
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.msg = record.message = truncate(record.message)
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as single-line JSON objects.
+    """
+    def format(self, record):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                    + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "job_id": getattr(record, "job_id", None),
+            "stage": getattr(record, "stage", None),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s [%(levelname)s] %(message)s")
+
+
+def _start_listener(log_queue, handlers):
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
     )
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+# Sets up the logging configuration for the application.
+def setup_logging(log_name: str = "api", log_queue=None):
+    """
+    Sets up non-blocking logging for the current process.
+
+    Log calls only put the record on a queue; a background listener thread
+    writes it as a JSON line to a size-rotated file under /runtime/logs and
+    as text to the console. Records carry the job ID and stage set with
+    log_context.
+
+    Args:
+        log_name: The name of the log file (without suffix). Every top-level
+                  process needs its own file, since only one process may
+                  rotate it.
+        log_queue: For child processes: the queue returned by the parent's
+                   child_log_queue(). Records are then handed to the
+                   parent's listener instead of written by this process.
+    """
+    global _configured
+
+    with _setup_lock:
+        if _configured:
+            return
+        _configured = True
+
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        if log_queue is None:
+            # Create the directory for the log files if it doesn't already exist.
+            os.makedirs(RUNTIME_LOGS_DIR, exist_ok=True)
+
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(RUNTIME_LOGS_DIR, f"{log_name}.log"),
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+            file_handler.setFormatter(JsonFormatter())
+
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(_ConsoleFormatter())
+
+            _handlers.extend([file_handler, console_handler])
+            log_queue = queue.SimpleQueue()
+            _start_listener(log_queue, _handlers)
+
+        queue_handler = _TruncatingQueueHandler(log_queue)
+        queue_handler.addFilter(_ContextFilter())
+        root.addHandler(queue_handler)
+
+
+def child_log_queue():
+    """
+    Returns a queue that spawned child processes pass to setup_logging, so
+    their records are written by this process's handlers.
+    """
+    global _child_queue, _child_listener
+
+    with _setup_lock:
+        if _child_queue is None:
+            _child_queue = multiprocessing.get_context("spawn").Queue()
+            _child_listener = _start_listener(_child_queue, _handlers)
+
+    return _child_queue
+
+
+@contextmanager
+def log_context(job_id: str = None, stage: str = None):
+    """
+    Adds a job ID and/or stage to all records logged in the block (in the
+    current thread or task).
+    """
+    # Both variables are restored on exit, including stages set inside the
+    # block with set_log_stage.
+    job_token = _job_id.set(job_id if job_id is not None else _job_id.get())
+    stage_token = _stage.set(stage if stage is not None else _stage.get())
+    try:
+        yield
+    finally:
+        _stage.reset(stage_token)
+        _job_id.reset(job_token)
+
+
+def set_log_stage(stage: str):
+    """
+    Sets the stage added to records logged from now on in the current
+    context (until the enclosing log_context ends).
+    """
+    _stage.set(stage)
+
 
 # Get a logger instance for the application.
-logger = logging.getLogger("clipforge")
\ No newline at end of file
+logger = logging.getLogger("clipforge")
@@ -0,0 +1,143 @@
+# Optional per-job profiling of pipeline stages.
+#
+# When a job is submitted with profiling enabled, each stage runs under
+# cProfile and the model stages additionally under the torch profiler. The
+# profiles are written to the job's profile directory and can be downloaded
+# through the API. Without a profile directory the helpers return a shared
+# no-op context manager, so unprofiled jobs pay nothing.
+import cProfile
+import os
+from contextlib import contextmanager, nullcontext
+
+from config.paths import RUNTIME_DATA_PROFILES
+
+# File suffixes of the profile artifacts.
+PSTATS_SUFFIX = ".pstats"
+TRACE_SUFFIX = ".trace.json"
+TORCH_SUMMARY_SUFFIX = ".torch.txt"
+
+# Number of operators listed in the torch profiler summary.
+TORCH_SUMMARY_ROWS = 50
+
+_NOT_PROFILED = nullcontext()
+
+
+def profile_dir_for(pipeline_id: str) -> str:
+    """
+    Returns the directory holding a job's profile artifacts.
+    """
+    return os.path.join(RUNTIME_DATA_PROFILES, pipeline_id)
+
+
+@contextmanager
+def _cprofile(path: str):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        profiler.dump_stats(path)
+
+
+def profile_stage(profile_dir: str, name: str):
+    """
+    Profiles a block of code with cProfile.
+
+    Args:
+        profile_dir: The job's profile directory, or None when profiling is
+                     off.
+        name: The name of the profiled stage; the profile is written to
+              `<profile_dir>/<name>.pstats`.
+
+    Returns:
+        A context manager.
+    """
+    if profile_dir is None:
+        return _NOT_PROFILED
+    return _cprofile(os.path.join(profile_dir, name + PSTATS_SUFFIX))
+
+
+@contextmanager
+def _torch_profile(profile_dir: str, name: str):
+    # Imported here, since only the inference workers have torch loaded.
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+
+    with profile(activities=activities) as prof:
+        yield
+
+    os.makedirs(profile_dir, exist_ok=True)
+    prof.export_chrome_trace(os.path.join(profile_dir, name + TRACE_SUFFIX))
+    with open(os.path.join(profile_dir, name + TORCH_SUMMARY_SUFFIX), "w", encoding="utf-8") as f:
+        f.write(prof.key_averages().table(
+            sort_by="self_cpu_time_total", row_limit=TORCH_SUMMARY_ROWS
+        ))
+
+
+def profile_model_stage(profile_dir: str, name: str, torch_ops: bool = True):
+    """
+    Profiles a model stage with cProfile and, optionally, the torch profiler.
+
+    The torch profiler writes a Chrome trace (`<name>.trace.json`, viewable in
+    chrome://tracing or Perfetto) and an operator summary
+    (`<name>.torch.txt`).
+
+    Args:
+        profile_dir: The job's profile directory, or None when profiling is
+                     off.
+        name: The name of the profiled stage.
+        torch_ops: Whether the stage runs torch operators worth tracing.
+
+    Returns:
+        A context manager.
+    """
+    if profile_dir is None:
+        return _NOT_PROFILED
+    if not torch_ops:
+        return profile_stage(profile_dir, name)
+    return _stacked(profile_stage(profile_dir, name), _torch_profile(profile_dir, name))
+
+
+@contextmanager
+def _stacked(outer, inner):
+    with outer, inner:
+        yield
+
+
+def list_profiles(pipeline_id: str) -> list:
+    """
+    Returns the paths of a job's profile artifacts, relative to its profile
+    directory (e.g. "final/normalize.pstats").
+    """
+    profile_dir = profile_dir_for(pipeline_id)
+    names = []
+    for root, _, files in os.walk(profile_dir):
+        for name in files:
+            names.append(os.path.relpath(os.path.join(root, name), profile_dir))
+    return sorted(names)
+
+
+def resolve_profile(pipeline_id: str, name: str):
+    """
+    Returns the absolute path of a job's profile artifact.
+
+    Args:
+        pipeline_id: The ID of the job.
+        name: The artifact path as returned by list_profiles.
+
+    Returns:
+        The path, or None if no such artifact exists or the name points
+        outside the job's profile directory.
+    """
+    profile_dir = os.path.realpath(profile_dir_for(pipeline_id))
+    path = os.path.realpath(os.path.join(profile_dir, name))
+    if path.startswith(profile_dir + os.sep) and os.path.isfile(path):
+        return path
+    return None
+
@@ -0,0 +1,289 @@
+"""
+Stateless pipeline worker.
+
+Claims jobs from the durable job queue, runs the pipeline and records the
+job's events and result in the job database. Workers keep no state of their
+own: any number of them can run as separate processes or on separate nodes,
+as long as they share the /runtime directory with the API.
+
+A worker runs up to PIPELINE_JOB_SLOTS jobs at once. Their stages are
+queued per resource class (ffmpeg, transcription, scoring; see
+pipeline/executor.py), so one job can be transcribed while another is cut.
+
+Usage (from the app directory):
+
+    python worker.py
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+
+from config.workers import (
+    JOB_HEARTBEAT_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    PIPELINE_JOB_SLOTS,
+    RESOURCE_REPORT_SECONDS,
+    WORKER_POLL_SECONDS,
+)
+from models.inference_worker import shutdown_inference_pool
+from pipeline.coalescing import job_coalescer
+from pipeline.controller import PipelineController
+from pipeline.executor import StageExecutor
+from pipeline.jobs import job_registry
+from pipeline.scheduler import job_scheduler
+from pipeline.stage_cache import stage_cache
+from utils.logger import log_context, logger, setup_logging
+
+
+def run_job(
+    controller: PipelineController,
+    pipeline_id: str,
+    coalescing_key: str = None,
+    preview: bool = False,
+    **kwargs
+):
+    """
+    Runs the pipeline for a registered job and records its outcome.
+
+    Stage transitions and progress are published to the job registry while
+    the pipeline runs, followed by a terminal "completed" or "failed" event.
+    For preview jobs a fast draft run comes first; its result is stored as
+    the job's "draft" and announced with a "draft" event before the
+    full-quality run starts. Once the full-quality run succeeds, it replaces
+    the draft: the draft audio is removed and the job's "draft" cleared.
+
+    Args:
+        controller: The pipeline controller of this worker.
+        pipeline_id: The ID of the job.
+        coalescing_key: The key the job was claimed with in the coalescer;
+                        the job is released from it when it finishes.
+        preview: If True, run a draft pass before the full-quality run.
+        **kwargs: Arguments passed to PipelineController.run_pipeline.
+
+    Returns:
+        The result of the full-quality pipeline run, or None if it failed.
+    """
+    def publisher(pass_name: str = None):
+        def on_event(event: str, data: dict):
+            if pass_name:
+                data = {"pass": pass_name, **data}
+            job_registry.publish(pipeline_id, event, data)
+        return on_event
+
+    draft = None
+    try:
+        if preview:
+            draft = controller.run_pipeline(
+                pipeline_id=pipeline_id,
+                preview=True,
+                on_event=publisher("draft"),
+                **kwargs
+            )
+            job_registry.update(pipeline_id, draft=draft)
+            job_registry.publish(pipeline_id, "draft", {"result": draft})
+
+        result = controller.run_pipeline(
+            pipeline_id=pipeline_id,
+            on_event=publisher("final" if preview else None),
+            **kwargs
+        )
+    except Exception as e:
+        logger.exception(f"[{pipeline_id}] Pipeline failed")
+        fail_job(pipeline_id, str(e), coalescing_key)
+        return None
+
+    if coalescing_key is not None:
+        job_coalescer.finish(coalescing_key, pipeline_id, result)
+    if draft is None:
+        job_registry.update(pipeline_id, result=result)
+    else:
+        job_registry.update(pipeline_id, result=result, draft=None)
+    job_registry.publish(pipeline_id, "completed", {"result": result})
+
+    # Removed only once the job no longer points to it.
+    draft_audio = draft.get("final_audio") if draft else None
+    if draft_audio and draft_audio != result.get("final_audio") and os.path.isfile(draft_audio):
+        os.remove(draft_audio)
+    return result
+
+
+def fail_job(pipeline_id: str, error: str, coalescing_key: str = None):
+    """
+    Records a job as failed and releases it from the coalescer.
+    """
+    if coalescing_key is not None:
+        job_coalescer.finish(coalescing_key, pipeline_id)
+    job_registry.update(pipeline_id, error=error)
+    job_registry.publish(pipeline_id, "failed", {"error": error})
+
+
+@contextmanager
+def _keep_lease(job_id: str, worker_id: str):
+    """
+    Renews the worker's lease on a job in the background while it runs.
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            try:
+                if not job_scheduler.heartbeat(job_id, worker_id):
+                    logger.warning(f"[{job_id}] Lease lost; the job may run on another worker")
+                    return
+            except Exception:
+                logger.exception(f"[{job_id}] Heartbeat failed")
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def process_job(controller: PipelineController, job: dict, worker_id: str):
+    """
+    Runs one claimed job and removes it from the queue.
+
+    A job delivered more than JOB_MAX_ATTEMPTS times (because its workers
+    kept dying) is failed instead of run again.
+
+    Args:
+        controller: The pipeline controller of this worker.
+        job: The claimed job (see JobScheduler.claim).
+        worker_id: The ID of this worker.
+    """
+    job_id = job["job_id"]
+    params = dict(job["payload"])
+
+    if job["attempts"] > JOB_MAX_ATTEMPTS:
+        logger.error(f"[{job_id}] Giving up after {JOB_MAX_ATTEMPTS} lost attempts")
+        fail_job(
+            job_id,
+            f"Job was interrupted {JOB_MAX_ATTEMPTS} times",
+            params.get("coalescing_key")
+        )
+        job_scheduler.complete(job_id, worker_id)
+        return
+
+    if job["attempts"] > 1:
+        logger.info(f"[{job_id}] Redelivered (attempt {job['attempts']})")
+        job_registry.publish(job_id, "redelivered", {"attempt": job["attempts"]})
+
+    logger.info(f"[{job_id}] Claimed by worker {worker_id}")
+    if controller.executor is not None:
+        controller.executor.job()
+    with log_context(job_id=job_id), _keep_lease(job_id, worker_id):
+        result = run_job(controller, job_id, **params)
+
+    if not job_scheduler.complete(job_id, worker_id, result):
+        logger.warning(f"[{job_id}] Finished after its lease was lost")
+
+    try:
+        stage_cache.prune()
+    except Exception:
+        logger.exception("Stage cache cleanup failed")
+
+
+def _report_resources(executor: StageExecutor, worker_id: str, stop: threading.Event):
+    """
+    Publishes the worker's resource utilization to the job database until
+    stop is set.
+    """
+    while not stop.wait(RESOURCE_REPORT_SECONDS):
+        try:
+            job_scheduler.report_resources(worker_id, executor.utilization())
+        except Exception:
+            logger.exception("Resource report failed")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ClipForge pipeline worker")
+    parser.add_argument(
+        "--once", action="store_true",
+        help="Exit when the queue is empty instead of waiting for jobs"
+    )
+    args = parser.parse_args(argv)
+
+    # Every worker process writes (and rotates) its own log file.
+    setup_logging(f"worker-{socket.gethostname()}-{os.getpid()}")
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    executor = StageExecutor()
+    controller = PipelineController(executor)
+
+    # Finish the running jobs on SIGTERM/SIGINT, then exit. A worker killed
+    # mid-job loses its leases and the jobs are redelivered.
+    stopping = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    reporting = threading.Event()
+    reporter = threading.Thread(
+        target=_report_resources, args=(executor, worker_id, reporting),
+        name="resource-report", daemon=True
+    )
+    reporter.start()
+
+    # Each claimed job runs on its own thread; a free slot is needed to
+    # claim the next one.
+    slots = threading.BoundedSemaphore(PIPELINE_JOB_SLOTS)
+    jobs = []
+
+    def run_claimed(job: dict):
+        try:
+            process_job(controller, job, worker_id)
+        except Exception:
+            # E.g. the job database was unavailable. The job's lease
+            # expires and it is redelivered.
+            logger.exception(f"[{job['job_id']}] Pipeline worker {worker_id} failed to process the job")
+        finally:
+            slots.release()
+
+    logger.info(f"Pipeline worker {worker_id} started ({PIPELINE_JOB_SLOTS} job slots)")
+    try:
+        while not stopping.is_set():
+            if not slots.acquire(timeout=WORKER_POLL_SECONDS):
+                continue
+
+            try:
+                job = job_scheduler.claim(worker_id)
+            except Exception:
+                slots.release()
+                logger.exception(f"Pipeline worker {worker_id} failed to claim a job")
+                stopping.wait(WORKER_POLL_SECONDS)
+                continue
+
+            jobs = [thread for thread in jobs if thread.is_alive()]
+            if job is None:
+                slots.release()
+                if args.once and not jobs:
+                    break
+                stopping.wait(WORKER_POLL_SECONDS)
+                continue
+
+            thread = threading.Thread(
+                target=run_claimed, args=(job,), name=f"job-{job['job_id']}"
+            )
+            thread.start()
+            jobs.append(thread)
+    finally:
+        for thread in jobs:
+            thread.join()
+        reporting.set()
+        reporter.join()
+        try:
+            job_scheduler.clear_resources(worker_id)
+        except Exception:
+            logger.exception("Failed to clear the resource report")
+        executor.shutdown()
+        shutdown_inference_pool()
+        logger.info(f"Pipeline worker {worker_id} stopped")
+
+
+if __name__ == "__main__":
+    main()